@@ -1,139 +1,326 @@
-import sqlite3
+import logging
 import os
 import time
-import random
 import uuid
-from flask import Flask, jsonify, request, make_response, g
+import hashlib
+import json
+from flask import (Blueprint, Flask, current_app, jsonify, request, make_response, g, Response, send_file,
+                   stream_with_context)
 from flask_cors import CORS
-from flask_bcrypt import Bcrypt
-from flask_jwt_extended import create_access_token, get_jwt_identity, jwt_required, JWTManager
+from flask_jwt_extended import (get_jwt, get_jwt_identity, jwt_required,
+                                verify_jwt_in_request, JWTManager)
 from functools import wraps
-from werkzeug.exceptions import HTTPException
-
-# Імпорти OPENTELEMETRY ---
-from opentelemetry import trace
-from opentelemetry.sdk.resources import SERVICE_NAME, Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
-from opentelemetry.instrumentation.flask import FlaskInstrumentor
-from opentelemetry.instrumentation.logging import LoggingInstrumentor
+from werkzeug.exceptions import HTTPException, BadRequest
 
 # Імпорти репозиторіїв
-from repositories.road_sign import RoadSignRepository
+from repositories.base import DATABASE, DB_ERRORS, configure_pool, get_pool, release_request_connection
+from repositories.migrations import migrate
+from repositories.query_stats import QueryBudgetExceeded, QueryStats
+from repositories.road_sign import UPDATABLE_FIELDS, RoadSignRepository
+from repositories.sign_changes import SignChangeRepository
 from repositories.user import UserRepository
 
+# Імпорти сервісів
+from services import api_contract
+from services.api_contract import DEFAULT_PAGE_SIZE
+from services.admission import classify, create_admission_controller, parse_request_start
+from services.catalog_cache import CatalogCache
+from services.change_feed import ChangeFeed
+from services.fault_injection import create_fault_injector, fault_profiles_from_env, record_fault
+from services.image_store import InvalidImage, create_image_store
+from services.streaming import stream_json_list
+from services.rate_limiter import RateLimitRule, create_rate_limiter
+from services.sign_suggest import SignSuggestIndex
+from services.snapshots import SnapshotWriter
+from services.password_hasher import HasherBusy, create_password_hasher
+from services.role_cache import RoleVersionCache
+from services.metrics import (HTTP_INFLIGHT, HTTP_REQUEST_DB_DURATION, HTTP_REQUEST_DB_STATEMENTS,
+                              HTTP_REQUEST_DURATION, HTTP_REQUEST_ERRORS, HTTP_REQUESTS, IDEMPOTENCY_EVENTS, RATE_LIMIT_REJECTIONS, STARTUP_SECONDS,
+                              render_metrics)
+from services.idempotency import (IdempotencyInProgress, IdempotencyKeyReused, StoredResponse,
+                                  create_idempotency_store)
+
 # Імпорти доменних моделей
 from domain.catalog.road_sign import RoadSign
 from domain.users.user import User
 
 
 # --- НАЛАШТУВАННЯ OPENTELEMETRY ---
-def configure_opentelemetry(flask_app):
-    # 1. Визначаємо ім'я сервісу
-    resource = Resource(attributes={
-        SERVICE_NAME: "road-signs-backend"
-    })
+_tracer_provider = None
+
+
+def init_telemetry(flask_app):
+    """
+    Трейсинг через OTLP. Модулі OpenTelemetry імпортуються лише тут, а BatchSpanProcessor
+    (фоновий потік) створюється вже у воркері: при preload потік у master не пережив би fork.
+    """
+    global _tracer_provider
+    if flask_app.extensions.get('opentelemetry'):
+        return
+    from opentelemetry import trace
+    from opentelemetry.sdk.resources import SERVICE_NAME, Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+    from opentelemetry.instrumentation.flask import FlaskInstrumentor
+    from opentelemetry.instrumentation.logging import LoggingInstrumentor
+
+    if _tracer_provider is None:
+        # 1. Визначаємо ім'я сервісу
+        resource = Resource(attributes={
+            SERVICE_NAME: "road-signs-backend"
+        })
+
+        # 2. Налаштовуємо Трейсинг (Traces)
+        _tracer_provider = TracerProvider(resource=resource)
+
+        # Відправка на OTEL Collector (адреса буде в env змінних)
+        otlp_exporter = OTLPSpanExporter(endpoint=os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4317"),
+                                         insecure=True)
+
+        _tracer_provider.add_span_processor(BatchSpanProcessor(otlp_exporter))
+        trace.set_tracer_provider(_tracer_provider)
+
+        # 3. Автоматична інструментація Логів (додає trace_id в логи)
+        LoggingInstrumentor().instrument(set_logging_packages=True)
+
+    # 4. Автоматична інструментація Flask
+    FlaskInstrumentor().instrument_app(flask_app)
+    flask_app.extensions['opentelemetry'] = _tracer_provider
 
-    # 2. Налаштовуємо Трейсинг (Traces)
-    trace_provider = TracerProvider(resource=resource)
 
-    # Відправка на OTEL Collector (адреса буде в env змінних)
-    otlp_exporter = OTLPSpanExporter(endpoint=os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4317"),
-                                     insecure=True)
+# Усі маршрути та middleware; застосунок збирає create_app()
+api = Blueprint('api', __name__)
 
-    trace_provider.add_span_processor(BatchSpanProcessor(otlp_exporter))
-    trace.set_tracer_provider(trace_provider)
+# Дозволяємо браузеру бачити спеціальні заголовки (Retry-After, X-Request-Id)
+CORS_ALLOW_HEADERS = ["Content-Type", "Authorization", "Idempotency-Key", "X-Request-Id", "If-None-Match"]
+CORS_EXPOSE_HEADERS = ["Retry-After", "X-Request-Id", "ETag", "Idempotent-Replayed", "X-DB-Statements",
+                       "X-DB-Time-Ms"]
 
-    # 3. Автоматична інструментація Flask
-    FlaskInstrumentor().instrument_app(flask_app)
+# Хешування паролів - в окремому обмеженому пулі процесів (створюється ліниво, вже у воркері)
+password_hasher = create_password_hasher()
 
-    # 4. Автоматична інструментація Логів (додає trace_id в логи)
-    LoggingInstrumentor().instrument(set_logging_packages=True)
+# --- Створюємо екземпляри репозиторіїв ---
+# Конструктори не звертаються до БД: з'єднання відкриваються при першому запиті
+sign_repo = RoadSignRepository()
+user_repo = UserRepository()
+# Версія кешу - ще й голова журналу змін у БД: записи інших воркерів інвалідують кеш цього
+catalog_cache = CatalogCache(sign_repo, change_repo=SignChangeRepository())
 
-app = Flask(__name__)
+# Журнал змін для інкрементальної синхронізації клієнтів (GET /signs/changes)
+change_feed = ChangeFeed()
+RoadSignRepository.add_change_listener(change_feed.notify)
 
-configure_opentelemetry(app)
+# Підказки за префіксом назви (GET /signs/suggest) - індекс у пам'яті, оновлюється дельтами журналу
+suggest_index = SignSuggestIndex(sign_repo, change_feed)
+RoadSignRepository.add_change_listener(suggest_index.notify)
 
-# --- КОНФІГУРАЦІЯ ---
-app.config["JWT_SECRET_KEY"] = "ezhi"
-app.config["SECRET_KEY"] = "super-secret-flask-key-change-me"
+# Статичні снапшоти для nginx: писача створює create_app (каталог - з конфігурації),
+# а підписка на зміни одна на процес, хоч би скільки разів викликали create_app
+snapshot_writer = None
 
-# Дозволяємо браузеру бачити спеціальні заголовки (Retry-After, X-Request-Id)
-CORS(app, resources={r"/*": {
-    "origins": "*",
-    "allow_headers": ["Content-Type", "Authorization", "Idempotency-Key", "X-Request-Id"],
-    "expose_headers": ["Retry-After", "X-Request-Id"]
-}})
 
-jwt = JWTManager(app)
-bcrypt = Bcrypt(app)
+def schedule_snapshots() -> None:
+    if snapshot_writer is not None:
+        snapshot_writer.schedule()
 
-# --- Створюємо екземпляри репозиторіїв ---
-sign_repo = RoadSignRepository()
-user_repo = UserRepository()
-DATABASE_PATH = os.path.join(os.path.dirname(__file__), 'data', 'road_signs.db')
 
-# --- In-Memory сховища (для демонстрації) ---
-idempotency_store = {}  # Key -> {status, response_body}
-rate_limit_store = {}  # IP -> {count, start_time}
+RoadSignRepository.add_change_listener(schedule_snapshots)
+
+# Кеш ролей для stateless-авторизації: admin_required звіряє JWT-claims з ним, а не з БД
+role_cache = RoleVersionCache(user_repo.get_role_version, ttl=float(os.getenv("ROLE_CACHE_TTL", "30")))
+UserRepository.add_role_change_listener(role_cache.set)
+
+# --- Ідемпотентність (LRU + TTL, опційно спільна SQLite-таблиця) ---
+idempotency_store = create_idempotency_store()
+
+# --- Rate Limiting (token bucket) ---
 RATE_LIMIT_WINDOW = 10
 MAX_REQUESTS = 20
+rate_limiter = create_rate_limiter(
+    # Анонімний клієнт (за IP): в середньому MAX_REQUESTS за RATE_LIMIT_WINDOW секунд
+    default_rule=RateLimitRule(MAX_REQUESTS, MAX_REQUESTS / RATE_LIMIT_WINDOW),
+    # Автентифікований користувач (за id з JWT)
+    user_rule=RateLimitRule(MAX_REQUESTS * 3, MAX_REQUESTS * 3 / RATE_LIMIT_WINDOW),
+    # Дорогі маршрути з bcrypt - окремі, суворіші відра
+    route_rules={
+        'login': RateLimitRule(5, 5 / 60),
+        'register': RateLimitRule(3, 3 / 60),
+    }
+)
+# Незмінні файли з кешованими відповідями: сітка каталогу тягне десятки мініатюр за раз;
+# підказки - запит на кожну набрану літеру, обслуговуються з пам'яті без БД
+RATE_LIMIT_EXEMPT = frozenset({'get_image', 'suggest_signs'})
+
+# --- Контроль допуску (адаптивні ліміти одночасних запитів за класами маршрутів) ---
+admission = create_admission_controller()
+# Проби та метрики мають відповідати й під перевантаженням
+ADMISSION_EXEMPT = frozenset({'health_check', 'metrics'})
+
+# --- Облік SQL-запитів (QUERY_STATS=1) ---
+# Бюджет запитів маршрутів (з урахуванням одного завантаження ролі адміна при промаху кешу ролей).
+# Перевищення пишеться в лог; QUERY_BUDGET_STRICT=1 (тести) перетворює його на помилку запиту.
+ROUTE_QUERY_BUDGETS = {
+    # Кешовані читання: промах кешу і звірка версії каталогу з журналом змін
+    'get_all_signs': 2,
+    'get_categories': 2,
+    'get_sign_by_id': 2,
+    'search_signs': 1,
+    'suggest_signs': 3,  # повна перебудова індексу: версія журналу (2) і get_all
+    'create_sign': 2,
+    'update_sign': 2,
+    'delete_sign': 2,
+}
+
+# --- Пакетний імпорт ---
+BATCH_CHUNK_SIZE = 500  # рядків на одну транзакцію
+MAX_BATCH_ROWS = 50_000
+
+
+# --- MIDDLEWARE: RED-метрики (Rate, Errors, Duration) ---
+@api.before_app_request
+def start_request_metrics():
+    g.started_at = time.perf_counter()
+    HTTP_INFLIGHT.inc()
+
+
+@api.after_app_request
+def record_request_metrics(response):
+    started_at = g.get("started_at")
+    if started_at is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        labels = (route, request.method, str(response.status_code))
+        HTTP_REQUEST_DURATION.labels(*labels).observe((time.perf_counter() - started_at) * 1000)
+        HTTP_REQUESTS.labels(*labels).inc()
+        if response.status_code >= 500:
+            HTTP_REQUEST_ERRORS.labels(*labels).inc()
+    return response
+
+
+@api.teardown_app_request
+def finish_request_metrics(exc=None):
+    if g.pop("started_at", None) is not None:
+        HTTP_INFLIGHT.dec()
 
 
 # --- MIDDLEWARE: X-Request-Id ---
-@app.before_request
+@api.before_app_request
 def add_request_id():
     # Беремо ID з заголовка клієнта або генеруємо новий
     request_id = request.headers.get("X-Request-Id") or str(uuid.uuid4())
     g.request_id = request_id
 
 
-@app.after_request
+@api.after_app_request
 def inject_request_id(response):
     # Додаємо ID у відповідь для кореляції логів
     response.headers["X-Request-Id"] = g.get("request_id", "unknown")
     return response
 
 
-# --- MIDDLEWARE: Єдиний формат помилки ---
-@app.errorhandler(Exception)
-def handle_exception(e):
-    code = 500
-    error_name = "Internal Server Error"
-    details = str(e)
+# --- MIDDLEWARE: Облік SQL-запитів ---
+@api.before_app_request
+def start_query_stats():
+    if current_app.config["QUERY_STATS"] or current_app.config["QUERY_BUDGET_STRICT"]:
+        g.query_stats = QueryStats(g.request_id)
+
+
+@api.after_app_request
+def report_query_stats(response):
+    # Запити потокових відповідей (експорт, SSE), виконані після повернення обробника, сюди не потрапляють
+    stats = g.get("query_stats")
+    if stats is None:
+        return response
+    response.headers["X-DB-Statements"] = str(stats.statements)
+    response.headers["X-DB-Time-Ms"] = f"{stats.seconds * 1000:.2f}"
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    HTTP_REQUEST_DB_STATEMENTS.labels(route).observe(stats.statements)
+    HTTP_REQUEST_DB_DURATION.labels(route).observe(stats.seconds * 1000)
+
+    endpoint = request.endpoint.rpartition('.')[2] if request.endpoint else None
+    budget = ROUTE_QUERY_BUDGETS.get(endpoint)
+    if budget is not None and stats.statements > budget:
+        if current_app.config["QUERY_BUDGET_STRICT"]:
+            raise QueryBudgetExceeded(endpoint, budget, stats.statements)
+        current_app.logger.warning("request %s: %s issued %d SQL statements, budget is %d",
+                                   stats.request_id, endpoint, stats.statements, budget)
+    return response
 
-    if isinstance(e, HTTPException):
-        code = e.code
-        error_name = e.name
-        details = e.description
 
-    return jsonify({
-        "error": error_name,
-        "code": getattr(e, "code", "UNKNOWN_ERROR"),
-        "details": details,
-        "requestId": g.get("request_id")
-    }), code
+# --- MIDDLEWARE: Контроль допуску ---
+# Перший дорогий крок ланцюжка: надлишок відкидається до перевірки JWT, rate limiter і БД
+@api.before_app_request
+def admit_request():
+    endpoint = request.endpoint.rpartition('.')[2] if request.endpoint else None
+    if admission is None or endpoint in ADMISSION_EXEMPT or request.method == 'OPTIONS':
+        return None
+    queue_delay = parse_request_start(request.headers.get('X-Request-Start'), time.time())
+    holding = endpoint == 'get_sign_changes' and holds_worker_thread()
+    route_class = 'hold' if holding else classify(endpoint, request.method)
+    ticket, retry_after = admission.admit(route_class, queue_delay)
+    if ticket is None:
+        resp = make_response(jsonify({
+            "error": "Service Unavailable",
+            "code": "OVERLOADED",
+            "details": "Server is overloaded, retry later",
+            "requestId": g.request_id
+        }), 503)
+        resp.headers["Retry-After"] = str(retry_after)
+        return resp
+    g.admission_ticket = ticket
 
 
-# --- MIDDLEWARE: Rate Limiting & Fault Injection (Хаос) ---
-@app.before_request
-def check_limits_and_chaos():
-    # 1. Rate Limiting
-    ip = request.remote_addr
-    current_time = time.time()
+def holds_worker_thread() -> bool:
+    """Long-poll (wait > 0) або SSE: запит займає потік воркера на весь час очікування"""
+    if request.accept_mimetypes.best == 'text/event-stream':
+        return True
+    try:
+        return float(request.args.get('wait', 0)) > 0
+    except ValueError:
+        return False  # 400 поверне обробник
 
-    record = rate_limit_store.get(ip, {"count": 0, "start_time": current_time})
 
-    if current_time - record["start_time"] > RATE_LIMIT_WINDOW:
-        record = {"count": 1, "start_time": current_time}
-    else:
-        record["count"] += 1
+@api.teardown_app_request
+def release_admission(exc=None):
+    ticket = g.pop("admission_ticket", None)
+    if ticket is not None:
+        admission.release(ticket)
 
-    rate_limit_store[ip] = record
 
-    if record["count"] > MAX_REQUESTS:
-        retry_after = 5
+# --- MIDDLEWARE: Єдиний формат помилки ---
+@api.app_errorhandler(Exception)
+def handle_exception(e):
+    if isinstance(e, HTTPException):
+        error = api_contract.http_error(e.code, e.name, e.description)
+    else:
+        error = api_contract.error_for_exception(e) or api_contract.unknown_error(e)
+    resp = make_response(jsonify(error.body(g.get("request_id"))), error.status)
+    resp.headers.update(error.headers)
+    return resp
+
+
+def api_response(status, body):
+    """(status, body) зі спільних обробників api_contract -> відповідь Flask"""
+    return jsonify(body), status
+
+
+# --- MIDDLEWARE: Rate Limiting ---
+@api.before_app_request
+def check_rate_limits():
+    # Правила лімітів - за назвою маршруту без префікса blueprint ('api.login' -> 'login')
+    endpoint = request.endpoint.rpartition('.')[2] if request.endpoint else None
+    if endpoint in RATE_LIMIT_EXEMPT:
+        return None
+    identity, authenticated = request.remote_addr, False
+    try:
+        if verify_jwt_in_request(optional=True):
+            identity, authenticated = get_jwt_identity(), True
+    except Exception:
+        pass  # невалідний токен - рахуємо за IP, а 401 поверне сам маршрут
+
+    allowed, retry_after = rate_limiter.hit(identity, endpoint, authenticated)
+    if not allowed:
+        RATE_LIMIT_REJECTIONS.labels(request.url_rule.rule if request.url_rule else "unmatched").inc()
         resp = make_response(jsonify({
             "error": "Too Many Requests",
             "code": "RATE_LIMIT_EXCEEDED",
@@ -143,48 +330,24 @@ def check_limits_and_chaos():
         resp.headers["Retry-After"] = str(retry_after)
         return resp
 
-    # 2. Fault Injection (Тільки для POST/PATCH, щоб тестувати ретраї)
-    if request.method in ['POST', 'PATCH'] and "signs" in request.path:
-        r = random.random()
-        # 15% шанс затримки (simulated network lag)
-        if r < 0.15:
-            time.sleep(random.uniform(1.2, 2.0))
-        # 10% шанс помилки 503/500
-        if r > 0.90:
-            err_type = "Service Unavailable" if random.random() < 0.5 else "Unexpected Error"
-            status = 503 if err_type == "Service Unavailable" else 500
-            # Викидаємо помилку, яку перехопить handle_exception, або повертаємо response вручну
-            # Тут краще вручну, щоб контролювати статус
-            return make_response(jsonify({
-                "error": err_type,
-                "requestId": g.request_id
-            }), status)
-
-
-def init_database():
-    """Ініціалізація бази даних"""
-    os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute(
-        '''CREATE TABLE IF NOT EXISTS road_signs (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, category TEXT NOT NULL, description TEXT)''')
-    cursor.execute(
-        '''CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE NOT NULL, password_hash TEXT NOT NULL, role TEXT DEFAULT 'guest', created_at DATETIME DEFAULT CURRENT_TIMESTAMP)''')
-
-    cursor.execute("SELECT COUNT(*) FROM road_signs")
-    if cursor.fetchone()[0] == 0:
-        signs = [('Стоп', 'Заборонні', 'Зупинитися перед знаком'),
-                 ('Головна дорога', 'Пріоритету', 'Перевага на перехресті')]
-        cursor.executemany("INSERT INTO road_signs (name, category, description) VALUES (?, ?, ?)", signs)
-
-    cursor.execute("SELECT COUNT(*) FROM users")
-    if cursor.fetchone()[0] == 0:
-        users = [('admin', bcrypt.generate_password_hash('admin123').decode('utf-8'), 'admin')]
-        cursor.executemany("INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)", users)
-
-    conn.commit()
-    conn.close()
+
+# --- MIDDLEWARE: Fault Injection ---
+# Реєструється в create_app лише тоді, коли задано профілі збоїв: вимкнена ін'єкція нічого не коштує
+def inject_faults():
+    fault = current_app.extensions['fault_injector'].decide(request.method, request.path)
+    if fault is None:
+        return None
+    record_fault(fault)
+    if fault.delay:
+        # У WSGI-режимі затримка займає потік (під gevent - лише greenlet); asgi.py чекає без потоку
+        time.sleep(fault.delay)
+    if fault.status is not None:
+        return make_response(jsonify({
+            "error": fault.error_name,
+            "code": "FAULT_INJECTED",
+            "details": f"Injected by fault profile '{fault.rule.path}'",
+            "requestId": g.request_id
+        }), fault.status)
 
 
 # Функція-декоратор для перевірки прав адміна
@@ -193,13 +356,90 @@ def admin_required():
         @wraps(fn)
         @jwt_required()
         def decorator(*args, **kwargs):
-            current_user_id_str = get_jwt_identity()
-            user = user_repo.get_by_id(int(current_user_id_str))
-            if user and user.is_admin():
-                return fn(*args, **kwargs)
-            else:
+            # Роль і її версія - в самому токені; БД не потрібна, поки кеш ролей "теплий"
+            claims = get_jwt()
+            if claims.get('role') != 'admin':
                 return jsonify({"error": "Admin access required", "requestId": g.get("request_id")}), 403
 
+            current = role_cache.get(int(get_jwt_identity()))
+            if current is None or current != ('admin', claims.get('rv')):
+                # Роль змінилась після видачі токена - клієнт має увійти знову
+                return jsonify({
+                    "error": "Unauthorized",
+                    "code": "TOKEN_ROLE_STALE",
+                    "details": "User role has changed, please log in again",
+                    "requestId": g.get("request_id")
+                }), 401
+            return fn(*args, **kwargs)
+
+        return decorator
+
+    return wrapper
+
+
+# Декоратор ідемпотентності для мутуючих маршрутів (ставиться після admin_required)
+def idempotent(required=False, hash_body=True):
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            idem_key = request.headers.get("Idempotency-Key")
+            if not idem_key:
+                if not required:
+                    return fn(*args, **kwargs)
+                return jsonify({
+                    "error": "Validation Error",
+                    "code": "IDEMPOTENCY_KEY_REQUIRED",
+                    "details": "Header Idempotency-Key is missing",
+                    "requestId": g.get("request_id")
+                }), 400
+
+            # Ключ унікальний в межах користувача; відбиток захищає від повторного використання.
+            # hash_body=False - для потокових тіл, які не можна читати наперед
+            key = f"{get_jwt_identity()}:{idem_key}"
+            body = request.get_data() if hash_body else f"{request.content_type};{request.content_length}".encode()
+            fingerprint = hashlib.sha256(f"{request.method} {request.path}\n".encode('utf-8') + body).hexdigest()
+
+            try:
+                stored = idempotency_store.begin(key, fingerprint)
+            except IdempotencyInProgress:
+                IDEMPOTENCY_EVENTS.labels("in_progress").inc()
+                resp = make_response(jsonify({
+                    "error": "Conflict",
+                    "code": "IDEMPOTENCY_REQUEST_IN_PROGRESS",
+                    "details": "A request with this Idempotency-Key is still being processed",
+                    "requestId": g.get("request_id")
+                }), 409)
+                resp.headers["Retry-After"] = "1"
+                return resp
+            except IdempotencyKeyReused:
+                IDEMPOTENCY_EVENTS.labels("key_reused").inc()
+                return jsonify({
+                    "error": "Unprocessable Entity",
+                    "code": "IDEMPOTENCY_KEY_REUSED",
+                    "details": "Idempotency-Key was already used with a different request",
+                    "requestId": g.get("request_id")
+                }), 422
+
+            if stored is not None:
+                IDEMPOTENCY_EVENTS.labels("replay").inc()
+                resp = make_response(stored.body, stored.status)
+                if stored.body:
+                    resp.mimetype = 'application/json'
+                resp.headers["Idempotent-Replayed"] = "true"
+                return resp
+
+            try:
+                resp = make_response(fn(*args, **kwargs))
+            except Exception:
+                idempotency_store.abandon(key)
+                raise
+            # 5xx не зберігаємо: клієнт має право повторити запит
+            if resp.status_code >= 500:
+                idempotency_store.abandon(key)
+            else:
+                idempotency_store.complete(key, StoredResponse(fingerprint, resp.status_code, resp.get_data()))
+            return resp
+
         return decorator
 
     return wrapper
@@ -207,49 +447,117 @@ def admin_required():
 
 # --- ROUTES ---
 
-@app.route('/health', methods=['GET'])
+@api.route('/health', methods=['GET'])
 def health_check():
-    # Симулюємо іноді довгий запит для перевірки таймауту клієнта
-    if random.random() < 0.1:
-        time.sleep(2)
     return jsonify({"status": "ok", "requestId": g.request_id})
 
 
-@app.route('/signs', methods=['GET'])
+def cached_json_response(entry):
+    """Відповідь з кешу каталогу: 304 при збігу ETag, інакше готове тіло без серіалізації"""
+    if entry.etag in request.if_none_match:
+        resp = make_response('', 304)
+    else:
+        resp = make_response(entry.body)
+        resp.mimetype = 'application/json'
+    resp.set_etag(entry.etag)
+    # no-cache: браузер зберігає відповідь, але перевіряє її через If-None-Match
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
+
+
+def streamed_json_response(items):
+    """Chunked JSON-масив прямо з курсора БД"""
+    return Response(stream_with_context(stream_json_list(items)), mimetype='application/json')
+
+
+@api.route('/metrics', methods=['GET'])
+def metrics():
+    body, content_type = render_metrics()
+    return Response(body, content_type=content_type)
+
+
+@api.route('/signs', methods=['GET'])
 def get_all_signs():
-    return jsonify({'message': 'success', 'data': [s.to_dict() for s in sign_repo.get_all()]})
+    api_contract.check_stream_args(request.args, 'category', 'fields')
+    # Фільтр за кількома категоріями і/або проєкція полів - один запит замість N звернень до /signs/<category>
+    if api_contract.wants_query(request.args):
+        return cached_json_response(catalog_cache.query(api_contract.read_sign_query(request.args)))
+    if api_contract.wants_stream(request.args):
+        return streamed_json_response(sign_repo.iter_all())
+    if api_contract.wants_pagination(request.args):
+        return cached_json_response(catalog_cache.page(*api_contract.read_pagination_args(request.args)))
+    return cached_json_response(catalog_cache.all_signs())
+
+
+@api.route('/categories', methods=['GET'])
+def get_categories():
+    return cached_json_response(catalog_cache.categories())
+
+
+@api.route('/signs/export', methods=['GET'])
+def export_signs():
+    export_format, iter_rows, mimetype = api_contract.read_export_format(request.args)
+    resp = Response(stream_with_context(iter_rows(sign_repo.iter_all())), mimetype=mimetype)
+    resp.headers.update(api_contract.export_headers(export_format))
+    return resp
+
+
+@api.route('/signs/search', methods=['GET'])
+def search_signs():
+    return api_response(*api_contract.search_signs(request.args, sign_repo.search))
+
+
+@api.route('/signs/suggest', methods=['GET'])
+def suggest_signs():
+    return api_response(*api_contract.suggest_signs(request.args, suggest_index.suggest))
+
+
+@api.route('/signs/changes', methods=['GET'])
+def get_sign_changes():
+    """
+    Дельти каталогу після версії since. wait=N - long-poll до N секунд,
+    Accept: text/event-stream - потік SSE. 410 - історію компактовано, потрібне повне перезавантаження.
+    """
+    since, limit, wait = api_contract.read_changes_args(request.args, request.headers.get('Last-Event-ID'))
+    if since is None:
+        return api_response(*api_contract.changes_head(change_feed.head()))
+    if request.accept_mimetypes.best == 'text/event-stream':
+        change_feed.read(since, 1)  # 410 до початку потоку, поки ще можна повернути статус
+        # Без stream_with_context: генератор не тримає з'єднання запиту з пулу весь час потоку
+        resp = Response(change_feed.iter_events(since, limit), mimetype='text/event-stream',
+                        headers=api_contract.SSE_HEADERS)
+        # Потік триває після teardown запиту: місце в класі 'hold' звільняється із закриттям відповіді
+        ticket = g.pop("admission_ticket", None)
+        if ticket is not None:
+            resp.call_on_close(lambda: admission.release(ticket))
+        return resp
+    batch = change_feed.wait(since, limit, wait, idle=release_request_connection)
+    return api_response(*api_contract.changes_batch(batch))
 
 
-@app.route('/signs/<category>', methods=['GET'])
+@api.route('/signs/<category>', methods=['GET'])
 def get_signs_by_category(category):
-    return jsonify({'message': 'success', 'data': [s.to_dict() for s in sign_repo.get_by_category(category)]})
+    api_contract.check_stream_args(request.args)
+    if api_contract.wants_stream(request.args):
+        return streamed_json_response(sign_repo.iter_all(category))
+    if api_contract.wants_pagination(request.args):
+        limit, after = api_contract.read_pagination_args(request.args)
+        return cached_json_response(catalog_cache.page(limit, after, category))
+    return cached_json_response(catalog_cache.signs_by_category(category))
 
 
-@app.route('/signs/id/<int:sign_id>', methods=['GET'])
+@api.route('/signs/id/<int:sign_id>', methods=['GET'])
 def get_sign_by_id(sign_id):
-    sign = sign_repo.get_by_id(sign_id)
-    if sign: return jsonify({'message': 'success', 'data': sign.to_dict()})
+    entry = catalog_cache.sign_by_id(sign_id)
+    if entry: return cached_json_response(entry)
     return jsonify({'error': 'Sign not found'}), 404
 
 
 # --- POST З ІДЕМПОТЕНТНІСТЮ ---
-@app.route('/signs', methods=['POST'])
+@api.route('/signs', methods=['POST'])
 @admin_required()
+@idempotent(required=True)
 def create_sign():
-    # 1. Перевірка ключа ідемпотентності
-    idem_key = request.headers.get("Idempotency-Key")
-    if not idem_key:
-        return jsonify({
-            "error": "Validation Error",
-            "code": "IDEMPOTENCY_KEY_REQUIRED",
-            "details": "Header Idempotency-Key is missing"
-        }), 400
-
-    # 2. Перевірка кешу
-    if idem_key in idempotency_store:
-        print(f" Повертаємо кешовану відповідь для {idem_key}")
-        return jsonify(idempotency_store[idem_key]), 201
-
     data = request.get_json()
     name = data.get('name')
     category = data.get('category')
@@ -259,59 +567,223 @@ def create_sign():
         return jsonify({"error": "Validation Error"}), 400
 
     new_sign = sign_repo.create(name, category, description)
-    response_data = {'message': 'success', 'data': new_sign.to_dict()}
+    return jsonify({'message': 'success', 'data': new_sign.to_dict()}), 201
+
+
+def iter_batch_items():
+    """Рядки пакета: JSON-масив або потік NDJSON (по об'єкту на рядок), без читання всього потоку наперед"""
+    if request.mimetype == 'application/x-ndjson':
+        index = 0
+        for line in request.stream:
+            if not line.strip():
+                continue
+            try:
+                yield index, json.loads(line)
+            except ValueError:
+                yield index, None
+            index += 1
+    else:
+        data = request.get_json(silent=True)
+        if not isinstance(data, list):
+            raise BadRequest("Body must be a JSON array or application/x-ndjson stream")
+        yield from enumerate(data)
+
+
+def validate_batch_item(item):
+    """Повертає (row, error) для одного рядка пакета"""
+    if not isinstance(item, dict):
+        return None, "Row must be a JSON object"
+    name, category, description = item.get('name'), item.get('category'), item.get('description')
+    if not isinstance(name, str) or not name.strip():
+        return None, "Field 'name' is required"
+    if not isinstance(category, str) or not category.strip():
+        return None, "Field 'category' is required"
+    if description is not None and not isinstance(description, str):
+        return None, "Field 'description' must be a string"
+    return (name, category, description), None
+
+
+@api.route('/signs:batch', methods=['POST'])
+@admin_required()
+@idempotent(required=True, hash_body=False)
+def create_signs_batch():
+    results = []
+    chunk, chunk_indexes = [], []
+
+    def flush():
+        for index, sign_id in zip(chunk_indexes, sign_repo.create_many(chunk)):
+            results.append({'index': index, 'status': 'created', 'id': sign_id})
+        chunk.clear()
+        chunk_indexes.clear()
+
+    for index, item in iter_batch_items():
+        if index >= MAX_BATCH_ROWS:
+            results.append({'index': index, 'status': 'error', 'details': f"Batch is limited to {MAX_BATCH_ROWS} rows"})
+            break
+        row, error = validate_batch_item(item)
+        if error:
+            results.append({'index': index, 'status': 'error', 'details': error})
+            continue
+        chunk.append(row)
+        chunk_indexes.append(index)
+        if len(chunk) >= BATCH_CHUNK_SIZE:
+            flush()
+    flush()
+
+    results.sort(key=lambda r: r['index'])
+    created = sum(1 for r in results if r['status'] == 'created')
+    return jsonify({'message': 'success', 'created': created, 'failed': len(results) - created, 'results': results})
+
+
+def validate_sign_update(data):
+    """Текст помилки для тіла PATCH /signs/<id> або None"""
+    if not isinstance(data, dict) or not data:
+        return "Body must be a non-empty JSON object"
+    unknown = sorted(set(data) - set(UPDATABLE_FIELDS))
+    if unknown:
+        return f"Unknown fields: {', '.join(unknown)}; allowed: {', '.join(UPDATABLE_FIELDS)}"
+    for field in ('name', 'category'):
+        if field in data and (not isinstance(data[field], str) or not data[field].strip()):
+            return f"Field '{field}' must be a non-empty string"
+    if data.get('description') is not None and not isinstance(data['description'], str):
+        return "Field 'description' must be a string"
+    return None
+
+
+@api.route('/signs/<int:sign_id>', methods=['PATCH'])
+@admin_required()
+@idempotent()
+def update_sign(sign_id):
+    data = request.get_json(silent=True)
+    error = validate_sign_update(data)
+    if error:
+        return jsonify({
+            "error": "Validation Error",
+            "code": "INVALID_SIGN_UPDATE",
+            "details": error,
+            "requestId": g.get("request_id")
+        }), 400
+    sign = sign_repo.update(sign_id, data)
+    if sign is None: return jsonify({'error': 'Not found'}), 404
+    return jsonify({'message': 'success', 'data': sign.to_dict()})
+
 
-    # 3. Збереження результату
-    idempotency_store[idem_key] = response_data
+@api.route('/signs/<int:sign_id>', methods=['DELETE'])
+@admin_required()
+@idempotent()
+def delete_sign(sign_id):
+    if sign_repo.delete(sign_id) == 0: return jsonify({'error': 'Not found'}), 404
+    return '', 204
 
-    return jsonify(response_data), 201
+
+# --- ЗОБРАЖЕННЯ ЗНАКІВ ---
+IMAGE_CACHE_CONTROL = 'public, max-age=31536000, immutable'  # URL містить хеш вмісту
+MULTIPART_OVERHEAD = 64 * 1024  # межі й заголовки multipart понад сам файл
+
+
+def image_too_large(max_bytes: int):
+    return jsonify({
+        "error": "Payload Too Large",
+        "code": "IMAGE_TOO_LARGE",
+        "details": f"Image is larger than {max_bytes} bytes",
+        "requestId": g.get("request_id")
+    }), 413
 
 
-@app.route('/signs/<int:sign_id>', methods=['PATCH'])
+@api.route('/signs/<int:sign_id>/image', methods=['PUT'])
 @admin_required()
-def update_sign(sign_id):
-    data = request.get_json()
-    if not sign_repo.get_by_id(sign_id): return jsonify({'error': 'Not found'}), 404
-    sign_repo.update(sign_id, data)
+def upload_sign_image(sign_id):
+    # Ліміт розміру - до читання тіла: заявлене завелике тіло відхиляється одразу,
+    # а chunked без Content-Length Werkzeug читає не далі ліміту
+    store = current_app.extensions['image_store']
+    max_length = store.max_bytes + MULTIPART_OVERHEAD
+    if request.content_length is not None and request.content_length > max_length:
+        return image_too_large(store.max_bytes)
+    request.max_content_length = max_length
+    # Сире тіло (Content-Type: image/*) або multipart-поле "image"
+    upload = request.files.get('image')
+    data = upload.read() if upload else request.get_data()
+    if len(data) > store.max_bytes:
+        return image_too_large(store.max_bytes)
+    try:
+        digest = store.save(data)
+    except InvalidImage as e:
+        return jsonify({
+            "error": "Validation Error",
+            "code": "INVALID_IMAGE",
+            "details": str(e),
+            "requestId": g.get("request_id")
+        }), 400
+    if sign_repo.set_image(sign_id, digest) == 0: return jsonify({'error': 'Not found'}), 404
     return jsonify({'message': 'success', 'data': sign_repo.get_by_id(sign_id).to_dict()})
 
 
-@app.route('/signs/<int:sign_id>', methods=['DELETE'])
+@api.route('/signs/<int:sign_id>/image', methods=['DELETE'])
 @admin_required()
-def delete_sign(sign_id):
-    if sign_repo.delete(sign_id) == 0: return jsonify({'error': 'Not found'}), 404
+def delete_sign_image(sign_id):
+    # Файл лишається у сховищі: за тим самим хешем на нього можуть посилатися інші знаки
+    if sign_repo.set_image(sign_id, None) == 0: return jsonify({'error': 'Not found'}), 404
     return '', 204
 
 
-@app.route('/register', methods=['POST'])
+@api.route('/images/<digest>/<variant>', methods=['GET'])
+def get_image(digest, variant):
+    """
+    Файл зображення: conditional=True дає ETag/304 і Range-запити,
+    а файл віддається через wsgi.file_wrapper (sendfile у gunicorn) без копіювання в Python.
+    """
+    accept_webp = 'image/webp' in request.headers.get('Accept', '')
+    found = current_app.extensions['image_store'].resolve(digest, variant, accept_webp)
+    if found is None: return jsonify({'error': 'Image not found'}), 404
+    path, mimetype = found
+    resp = send_file(path, mimetype=mimetype, conditional=True,
+                     etag=f"{digest}-{os.path.basename(path)}", max_age=31536000)
+    resp.headers['Cache-Control'] = IMAGE_CACHE_CONTROL
+    resp.vary.add('Accept')  # WebP або оригінальний формат за тим самим URL
+    return resp
+
+
+@api.route('/register', methods=['POST'])
 def register():
     data = request.get_json()
     if user_repo.get_by_username_for_auth(data.get('username')):
-        return jsonify({"error": "Username exists"}), 409
-    hashed = bcrypt.generate_password_hash(data.get('password')).decode('utf-8')
-    user_repo.create(data.get('username'), hashed, 'guest')
-    return jsonify({"message": "User registered"}), 201
+        return api_response(*api_contract.username_exists())
+    # HasherBusy (пул bcrypt переповнений) -> 503 AUTH_OVERLOADED у handle_exception
+    user_repo.create(data.get('username'), password_hasher.hash(data.get('password')), 'guest')
+    return api_response(*api_contract.registered())
 
 
-@app.route('/login', methods=['POST'])
+@api.route('/login', methods=['POST'])
 def login():
     data = request.get_json()
     user_row = user_repo.get_by_username_for_auth(data.get('username'))
-    if user_row and bcrypt.check_password_hash(user_row['password_hash'], data.get('password')):
-        access_token = create_access_token(identity=str(user_row['id']))
-        return jsonify(message="Login successful", access_token=access_token,
-                       user={'id': user_row['id'], 'username': user_row['username'], 'role': user_row['role']})
-    return jsonify({"error": "Invalid credentials"}), 401
+    valid = bool(user_row) and password_hasher.check(user_row['password_hash'], data.get('password'))
+    # Cost factor змінився - прозоро перераховуємо хеш, поки маємо відкритий пароль
+    if valid and password_hasher.needs_rehash(user_row['password_hash']):
+        try:
+            user_repo.update_password_hash(user_row['id'], password_hasher.hash(data.get('password')))
+        except HasherBusy:
+            pass  # перерахуємо при наступному логіні
+    return api_response(*api_contract.login_result(user_row if valid else None, role_cache))
 
 
-@app.route('/users', methods=['GET'])
+@api.route('/users', methods=['GET'])
 @admin_required()
 def get_all_users():
+    api_contract.check_stream_args(request.args)
+    if api_contract.wants_stream(request.args):
+        return streamed_json_response(user_repo.iter_all())
+    if api_contract.wants_pagination(request.args):
+        limit, after = api_contract.read_pagination_args(request.args)
+        users = user_repo.get_page(limit, after)
+        next_after = users[-1].id if len(users) == limit else None
+        return jsonify({'message': 'success', 'data': [u.to_dict() for u in users], 'next_after': next_after})
     return jsonify({'message': 'success', 'data': [u.to_dict() for u in user_repo.get_all()]})
 
 
-@app.route('/users/<int:user_id>/promote', methods=['POST'])
+@api.route('/users/<int:user_id>/promote', methods=['POST'])
 @admin_required()
+@idempotent()
 def promote_user_to_admin(user_id):
     user = user_repo.get_by_id(user_id)
     if not user: return jsonify({'error': 'Not found'}), 404
@@ -320,11 +792,130 @@ def promote_user_to_admin(user_id):
     return jsonify({'message': 'success', 'user': user.to_dict()})
 
 
+# --- ФАБРИКА ЗАСТОСУНКУ ---
+
+def _startup_phase(flask_app, phase: str, seconds: float) -> None:
+    STARTUP_SECONDS.labels(phase).set(seconds)
+    flask_app.extensions.setdefault('startup_seconds', {})[phase] = seconds
+
+
+def warm_up(flask_app) -> None:
+    """Прогрів перед прийомом трафіку: з'єднання пулу і найгарячіші відповіді каталогу в кеші"""
+    try:
+        get_pool().warm()
+        with flask_app.app_context():
+            catalog_cache.all_signs()
+            catalog_cache.page(DEFAULT_PAGE_SIZE, 0)
+            catalog_cache.categories()
+            for category in catalog_cache.category_repo.get_all():
+                catalog_cache.signs_by_category(category.name)
+            suggest_index.rebuild()
+    except DB_ERRORS as e:
+        # Наприклад, міграції ще не виконані - кеш заповниться першими запитами
+        flask_app.logger.warning("warm-up skipped: %s", e)
+
+
+def init_worker(flask_app) -> None:
+    """
+    Ініціалізація, яку має виконати кожен процес, що обслуговує запити:
+    телеметрія (фонові потоки) і прогрів (з'єднання SQLite не можна успадковувати через fork).
+    """
+    if flask_app.config["OTEL_ENABLED"]:
+        started = time.perf_counter()
+        init_telemetry(flask_app)
+        _startup_phase(flask_app, 'telemetry', time.perf_counter() - started)
+    if flask_app.config["SNAPSHOT_DIR"]:
+        # Снапшот при старті і стеження за журналом змін - потік, тож у кожному воркері після fork
+        flask_app.extensions['snapshot_writer'].start()
+    if flask_app.config["WARM_UP"]:
+        started = time.perf_counter()
+        warm_up(flask_app)
+        _startup_phase(flask_app, 'warm_up', time.perf_counter() - started)
+    flask_app.logger.info("startup timings: %s", ", ".join(
+        f"{phase} {seconds * 1000:.1f} ms" for phase, seconds in flask_app.extensions['startup_seconds'].items()
+    ))
+
+
+def create_app(config: dict = None) -> Flask:
+    """
+    Фабрика застосунку. Не має побічних ефектів: не створює схему БД (це робить
+    repositories.migrations один раз на розгортання) і не відкриває з'єднань.
+    PRELOAD=True (gunicorn --preload) відкладає init_worker до post_worker_init у кожному воркері.
+    """
+    global snapshot_writer
+    started = time.perf_counter()
+    flask_app = Flask(__name__)
+    flask_app.logger.setLevel(logging.INFO)
+
+    # --- КОНФІГУРАЦІЯ ---
+    flask_app.config.update(
+        JWT_SECRET_KEY=os.getenv("JWT_SECRET_KEY", "ezhi"),
+        SECRET_KEY=os.getenv("SECRET_KEY", "super-secret-flask-key-change-me"),
+        # postgresql://-URL вмикає PostgreSQL, інакше - файл SQLite
+        DATABASE=os.getenv("DATABASE_URL") or os.getenv("DATABASE_PATH", DATABASE),
+        # Телеметрія вмикається, коли задано адресу OTEL Collector
+        OTEL_ENABLED=os.getenv("OTEL_ENABLED", "1" if os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT") else "0") == "1",
+        # Профілі ін'єкції збоїв (dict, JSON або шлях до файлу); None - вимкнено
+        FAULT_PROFILES=fault_profiles_from_env(),
+        # Статичні снапшоти каталогу для nginx
+        SNAPSHOT_DIR=os.getenv("SNAPSHOT_DIR"),
+        # Сховище зображень знаків (адресація хешем вмісту)
+        IMAGE_DIR=os.getenv("IMAGE_DIR"),
+        # За nginx: X-Sendfile/X-Accel-Redirect замість читання файлу воркером
+        USE_X_SENDFILE=os.getenv("USE_X_SENDFILE", "0") == "1",
+        PRELOAD=os.getenv("APP_PRELOAD", "0") == "1",
+        WARM_UP=os.getenv("APP_WARM_UP", "1") == "1",
+        # Облік SQL-запитів на запит: заголовки X-DB-Statements / X-DB-Time-Ms і метрики по маршрутах
+        QUERY_STATS=os.getenv("QUERY_STATS", "0") == "1",
+        # Перевищення ROUTE_QUERY_BUDGETS - помилка запиту, а не запис у лозі (для тестів)
+        QUERY_BUDGET_STRICT=os.getenv("QUERY_BUDGET_STRICT", "0") == "1",
+        # Найбільше тіло запиту (Werkzeug обриває читання з 413); з запасом на /signs:batch
+        MAX_CONTENT_LENGTH=int(os.getenv("MAX_REQUEST_BYTES", str(32 * 1024 * 1024))),
+        # Тривалість імпорту app.py, якщо її виміряла точка входу (wsgi.py для gunicorn)
+        IMPORT_SECONDS=None,
+    )
+    if config:
+        flask_app.config.update(config)
+
+    if flask_app.config["DATABASE"] != get_pool().database:
+        configure_pool(flask_app.config["DATABASE"])
+
+    CORS(flask_app, resources={r"/*": {
+        "origins": "*",
+        "allow_headers": CORS_ALLOW_HEADERS,
+        "expose_headers": CORS_EXPOSE_HEADERS
+    }})
+    JWTManager(flask_app)
+
+    # Одне з'єднання з пулу на запит: повертається в пул після завершення запиту
+    flask_app.teardown_appcontext(release_request_connection)
+    flask_app.register_blueprint(api)
+
+    fault_injector = create_fault_injector(flask_app.config["FAULT_PROFILES"])
+    if fault_injector is not None:
+        flask_app.extensions['fault_injector'] = fault_injector
+        flask_app.before_request(inject_faults)  # після rate limiting з blueprint
+
+    flask_app.extensions['image_store'] = create_image_store(flask_app.config["IMAGE_DIR"])
+
+    if snapshot_writer is not None:
+        snapshot_writer.stop()  # писач попереднього create_app у цьому процесі
+    snapshot_writer = None
+    if flask_app.config["SNAPSHOT_DIR"]:
+        snapshot_writer = SnapshotWriter(sign_repo, flask_app.config["SNAPSHOT_DIR"])
+        flask_app.extensions['snapshot_writer'] = snapshot_writer
+
+    if flask_app.config["IMPORT_SECONDS"] is not None:
+        _startup_phase(flask_app, 'import', flask_app.config["IMPORT_SECONDS"])
+    _startup_phase(flask_app, 'create_app', time.perf_counter() - started)
+    if not flask_app.config["PRELOAD"]:
+        init_worker(flask_app)
+    return flask_app
+
+
 if __name__ == '__main__':
-    if os.path.exists(DATABASE_PATH):
-        try:
-            os.remove(DATABASE_PATH)
-        except:
-            pass
-    init_database()
-    app.run(debug=True, port=5000, host='0.0.0.0')
\ No newline at end of file
+    # Локальний запуск: міграції (ідемпотентні) і dev-сервер; у продакшені - gunicorn -c gunicorn.conf.py
+    app = create_app({'PRELOAD': True})
+    migrate(app.config["DATABASE"])
+    init_worker(app)
+    app.run(debug=True, port=5000, host='0.0.0.0')
@@ -0,0 +1,434 @@
+"""
+ASGI-режим: python -m repositories.migrations && uvicorn asgi:application --workers 2
+
+Маршрути каталогу, пошуку, експорту та автентифікації обслуговуються на event loop:
+запити до SQLite йдуть в окремий DB-екзекутор, bcrypt - у пул процесів,
+тож повільний запит не займає цілий потік воркера.
+Решта маршрутів (адмінські мутації, пакетний імпорт, користувачі) передається
+в той самий Flask-застосунок з app.py, тож поведінка API однакова в обох режимах.
+Розбір параметрів, тіла відповідей і формат помилок async-маршрутів - спільні з app.py (services/api_contract.py).
+"""
+import asyncio
+import contextlib
+import contextvars
+import os
+import re
+import time
+import uuid
+from functools import wraps
+from http import HTTPStatus
+
+import jwt as pyjwt
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import FileResponse, Response, StreamingResponse
+from starlette.routing import Mount, Route
+
+import app as wsgi
+from repositories import query_stats
+from repositories.migrations import migrate
+from repositories.query_stats import QueryBudgetExceeded, QueryStats
+from repositories.async_base import iterate, run_db, shutdown_db_executor
+from repositories.async_user import AsyncUserRepository
+from services import api_contract
+from services.admission import classify, parse_request_start
+from services.catalog_cache import AsyncCatalogCache
+from services.fault_injection import create_fault_injector, fault_profiles_from_env, record_fault
+from services.json_codec import dumps
+from services.metrics import (HTTP_INFLIGHT, HTTP_REQUEST_DB_DURATION, HTTP_REQUEST_DB_STATEMENTS,
+                              HTTP_REQUEST_DURATION, HTTP_REQUEST_ERRORS, HTTP_REQUESTS, RATE_LIMIT_REJECTIONS,
+                              render_metrics)
+from services.password_hasher import HasherBusy
+from services.rate_limiter import MemoryBucketStore
+from services.streaming import stream_json_list
+
+# Flask-застосунок для маршрутів, яких немає в async-частині; його конфігурація спільна для обох.
+# Збої інжектує FaultInjectionMiddleware для всіх маршрутів, тож у Flask ін'єкцію вимкнено
+flask_app = wsgi.create_app({'FAULT_PROFILES': None})
+fault_injector = create_fault_injector(fault_profiles_from_env())
+
+# Ті самі екземпляри, що й у WSGI-застосунку: кеш, версія каталогу, ліміти і кеш ролей спільні
+user_repo = AsyncUserRepository(wsgi.user_repo)
+catalog_cache = AsyncCatalogCache(wsgi.catalog_cache, run_db)
+
+# Скільки одночасних запитів Flask-частини обслуговується потоками a2wsgi
+WSGI_WORKERS = int(os.getenv("ASGI_WSGI_WORKERS", "10"))
+
+request_id_var = contextvars.ContextVar("request_id", default=None)
+routes = []
+
+
+# --- Відповіді ---
+
+def json_response(payload, status: int = 200, headers: dict = None) -> Response:
+    return Response(dumps(payload), status_code=status, headers=headers, media_type='application/json')
+
+
+def error_response(status: int, error: str, code: str, details: str, headers: dict = None) -> Response:
+    """Єдиний формат помилки, як у handle_exception з app.py"""
+    return json_response({
+        "error": error,
+        "code": code,
+        "details": details,
+        "requestId": request_id_var.get()
+    }, status, headers)
+
+
+def api_response(status: int, body) -> Response:
+    """(status, body) зі спільних обробників api_contract -> відповідь Starlette"""
+    return json_response(body, status)
+
+
+def handle_exception(e: Exception) -> Response:
+    """Те саме відображення винятків, що й handle_exception в app.py"""
+    if isinstance(e, HTTPException):
+        error = api_contract.http_error(e.status_code, HTTPStatus(e.status_code).phrase, e.detail)
+    else:
+        error = api_contract.error_for_exception(e) or api_contract.unknown_error(e)
+    return json_response(error.body(request_id_var.get()), error.status, error.headers)
+
+
+def etag_matches(request, etag: str) -> bool:
+    for tag in request.headers.get('if-none-match', '').split(','):
+        tag = tag.strip()
+        if tag == '*' or tag.removeprefix('W/').strip('"') == etag:
+            return True
+    return False
+
+
+def cached_json_response(request, entry) -> Response:
+    """Відповідь з кешу каталогу: 304 при збігу ETag, інакше готове тіло без серіалізації"""
+    headers = {'ETag': f'"{entry.etag}"', 'Cache-Control': 'no-cache'}
+    if etag_matches(request, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, headers=headers, media_type='application/json')
+
+
+async def read_json(request):
+    try:
+        return await request.json()
+    except ValueError:
+        raise HTTPException(400, "Failed to decode JSON object")
+
+
+# --- Middleware (у порядку app.py: метрики, X-Request-Id, rate limiting) ---
+
+def request_identity(request):
+    """(id користувача з JWT, True) або (IP, False) - так само, як verify_jwt_in_request(optional=True)"""
+    auth = request.headers.get('authorization', '')
+    if auth.startswith('Bearer '):
+        try:
+            claims = pyjwt.decode(auth[7:], flask_app.config["JWT_SECRET_KEY"],
+                                  algorithms=[flask_app.config.get("JWT_ALGORITHM", "HS256")])
+            return claims[flask_app.config.get("JWT_IDENTITY_CLAIM", "sub")], True
+        except (pyjwt.PyJWTError, KeyError):
+            pass  # невалідний токен - рахуємо за IP
+    return (request.client.host if request.client else None), False
+
+
+async def check_rate_limit(request, endpoint: str, rule: str) -> Response | None:
+    if endpoint in wsgi.RATE_LIMIT_EXEMPT:
+        return None
+    identity, authenticated = request_identity(request)
+    if isinstance(wsgi.rate_limiter.store, MemoryBucketStore):
+        allowed, retry_after = wsgi.rate_limiter.hit(identity, endpoint, authenticated)
+    else:  # спільне SQLite-сховище може чекати на блокування - не на event loop
+        allowed, retry_after = await run_db(wsgi.rate_limiter.hit, identity, endpoint, authenticated)
+    if allowed:
+        return None
+    RATE_LIMIT_REJECTIONS.labels(rule).inc()
+    return error_response(429, "Too Many Requests", "RATE_LIMIT_EXCEEDED", "Please wait before retrying",
+                          headers={"Retry-After": str(retry_after)})
+
+
+# Long-poll і SSE тут чекають на event loop, не займаючи потоку, тож ліміт 'hold' з app.py їм не потрібен
+ADMISSION_EXEMPT = wsgi.ADMISSION_EXEMPT | {'get_sign_changes'}
+
+
+def admit(request, endpoint: str):
+    """Контроль допуску, як admit_request в app.py: (ticket, error_response)"""
+    if wsgi.admission is None or endpoint in ADMISSION_EXEMPT:
+        return None, None
+    queue_delay = parse_request_start(request.headers.get('x-request-start'), time.time())
+    ticket, retry_after = wsgi.admission.admit(classify(endpoint, request.method), queue_delay)
+    if ticket is None:
+        return None, error_response(503, "Service Unavailable", "OVERLOADED", "Server is overloaded, retry later",
+                                    headers={"Retry-After": str(retry_after)})
+    return ticket, None
+
+
+QUERY_STATS_ENABLED = flask_app.config["QUERY_STATS"] or flask_app.config["QUERY_BUDGET_STRICT"]
+
+
+def report_query_stats(response, stats: QueryStats, rule: str, name: str) -> Response:
+    """Заголовки, метрики і бюджет SQL-запитів, як report_query_stats в app.py"""
+    response.headers["X-DB-Statements"] = str(stats.statements)
+    response.headers["X-DB-Time-Ms"] = f"{stats.seconds * 1000:.2f}"
+    HTTP_REQUEST_DB_STATEMENTS.labels(rule).observe(stats.statements)
+    HTTP_REQUEST_DB_DURATION.labels(rule).observe(stats.seconds * 1000)
+    budget = wsgi.ROUTE_QUERY_BUDGETS.get(name)
+    if budget is not None and stats.statements > budget:
+        if flask_app.config["QUERY_BUDGET_STRICT"]:
+            raise QueryBudgetExceeded(name, budget, stats.statements)
+        flask_app.logger.warning("request %s: %s issued %d SQL statements, budget is %d",
+                                 stats.request_id, name, stats.statements, budget)
+    return response
+
+
+def _starlette_path(rule: str) -> str:
+    """Flask-правило '/signs/id/<int:sign_id>' -> '/signs/id/{sign_id:int}'"""
+    rule = re.sub(r'<int:(\w+)>', r'{\1:int}', rule)
+    return re.sub(r'<(\w+)>', r'{\1}', rule)
+
+
+def endpoint(rule: str, name: str, methods=('GET',)):
+    """
+    Реєструє async-маршрут. rule і name - як у Flask (мітки метрик та правила rate limiter
+    збігаються з WSGI-режимом), навколо обробника - ті самі middleware, що й в app.py.
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        async def handler(request):
+            request_id = request.headers.get("x-request-id") or str(uuid.uuid4())
+            token = request_id_var.set(request_id)
+            started = time.perf_counter()
+            HTTP_INFLIGHT.inc()
+            ticket = None
+            stats = QueryStats(request_id) if QUERY_STATS_ENABLED else None
+            # run_db копіює контекст - запити в екзекуторі зараховуються цьому запиту
+            stats_token = query_stats.activate(stats) if stats is not None else None
+            try:
+                try:
+                    ticket, response = admit(request, name)
+                    if response is None:
+                        response = await check_rate_limit(request, name, rule)
+                    if response is None:
+                        response = await fn(request, **request.path_params)
+                    if stats is not None:
+                        response = report_query_stats(response, stats, rule, name)
+                except Exception as e:
+                    response = handle_exception(e)
+                response.headers["X-Request-Id"] = request_id
+
+                labels = (rule, request.method, str(response.status_code))
+                HTTP_REQUEST_DURATION.labels(*labels).observe((time.perf_counter() - started) * 1000)
+                HTTP_REQUESTS.labels(*labels).inc()
+                if response.status_code >= 500:
+                    HTTP_REQUEST_ERRORS.labels(*labels).inc()
+                return response
+            finally:
+                if ticket is not None:
+                    wsgi.admission.release(ticket)
+                HTTP_INFLIGHT.dec()
+                if stats_token is not None:
+                    query_stats.deactivate(stats_token)
+                request_id_var.reset(token)
+
+        routes.append(Route(_starlette_path(rule), handler, methods=list(methods), name=name))
+        return handler
+
+    return wrapper
+
+
+def streamed_json_response(items) -> StreamingResponse:
+    """Chunked JSON-масив прямо з курсора БД; курсор читається в DB-екзекуторі"""
+    return StreamingResponse(iterate(stream_json_list(items)), media_type='application/json')
+
+
+# --- ROUTES ---
+
+@endpoint('/health', 'health_check')
+async def health_check(request):
+    return json_response({"status": "ok", "requestId": request_id_var.get()})
+
+
+@endpoint('/metrics', 'metrics')
+async def metrics(request):
+    body, content_type = render_metrics()
+    return Response(body, headers={'Content-Type': content_type})
+
+
+@endpoint('/signs', 'get_all_signs')
+async def get_all_signs(request):
+    params = request.query_params
+    api_contract.check_stream_args(params, 'category', 'fields')
+    if api_contract.wants_query(params):
+        return cached_json_response(request, await catalog_cache.query(api_contract.read_sign_query(params)))
+    if api_contract.wants_stream(params):
+        return streamed_json_response(wsgi.sign_repo.iter_all())
+    if api_contract.wants_pagination(params):
+        return cached_json_response(request, await catalog_cache.page(*api_contract.read_pagination_args(params)))
+    return cached_json_response(request, await catalog_cache.all_signs())
+
+
+@endpoint('/categories', 'get_categories')
+async def get_categories(request):
+    return cached_json_response(request, await catalog_cache.categories())
+
+
+@endpoint('/signs/export', 'export_signs')
+async def export_signs(request):
+    export_format, iter_rows, media_type = api_contract.read_export_format(request.query_params)
+    return StreamingResponse(iterate(iter_rows(wsgi.sign_repo.iter_all())), media_type=media_type,
+                             headers=api_contract.export_headers(export_format))
+
+
+@endpoint('/signs/search', 'search_signs')
+async def search_signs(request):
+    # Розбір і відповідь - спільні з WSGI; у DB-екзекуторі виконується лише сам пошук
+    return api_response(*await run_db(api_contract.search_signs, request.query_params, wsgi.sign_repo.search))
+
+
+@endpoint('/signs/suggest', 'suggest_signs')
+async def suggest_signs(request):
+    index = wsgi.suggest_index
+    if index.needs_sync():
+        # Дельта з журналу читається в екзекуторі БД; сам пошук - у пам'яті, на event loop
+        await run_db(index.refresh)
+    return api_response(*api_contract.suggest_signs(request.query_params, index.lookup))
+
+
+@endpoint('/signs/changes', 'get_sign_changes')
+async def get_sign_changes(request):
+    """Long-poll і SSE чекають на event loop, не займаючи потоків"""
+    since, limit, wait = api_contract.read_changes_args(request.query_params, request.headers.get('last-event-id'))
+    feed = wsgi.change_feed
+    if since is None:
+        return api_response(*api_contract.changes_head(await run_db(feed.head)))
+    if 'text/event-stream' in request.headers.get('accept', ''):
+        await run_db(feed.read, since, 1)  # 410 до початку потоку
+        return StreamingResponse(feed.iter_events_async(since, limit, run_db), media_type='text/event-stream',
+                                 headers=api_contract.SSE_HEADERS)
+    return api_response(*api_contract.changes_batch(await feed.wait_async(since, limit, wait, run_db)))
+
+
+@endpoint('/signs/<category>', 'get_signs_by_category')
+async def get_signs_by_category(request, category):
+    params = request.query_params
+    api_contract.check_stream_args(params)
+    if api_contract.wants_stream(params):
+        return streamed_json_response(wsgi.sign_repo.iter_all(category))
+    if api_contract.wants_pagination(params):
+        limit, after = api_contract.read_pagination_args(params)
+        return cached_json_response(request, await catalog_cache.page(limit, after, category))
+    return cached_json_response(request, await catalog_cache.signs_by_category(category))
+
+
+@endpoint('/signs/id/<int:sign_id>', 'get_sign_by_id')
+async def get_sign_by_id(request, sign_id):
+    entry = await catalog_cache.sign_by_id(sign_id)
+    if entry: return cached_json_response(request, entry)
+    return json_response({'error': 'Sign not found'}, 404)
+
+
+@endpoint('/images/<digest>/<variant>', 'get_image')
+async def get_image(request, digest, variant):
+    """
+    FileResponse читає файл в екзекуторі, підтримує Range, а на серверах з розширенням
+    http.response.pathsend віддає файл без копіювання через Python.
+    """
+    accept_webp = 'image/webp' in request.headers.get('accept', '')
+    found = await run_db(flask_app.extensions['image_store'].resolve, digest, variant, accept_webp)
+    if found is None:
+        return json_response({'error': 'Image not found'}, 404)
+    path, media_type = found
+    etag = f"{digest}-{os.path.basename(path)}"
+    headers = {'ETag': f'"{etag}"', 'Cache-Control': wsgi.IMAGE_CACHE_CONTROL, 'Vary': 'Accept'}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+
+@endpoint('/register', 'register', methods=('POST',))
+async def register(request):
+    data = await read_json(request)
+    if await user_repo.get_by_username_for_auth(data.get('username')):
+        return api_response(*api_contract.username_exists())
+    hashed = await wsgi.password_hasher.hash_async(data.get('password'))
+    await user_repo.create(data.get('username'), hashed, 'guest')
+    return api_response(*api_contract.registered())
+
+
+@endpoint('/login', 'login', methods=('POST',))
+async def login(request):
+    data = await read_json(request)
+    user_row = await user_repo.get_by_username_for_auth(data.get('username'))
+    hasher = wsgi.password_hasher
+    valid = bool(user_row) and await hasher.check_async(user_row['password_hash'], data.get('password'))
+    # Cost factor змінився - прозоро перераховуємо хеш, поки маємо відкритий пароль
+    if valid and hasher.needs_rehash(user_row['password_hash']):
+        try:
+            new_hash = await hasher.hash_async(data.get('password'))
+            await user_repo.update_password_hash(user_row['id'], new_hash)
+        except HasherBusy:
+            pass  # перерахуємо при наступному логіні
+    with flask_app.app_context():
+        return api_response(*api_contract.login_result(user_row if valid else None, wsgi.role_cache))
+
+
+class FaultInjectionMiddleware:
+    """
+    Ін'єкція збоїв для всіх маршрутів ASGI-режиму, включно з переданими у Flask.
+    Затримка - asyncio.sleep: запит чекає, не займаючи ні потоку, ні воркера.
+    """
+
+    def __init__(self, app, injector):
+        self.app = app
+        self.injector = injector
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        fault = self.injector.decide(scope['method'], scope['path'])
+        if fault is None:
+            return await self.app(scope, receive, send)
+
+        record_fault(fault)
+        if fault.delay:
+            await asyncio.sleep(fault.delay)
+        if fault.status is None:
+            return await self.app(scope, receive, send)
+
+        request_id = Headers(scope=scope).get('x-request-id') or str(uuid.uuid4())
+        token = request_id_var.set(request_id)
+        try:
+            response = error_response(fault.status, fault.error_name, "FAULT_INJECTED",
+                                      f"Injected by fault profile '{fault.rule.path}'",
+                                      headers={"X-Request-Id": request_id})
+        finally:
+            request_id_var.reset(token)
+        await response(scope, receive, send)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(_app):
+    yield
+    shutdown_db_executor()
+    wsgi.password_hasher.shutdown()
+
+
+# Усе, що не збіглося з async-маршрутами (включно з методами, яких тут немає), обробляє Flask
+routes.append(Mount('/', app=WSGIMiddleware(flask_app, workers=WSGI_WORKERS)))
+
+middleware = [Middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_methods=["*"],
+    allow_headers=wsgi.CORS_ALLOW_HEADERS,
+    expose_headers=wsgi.CORS_EXPOSE_HEADERS,
+)]
+if fault_injector is not None:  # вимкнена ін'єкція - жодного шару в конвеєрі
+    middleware.append(Middleware(FaultInjectionMiddleware, injector=fault_injector))
+
+application = Starlette(routes=routes, lifespan=lifespan, middleware=middleware)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    migrate(flask_app.config["DATABASE"])
+    uvicorn.run(application, host='0.0.0.0', port=int(os.getenv("PORT", "5000")))
@@ -1,10 +1,14 @@
 class RoadSign:
-    def __init__(self, id: int, name: str, category: str, description: str = None, image_url: str = None):
+    __slots__ = ('id', 'name', 'category', 'description', 'image_url', 'thumbnail_url')
+
+    def __init__(self, id: int, name: str, category: str, description: str = None, image_url: str = None,
+                 thumbnail_url: str = None):
         self.id = id
         self.name = name
         self.category = category
         self.description = description
         self.image_url = image_url
+        self.thumbnail_url = thumbnail_url  # мініатюра для списків; повнорозмірне - лише в деталях
 
     def update_description(self, new_description: str):
         """Оновити опис дорожнього знака"""
@@ -14,27 +18,40 @@ class RoadSign:
         """Змінити категорію знака"""
         self.category = new_category
 
-def to_dict(self):
+    def to_dict(self):
         """Конвертує об'єкт в словник для JSON-серіалізації"""
         return {
             'id': self.id,
             'name': self.name,
             'category': self.category,
             'description': self.description,
-            'image_url': self.image_url
+            'image_url': self.image_url,
+            'thumbnail_url': self.thumbnail_url
         }
 
 
 class SignCategory:
-    def __init__(self, name: str, description: str):
+    __slots__ = ('name', 'description', 'signs', 'sign_count')
+
+    def __init__(self, name: str, description: str = None, sign_count: int = 0):
         self.name = name
         self.description = description
         self.signs = []  # Список знаків у цій категорії
+        self.sign_count = sign_count  # з індексу категорій, навіть якщо самі знаки не завантажені
 
     def add_sign(self, sign: RoadSign):
         """Додати знак до категорії"""
         self.signs.append(sign)
+        self.sign_count += 1
 
     def get_signs_count(self) -> int:
         """Отримати кількість знаків у категорії"""
-        return len(self.signs)
\ No newline at end of file
+        return self.sign_count
+
+    def to_dict(self):
+        """Конвертує категорію в словник для JSON-серіалізації (без самих знаків)"""
+        return {
+            'name': self.name,
+            'description': self.description,
+            'sign_count': self.sign_count
+        }
@@ -1,4 +1,6 @@
 class User:
+    __slots__ = ('id', 'username', 'email', 'role')
+
     def __init__(self, id: int, username: str, email: str = None, role: str = "guest"):
         self.id = id
         self.username = username
@@ -25,6 +27,8 @@ class User:
 
 
 class Admin(User):
+    __slots__ = ()
+
     def __init__(self, id: int, username: str, email: str = None):
         super().__init__(id, username, email, "admin")
 
@@ -0,0 +1,45 @@
+"""
+Production-запуск: gunicorn -c gunicorn.conf.py
+
+Застосунок імпортується один раз у master (preload_app), воркери отримують його через fork.
+Міграції виконуються один раз на розгортання (on_starting), а телеметрія і прогрів кешів -
+у кожному воркері після fork (post_worker_init), до того як він почне приймати запити.
+"""
+import os
+import shutil
+
+# create_app() у master не запускає init_worker - це зробить кожен воркер
+os.environ.setdefault("APP_PRELOAD", "1")
+
+# Метрики воркерів агрегуються через файли (prometheus_client multiprocess mode)
+_metrics_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+if _metrics_dir:
+    shutil.rmtree(_metrics_dir, ignore_errors=True)
+    os.makedirs(_metrics_dir, exist_ok=True)
+
+wsgi_app = "wsgi:create()"  # create_app() і вимір тривалості імпорту app.py
+preload_app = True
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+timeout = 30
+
+
+def on_starting(server):
+    from repositories.migrations import migrate
+
+    applied = migrate(server.app.wsgi().config["DATABASE"])
+    server.log.info("Migrations: %s", ", ".join(applied) if applied else "schema is up to date")
+
+
+def post_worker_init(worker):
+    from app import init_worker
+
+    init_worker(worker.wsgi)
+
+
+def child_exit(server, worker):
+    if _metrics_dir:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,66 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .base import POOL_SIZE
+
+# Потоків не більше, ніж з'єднань у пулі: запит у екзекуторі ніколи не чекає на з'єднання
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", str(POOL_SIZE)))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """Окремий екзекутор для SQLite: блокуючі виклики не займають потоки event loop за замовчуванням"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="db")
+        return _executor
+
+
+def shutdown_db_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+async def run_db(fn, *args, **kwargs):
+    """Виконати синхронний виклик репозиторію в DB-екзекуторі (з контекстом трейсингу викликача)"""
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, fn, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(get_db_executor(), call)
+
+
+def _take(iterator, count: int) -> list:
+    items = []
+    for item in iterator:
+        items.append(item)
+        if len(items) >= count:
+            break
+    return items
+
+
+async def iterate(iterable, batch_size: int = 1):
+    """
+    Асинхронний ітератор поверх синхронного генератора (курсор БД, NDJSON/CSV-експорт).
+    Елементи забираються з екзекутора партіями, тож на рядок не припадає окремого переходу між потоками.
+    """
+    iterator = iter(iterable)
+    try:
+        while True:
+            items = await run_db(_take, iterator, batch_size)
+            if not items:
+                return
+            for item in items:
+                yield item
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            await run_db(close)  # повертає з'єднання генератора в пул
@@ -0,0 +1,54 @@
+from .async_base import iterate, run_db
+from .road_sign import RoadSignRepository, SignQuery
+from domain.catalog.road_sign import RoadSign
+
+
+class AsyncRoadSignRepository:
+    """
+    Асинхронна версія RoadSignRepository для ASGI-режиму.
+    SQL не дублюється: кожен метод виконує синхронний репозиторій у DB-екзекуторі,
+    тож версія каталогу, listeners та інструментація спільні з WSGI-застосунком.
+    """
+
+    def __init__(self, repo: RoadSignRepository = None):
+        self.repo = repo or RoadSignRepository()
+
+    def get_version(self) -> int:
+        return self.repo.get_version()
+
+    async def get_all(self) -> list[RoadSign]:
+        return await run_db(self.repo.get_all)
+
+    async def get_all_json(self, category: str = None) -> bytes:
+        return await run_db(self.repo.get_all_json, category)
+
+    async def find_json(self, query: SignQuery) -> tuple[bytes, int | None]:
+        return await run_db(self.repo.find_json, query)
+
+    async def get_by_category(self, category: str) -> list[RoadSign]:
+        return await run_db(self.repo.get_by_category, category)
+
+    async def get_page(self, limit: int, after: int = None, category: str = None) -> list[RoadSign]:
+        return await run_db(self.repo.get_page, limit, after, category)
+
+    def iter_all(self, category: str = None, batch_size: int = 500):
+        """Асинхронний генератор знаків (dict); з курсора читається по batch_size рядків за перехід"""
+        return iterate(self.repo.iter_all(category, batch_size), batch_size)
+
+    async def search(self, text: str, limit: int = 20, offset: int = 0) -> list[RoadSign]:
+        return await run_db(self.repo.search, text, limit, offset)
+
+    async def get_by_id(self, sign_id: int) -> RoadSign | None:
+        return await run_db(self.repo.get_by_id, sign_id)
+
+    async def create(self, name: str, category: str, description: str = None) -> RoadSign:
+        return await run_db(self.repo.create, name, category, description)
+
+    async def create_many(self, rows: list[tuple]) -> list[int]:
+        return await run_db(self.repo.create_many, rows)
+
+    async def update(self, sign_id: int, data: dict) -> RoadSign | None:
+        return await run_db(self.repo.update, sign_id, data)
+
+    async def delete(self, sign_id: int) -> int:
+        return await run_db(self.repo.delete, sign_id)
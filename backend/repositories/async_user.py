@@ -0,0 +1,37 @@
+from .async_base import iterate, run_db
+from .user import UserRepository
+from domain.users.user import User
+
+
+class AsyncUserRepository:
+    """Асинхронна версія UserRepository: синхронні методи виконуються в DB-екзекуторі"""
+
+    def __init__(self, repo: UserRepository = None):
+        self.repo = repo or UserRepository()
+
+    async def get_all(self) -> list[User]:
+        return await run_db(self.repo.get_all)
+
+    async def get_page(self, limit: int, after: int = None) -> list[User]:
+        return await run_db(self.repo.get_page, limit, after)
+
+    def iter_all(self, batch_size: int = 500):
+        return iterate(self.repo.iter_all(batch_size), batch_size)
+
+    async def get_by_id(self, user_id: int) -> User | None:
+        return await run_db(self.repo.get_by_id, user_id)
+
+    async def get_role_version(self, user_id: int) -> tuple[str, int] | None:
+        return await run_db(self.repo.get_role_version, user_id)
+
+    async def get_by_username_for_auth(self, username: str) -> dict | None:
+        return await run_db(self.repo.get_by_username_for_auth, username)
+
+    async def create(self, username: str, hashed_password: str, role: str = 'guest') -> None:
+        await run_db(self.repo.create, username, hashed_password, role)
+
+    async def update_password_hash(self, user_id: int, password_hash: str) -> None:
+        await run_db(self.repo.update_password_hash, user_id, password_hash)
+
+    async def update_role(self, user_id: int, new_role: str) -> None:
+        await run_db(self.repo.update_role, user_id, new_role)
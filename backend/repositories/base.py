@@ -1,11 +1,255 @@
 import sqlite3
 import os
+import queue
+import threading
+import time
+
+try:
+    from flask import g, has_app_context
+except ImportError:  # репозиторії можна використовувати і без Flask (скрипти, тести)
+    g = None
+
+    def has_app_context():
+        return False
+
+from .instrumentation import record_connection_wait
+from .postgres import PostgresPool, is_postgres_url, psycopg
+from . import query_stats
+from .write_queue import GroupCommitWriter
 
 # Визначаємо шлях до БД відносно файлу base.py
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATABASE = os.path.join(BASE_DIR, 'data', 'road_signs.db')
 
+# --- Налаштування пулу ---
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+STATEMENT_CACHE_SIZE = 256  # кеш підготовлених запитів sqlite3 на кожне з'єднання
+# Мутації SQLite через одного писача з груповим commit (repositories/write_queue.py); 0 - кожна у своїй транзакції
+WRITE_QUEUE_ENABLED = os.getenv("WRITE_QUEUE", "1") != "0"
+
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",  # читачі не блокують писача
+    "PRAGMA synchronous = NORMAL",  # у режимі WAL цього достатньо для надійності
+    "PRAGMA cache_size = -16000",  # ~16 МБ сторінкового кешу
+    "PRAGMA mmap_size = 134217728",  # 128 МБ memory-mapped I/O
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+)
+
+
+# Помилки БД обох бекендів (для обробників, яким байдуже, SQLite це чи PostgreSQL)
+DB_ERRORS = (sqlite3.Error,) if psycopg is None else (sqlite3.Error, psycopg.Error)
+
+
+class PoolTimeoutError(RuntimeError):
+    """Усі з'єднання пулу зайняті довше, ніж POOL_TIMEOUT"""
+
+
+class PooledConnection:
+    """
+    Обгортка над sqlite3.Connection.
+    close() не закриває з'єднання, а повертає його в пул,
+    тому код репозиторіїв (get_db_connection() ... conn.close()) лишається незмінним.
+    """
+
+    def __init__(self, pool, conn: sqlite3.Connection, request_scoped: bool = False):
+        self._pool = pool
+        self._conn = conn
+        self._request_scoped = request_scoped
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+    def close(self):
+        # З'єднання запиту повертається в пул лише в teardown (release_request_connection)
+        if self._request_scoped:
+            return
+        self.release()
+
+    def release(self):
+        if self._conn is not None:
+            self._pool.release(self._conn)
+            self._conn = None
+
+
+class ConnectionPool:
+    """Обмежений пул SQLite-з'єднань з WAL та налаштованими PRAGMA"""
+    dialect = 'sqlite'
+
+    def __init__(self, database: str, size: int = POOL_SIZE, timeout: float = POOL_TIMEOUT):
+        self.database = database
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=size)  # LIFO - "гарячі" з'єднання використовуються першими
+        self._created = 0
+        self._lock = threading.Lock()
+        # Власне з'єднання писача не займає місця в пулі читачів
+        self.writer = GroupCommitWriter(self._connect) if WRITE_QUEUE_ENABLED else None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.database,
+            check_same_thread=False,  # з'єднання може обслуговувати різні потоки, але не одночасно
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        started = time.perf_counter()
+        conn = self._acquire()
+        record_connection_wait(time.perf_counter() - started)
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+
+        if create:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise PoolTimeoutError(f"No free database connection after {self.timeout}s")
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        # Незавершену транзакцію не можна віддавати наступному користувачу
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put_nowait(conn)
+
+    def warm(self, count: int = None) -> None:
+        """Відкрити з'єднання наперед (PRAGMA, mmap), щоб перші запити не платили за підключення"""
+        conns = []
+        try:
+            for _ in range(min(count or self.size, self.size)):
+                conns.append(self.acquire())
+                conns[-1].execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+        finally:
+            for conn in conns:
+                self.release(conn)
+
+    def close_all(self) -> None:
+        """Закрити всі вільні з'єднання і з'єднання писача (наприклад, перед видаленням файлу БД)"""
+        if self.writer is not None:
+            self.writer.close()
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+
+_pool = ConnectionPool(DATABASE)
+
+
+def get_pool() -> ConnectionPool | PostgresPool:
+    return _pool
+
+
+def get_dialect() -> str:
+    """'sqlite' або 'postgres' - для запитів, які в бекендах відрізняються"""
+    return _pool.dialect
+
+
+def configure_pool(database: str, size: int = POOL_SIZE) -> ConnectionPool | PostgresPool:
+    """
+    Перенаправити пул на іншу БД: шлях до файлу SQLite або postgresql://-URL
+    (вибір бекенду конфігурацією застосунку, бенчмарки, тести)
+    """
+    global _pool
+    if is_postgres_url(database):
+        pool = PostgresPool(database, size, POOL_TIMEOUT)
+    else:
+        pool = ConnectionPool(database, size)
+    previous, _pool = _pool, pool
+    previous.close_all()
+    return _pool
+
+
+def current_query_stats():
+    """QueryStats поточного запиту: Flask - g.query_stats, ASGI і тести - контекстна змінна"""
+    stats = g.get('query_stats') if has_app_context() else None
+    return stats if stats is not None else query_stats.current()
+
+
+def _traced(conn, stats):
+    """Без обліку і логу повільних запитів з'єднання не обгортається - жодних витрат на execute"""
+    if stats is None and query_stats.SLOW_QUERY_MS is None:
+        return conn
+    return query_stats.TracedConnection(conn, stats, query_stats.SLOW_QUERY_MS)
+
+
 def get_db_connection():
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
-    return conn
\ No newline at end of file
+    """
+    Повертає з'єднання з пулу (sqlite3.Connection або PgConnection з тим самим інтерфейсом).
+    Всередині Flask-запиту всі виклики отримують одне й те саме з'єднання (через g),
+    поза запитом - окреме з'єднання, яке повертається в пул при close().
+    """
+    if has_app_context():
+        conn = g.get('_db_conn')
+        if conn is None:
+            conn = _traced(PooledConnection(_pool, _pool.acquire(), request_scoped=True), current_query_stats())
+            g._db_conn = conn
+        return conn
+    return _traced(PooledConnection(_pool, _pool.acquire()), current_query_stats())
+
+
+def run_write(fn):
+    """
+    Виконати мутацію fn(conn) в транзакції і повернути її результат (fn сам не комітить).
+    SQLite: через писача пулу, разом з іншими мутаціями, що надійшли одночасно (group commit).
+    PostgreSQL (або WRITE_QUEUE=0): одразу, у власній транзакції на з'єднанні з пулу.
+    """
+    writer = getattr(_pool, 'writer', None)
+    if writer is not None:
+        stats = current_query_stats()
+        if stats is not None or query_stats.SLOW_QUERY_MS is not None:
+            # Запити мутації виконує потік-писач, але зараховуються запиту, що її подав
+            return writer.submit(lambda conn: fn(_traced(conn, stats)))
+        return writer.submit(fn)
+    conn = get_db_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        result = fn(conn)
+        conn.commit()
+        return result
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def release_request_connection(exc=None):
+    """Teardown-хук Flask: повертає з'єднання запиту в пул"""
+    conn = g.pop('_db_conn', None) if has_app_context() else None
+    if conn is not None:
+        conn.release()
@@ -0,0 +1,15 @@
+from .base import get_db_connection
+from .instrumentation import instrumented
+from domain.catalog.road_sign import SignCategory
+
+
+class CategoryRepository:
+    """Читання матеріалізованого індексу категорій (таблицю підтримують тригери road_signs)"""
+
+    @instrumented("categories.get_all")
+    def get_all(self) -> list[SignCategory]:
+        """Усі непорожні категорії з кількістю знаків, за назвою"""
+        conn = get_db_connection()
+        rows = conn.execute("SELECT name, sign_count FROM categories ORDER BY name").fetchall()
+        conn.close()
+        return [SignCategory(name=row['name'], sign_count=row['sign_count']) for row in rows]
@@ -0,0 +1,146 @@
+import functools
+import inspect
+import time
+
+try:
+    from opentelemetry import trace
+    tracer = trace.get_tracer("road-signs.repositories")
+except ImportError:  # без OpenTelemetry репозиторії працюють без спанів
+    tracer = None
+
+try:
+    from prometheus_client import Histogram
+except ImportError:  # без prometheus_client метрики - no-op
+    Histogram = None
+
+
+class NoopMetric:
+    """Заглушка метрики, коли prometheus_client не встановлено"""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, *args, **kwargs):
+        pass
+
+    def inc(self, *args, **kwargs):
+        pass
+
+    def dec(self, *args, **kwargs):
+        pass
+
+    def set(self, *args, **kwargs):
+        pass
+
+
+def _histogram(name, documentation, labelnames=(), buckets=None):
+    if Histogram is None:
+        return NoopMetric()
+    kwargs = {'buckets': buckets} if buckets else {}
+    return Histogram(name, documentation, labelnames, **kwargs)
+
+
+DB_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+DB_STATEMENT_DURATION = _histogram(
+    'db_statement_duration_ms', 'Repository statement duration, ms', ['statement'], DB_BUCKETS_MS)
+DB_STATEMENT_ROWS = _histogram(
+    'db_statement_rows', 'Rows returned or affected by a repository statement', ['statement'],
+    (0, 1, 10, 100, 1000, 10_000, 100_000, 1_000_000))
+DB_CONNECTION_WAIT = _histogram(
+    'db_connection_wait_ms', 'Time spent waiting for a pooled connection, ms', (), DB_BUCKETS_MS)
+
+DB_WRITE_BATCH_SIZE = _histogram(
+    'db_write_batch_size', 'Mutations committed together by the group-commit writer', (),
+    (1, 2, 4, 8, 16, 32, 64, 128))
+DB_WRITE_BATCH_DURATION = _histogram(
+    'db_write_batch_duration_ms', 'Group-commit transaction duration, ms', (), DB_BUCKETS_MS)
+
+
+# Значення атрибута db.system (семантичні конвенції OpenTelemetry) для get_dialect()
+DB_SYSTEMS = {'sqlite': 'sqlite', 'postgres': 'postgresql'}
+
+
+def _db_system() -> str:
+    from .base import get_dialect  # base імпортує цей модуль
+
+    return DB_SYSTEMS[get_dialect()]
+
+
+def _row_count(result) -> int:
+    if result is None:
+        return 0
+    if isinstance(result, int) and not isinstance(result, bool):
+        return result  # наприклад, delete() повертає rowcount
+    if isinstance(result, list):
+        return len(result)
+    return 1
+
+
+def record_connection_wait(seconds: float) -> None:
+    """Викликається пулом: скільки чекали на вільне з'єднання"""
+    wait_ms = seconds * 1000
+    DB_CONNECTION_WAIT.observe(wait_ms)
+    if tracer is not None:
+        span = trace.get_current_span()
+        if span.is_recording():
+            span.set_attribute('db.connection_wait_ms', wait_ms)
+
+
+def record_write_batch(size: int, seconds: float) -> None:
+    """Викликається писачем групового commit після кожної транзакції"""
+    DB_WRITE_BATCH_SIZE.observe(size)
+    DB_WRITE_BATCH_DURATION.observe(seconds * 1000)
+
+
+def instrumented(statement: str):
+    """
+    Декоратор методу репозиторію: OpenTelemetry-спан і гістограми тривалості
+    та кількості рядків з назвою операції (наприклад, "road_signs.get_by_id").
+    Для генераторів спан триває до вичерпання, а рядки рахуються по мірі видачі.
+    """
+    def wrapper(fn):
+        def finish(span, started, rows):
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            DB_STATEMENT_DURATION.labels(statement).observe(elapsed_ms)
+            DB_STATEMENT_ROWS.labels(statement).observe(rows)
+            if span is not None:
+                span.set_attribute('db.row_count', rows)
+                span.end()
+
+        def start_span():
+            if tracer is None:
+                return None
+            return tracer.start_span(f"db {statement}", attributes={
+                'db.system': _db_system(), 'db.operation.name': statement
+            })
+
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def generator(*args, **kwargs):
+                span, started, rows = start_span(), time.perf_counter(), 0
+                try:
+                    for item in fn(*args, **kwargs):
+                        rows += 1
+                        yield item
+                finally:
+                    finish(span, started, rows)
+            return generator
+
+        @functools.wraps(fn)
+        def method(*args, **kwargs):
+            span, started = start_span(), time.perf_counter()
+            rows = 0
+            try:
+                if span is None:
+                    result = fn(*args, **kwargs)
+                else:
+                    with trace.use_span(span, end_on_exit=False):
+                        result = fn(*args, **kwargs)
+                rows = _row_count(result)
+                return result
+            finally:
+                finish(span, started, rows)
+        return method
+
+    return wrapper
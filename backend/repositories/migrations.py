@@ -0,0 +1,147 @@
+import argparse
+import os
+import sqlite3
+
+from . import postgres_schema
+from .base import DATABASE
+from .postgres import connect as connect_postgres, is_postgres_url
+from .schema import (add_sign_images, create_baseline_schema, create_browse_indexes, create_category_index,
+                     create_change_log)
+
+
+def _seed_initial_data(cursor) -> None:
+    """Демонстраційні знаки та адміністратор - лише в порожню БД"""
+    cursor.execute("SELECT COUNT(*) FROM road_signs")
+    if cursor.fetchone()[0] == 0:
+        signs = [('Стоп', 'Заборонні', 'Зупинитися перед знаком'),
+                 ('Головна дорога', 'Пріоритету', 'Перевага на перехресті')]
+        cursor.executemany("INSERT INTO road_signs (name, category, description) VALUES (?, ?, ?)", signs)
+
+    cursor.execute("SELECT COUNT(*) FROM users")
+    if cursor.fetchone()[0] == 0:
+        import bcrypt  # потрібен лише тут, один раз на розгортання
+
+        rounds = int(os.getenv("BCRYPT_LOG_ROUNDS", "12"))
+        password_hash = bcrypt.hashpw(b'admin123', bcrypt.gensalt(rounds)).decode('utf-8')
+        cursor.execute("INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
+                       ('admin', password_hash, 'admin'))
+
+
+# (версія, назва, функція(cursor)). Нові міграції лише додаються в кінець, наявні не змінюються.
+# Версія 1 - заморожена схема, що раніше створювалась init_database: вона ідемпотентна,
+# тож бази без PRAGMA user_version (створені до міграцій) проходять її без змін.
+MIGRATIONS = (
+    (1, 'initial_schema', create_baseline_schema),
+    (2, 'seed_initial_data', _seed_initial_data),
+    (3, 'category_index', create_category_index),
+    (4, 'sign_images', add_sign_images),
+    (5, 'change_log', create_change_log),
+    (6, 'browse_indexes', create_browse_indexes),
+)
+
+
+# PostgreSQL-бази створюються вже з повною схемою, тож історія версій у них своя;
+# postgres_schema.SCHEMA_DDL - так само заморожена версія 1.
+# _seed_initial_data спільна: запити з ? перекладає PgConnection
+POSTGRES_MIGRATIONS = (
+    (1, 'initial_schema', postgres_schema.create_schema),
+    (2, 'seed_initial_data', _seed_initial_data),
+    (3, 'browse_indexes', postgres_schema.create_browse_indexes),
+)
+
+# Ключ pg_advisory_xact_lock: міграції з кількох вузлів одночасно виконуються по черзі
+POSTGRES_MIGRATION_LOCK = 7_316_001
+
+
+def get_schema_version(conn) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(database: str = DATABASE, migrations=None) -> list[str]:
+    """
+    Застосувати нові міграції до SQLite-файлу або PostgreSQL (postgresql://-URL);
+    повертає назви застосованих.
+    """
+    if is_postgres_url(database):
+        return _migrate_postgres(database, migrations or POSTGRES_MIGRATIONS)
+    return _migrate_sqlite(database, migrations or MIGRATIONS)
+
+
+def _migrate_sqlite(database: str, migrations) -> list[str]:
+    """
+    Версія схеми - PRAGMA user_version.
+    Усе виконується в одній IMMEDIATE-транзакції: якщо кілька процесів стартують одночасно,
+    перший застосовує міграції, решта дочікуються його і бачать актуальну версію.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(database)), exist_ok=True)
+    target = migrations[-1][0] if migrations else 0
+    conn = sqlite3.connect(database, timeout=30, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode = WAL")
+        if get_schema_version(conn) >= target:
+            return []
+
+        applied = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            current = get_schema_version(conn)  # перечитуємо під блокуванням запису
+            cursor = conn.cursor()
+            for version, name, apply in migrations:
+                if version > current:
+                    apply(cursor)
+                    conn.execute(f"PRAGMA user_version = {int(version)}")
+                    applied.append(name)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return applied
+    finally:
+        conn.close()
+
+
+def _migrate_postgres(database: str, migrations) -> list[str]:
+    """
+    Версії - у таблиці schema_migrations. DDL у PostgreSQL транзакційний:
+    міграції застосовуються разом або жодна, а advisory lock серіалізує одночасні старти вузлів.
+    """
+    conn = connect_postgres(database)
+    try:
+        applied = []
+        conn.execute("BEGIN")
+        try:
+            conn.execute("SELECT pg_advisory_xact_lock(?)", (POSTGRES_MIGRATION_LOCK,))
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                )""")
+            current = conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations").fetchone()[0]
+            cursor = conn.cursor()
+            for version, name, apply in migrations:
+                if version > current:
+                    apply(cursor)
+                    conn.execute("INSERT INTO schema_migrations (version, name) VALUES (?, ?)", (version, name))
+                    applied.append(name)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return applied
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Застосувати міграції схеми (SQLite або PostgreSQL)")
+    parser.add_argument('--database', default=os.getenv('DATABASE_URL') or os.getenv('DATABASE_PATH', DATABASE),
+                        help="postgresql://-URL або файл SQLite "
+                             "(за замовчуванням $DATABASE_URL, $DATABASE_PATH або data/road_signs.db)")
+    args = parser.parse_args()
+    applied = migrate(args.database)
+    print(f"Applied: {', '.join(applied)}" if applied else "Schema is up to date")
+
+
+if __name__ == '__main__':
+    main()
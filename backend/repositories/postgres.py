@@ -0,0 +1,175 @@
+import functools
+import os
+import time
+
+try:
+    import psycopg
+    from psycopg_pool import ConnectionPool as PsycopgPool, PoolTimeout
+except ImportError:  # PostgreSQL - опційний бекенд, для SQLite драйвер не потрібен
+    psycopg = PsycopgPool = PoolTimeout = None
+
+from .instrumentation import record_connection_wait
+
+# 0 - кожен запит одразу готується на сервері (PREPARE) і далі виконується без повторного планування.
+# За PgBouncer у transaction mode підготовлені запити треба вимкнути: PG_PREPARE_THRESHOLD=none
+_threshold = os.getenv("PG_PREPARE_THRESHOLD", "0")
+PREPARE_THRESHOLD = None if _threshold.lower() == 'none' else int(_threshold)
+PG_POOL_MIN_SIZE = int(os.getenv("PG_POOL_MIN_SIZE", "1"))
+
+
+def is_postgres_url(database: str) -> bool:
+    return database.startswith(('postgres://', 'postgresql://'))
+
+
+@functools.lru_cache(maxsize=512)
+def translate_sql(sql: str) -> str:
+    """
+    Запит репозиторію (стиль sqlite3) -> psycopg: плейсхолдери ? -> %s, літеральний % -> %%,
+    BEGIN IMMEDIATE -> BEGIN (у PostgreSQL блокування беруть самі рядки).
+    Запити репозиторіїв не містять ? всередині рядкових літералів.
+    """
+    if sql.strip().upper() == 'BEGIN IMMEDIATE':
+        return 'BEGIN'
+    return sql.replace('%', '%%').replace('?', '%s')
+
+
+class PgRow(tuple):
+    """Рядок, як sqlite3.Row: доступ і за індексом, і за назвою колонки"""
+
+    def __new__(cls, index: dict, values):
+        row = super().__new__(cls, values)
+        row._index = index
+        return row
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            key = self._index[key]
+        return super().__getitem__(key)
+
+    def keys(self):
+        return list(self._index)
+
+
+def _row_factory(cursor):
+    index = {column.name: i for i, column in enumerate(cursor.description or ())}
+    return lambda values: PgRow(index, values)
+
+
+class PgCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def execute(self, sql: str, params=()):
+        self._cursor.execute(translate_sql(sql), params)
+        return self
+
+    def executemany(self, sql: str, seq_of_params):
+        self._cursor.executemany(translate_sql(sql), seq_of_params)
+        return self
+
+
+class PgConnection:
+    """
+    psycopg-з'єднання з інтерфейсом sqlite3.Connection, яким користуються репозиторії:
+    execute/executemany/cursor/commit/rollback/in_transaction.
+    Працює в autocommit: читання не лишають відкритих транзакцій, BEGIN відкриває явну.
+    """
+    dialect = 'postgres'
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def execute(self, sql: str, params=()):
+        return PgCursor(self._conn.cursor()).execute(sql, params)
+
+    def executemany(self, sql: str, seq_of_params):
+        return PgCursor(self._conn.cursor()).executemany(sql, seq_of_params)
+
+    def cursor(self):
+        return PgCursor(self._conn.cursor())
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    @property
+    def in_transaction(self) -> bool:
+        return self._conn.info.transaction_status != psycopg.pq.TransactionStatus.IDLE
+
+    def close(self):
+        self._conn.close()
+
+
+def _connect_kwargs() -> dict:
+    return {'autocommit': True, 'row_factory': _row_factory, 'prepare_threshold': PREPARE_THRESHOLD}
+
+
+def connect(database: str) -> PgConnection:
+    """Окреме з'єднання поза пулом (міграції, скрипти)"""
+    if psycopg is None:
+        raise RuntimeError("PostgreSQL backend requires psycopg and psycopg-pool (pip install -r requirements.txt)")
+    return PgConnection(psycopg.connect(database, **_connect_kwargs()))
+
+
+class PostgresPool:
+    """
+    Пул з'єднань PostgreSQL (psycopg_pool) з тим самим інтерфейсом, що й ConnectionPool для SQLite.
+    Пул відкривається при першому acquire: create_app і імпорт не підключаються до БД.
+    """
+    dialect = 'postgres'
+
+    def __init__(self, database: str, size: int, timeout: float):
+        if PsycopgPool is None:
+            raise RuntimeError("PostgreSQL backend requires psycopg and psycopg-pool (pip install -r requirements.txt)")
+        self.database = database
+        self.size = size
+        self.timeout = timeout
+        self._pool = PsycopgPool(database, min_size=min(PG_POOL_MIN_SIZE, size), max_size=size,
+                                 timeout=timeout, kwargs=_connect_kwargs(), open=False,
+                                 name="road-signs")
+        self._opened = False
+
+    def _open(self) -> None:
+        if not self._opened:
+            self._pool.open()
+            self._opened = True
+
+    def acquire(self) -> PgConnection:
+        from .base import PoolTimeoutError  # base імпортує цей модуль лише для PostgreSQL
+
+        started = time.perf_counter()
+        self._open()
+        try:
+            conn = self._pool.getconn(timeout=self.timeout)
+        except PoolTimeout:
+            raise PoolTimeoutError(f"No free database connection after {self.timeout}s")
+        record_connection_wait(time.perf_counter() - started)
+        return PgConnection(conn)
+
+    def release(self, conn: PgConnection) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+        self._pool.putconn(conn._conn)
+
+    def warm(self, count: int = None) -> None:
+        conns = []
+        try:
+            for _ in range(min(count or self.size, self.size)):
+                conns.append(self.acquire())
+                conns[-1].execute("SELECT 1").fetchall()
+        finally:
+            for conn in conns:
+                self.release(conn)
+
+    def close_all(self) -> None:
+        if self._opened:
+            self._pool.close()
+            self._opened = False
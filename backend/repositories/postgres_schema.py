@@ -0,0 +1,90 @@
+# Схема PostgreSQL - та сама модель, що й repositories/schema.py для SQLite:
+# повнотекстовий індекс, лічильники категорій і журнал змін підтримуються в транзакції запису.
+
+# Вага A - назва, B - опис (аналог bm25(10.0, 1.0) у FTS5). Вираз має збігатися із запитом пошуку,
+# щоб планувальник використав GIN-індекс
+SEARCH_VECTOR = ("(setweight(to_tsvector('simple', name), 'A') || "
+                 "setweight(to_tsvector('simple', coalesce(description, '')), 'B'))")
+
+SCHEMA_DDL = (
+    '''CREATE TABLE IF NOT EXISTS road_signs (
+        id BIGSERIAL PRIMARY KEY,
+        name TEXT NOT NULL,
+        category TEXT NOT NULL,
+        description TEXT,
+        image_hash TEXT
+    )''',
+    '''CREATE INDEX IF NOT EXISTS idx_road_signs_category_id ON road_signs (category, id)''',
+    f'''CREATE INDEX IF NOT EXISTS idx_road_signs_search ON road_signs USING GIN ({SEARCH_VECTOR})''',
+    '''CREATE TABLE IF NOT EXISTS users (
+        id BIGSERIAL PRIMARY KEY,
+        username TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        role TEXT DEFAULT 'guest',
+        role_version INTEGER NOT NULL DEFAULT 0,
+        created_at TIMESTAMPTZ DEFAULT now()
+    )''',
+    '''CREATE TABLE IF NOT EXISTS categories (
+        name TEXT PRIMARY KEY,
+        sign_count INTEGER NOT NULL DEFAULT 0
+    )''',
+    '''CREATE TABLE IF NOT EXISTS sign_changes (
+        version BIGSERIAL PRIMARY KEY,
+        sign_id BIGINT NOT NULL,
+        op TEXT NOT NULL CHECK (op IN ('upsert', 'delete')),
+        changed_at BIGINT NOT NULL DEFAULT EXTRACT(EPOCH FROM now())::BIGINT
+    )''',
+    '''CREATE INDEX IF NOT EXISTS idx_sign_changes_sign_id ON sign_changes (sign_id, version)''',
+    '''CREATE TABLE IF NOT EXISTS sign_changes_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        horizon BIGINT NOT NULL DEFAULT 0
+    )''',
+    '''INSERT INTO sign_changes_state (id, horizon) VALUES (1, 0) ON CONFLICT (id) DO NOTHING''',
+    # Один тригер на всі зміни road_signs: лічильники категорій + журнал змін
+    '''CREATE OR REPLACE FUNCTION road_signs_after_change() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO categories (name, sign_count) VALUES (NEW.category, 1)
+            ON CONFLICT (name) DO UPDATE SET sign_count = categories.sign_count + 1;
+            INSERT INTO sign_changes (sign_id, op) VALUES (NEW.id, 'upsert');
+        ELSIF TG_OP = 'UPDATE' THEN
+            IF OLD.category IS DISTINCT FROM NEW.category THEN
+                UPDATE categories SET sign_count = sign_count - 1 WHERE name = OLD.category;
+                DELETE FROM categories WHERE name = OLD.category AND sign_count <= 0;
+                INSERT INTO categories (name, sign_count) VALUES (NEW.category, 1)
+                ON CONFLICT (name) DO UPDATE SET sign_count = categories.sign_count + 1;
+            END IF;
+            INSERT INTO sign_changes (sign_id, op) VALUES (NEW.id, 'upsert');
+        ELSE
+            UPDATE categories SET sign_count = sign_count - 1 WHERE name = OLD.category;
+            DELETE FROM categories WHERE name = OLD.category AND sign_count <= 0;
+            INSERT INTO sign_changes (sign_id, op) VALUES (OLD.id, 'delete');
+        END IF;
+        RETURN NULL;
+    END
+    $$''',
+    '''CREATE OR REPLACE TRIGGER road_signs_after_change
+        AFTER INSERT OR UPDATE OR DELETE ON road_signs
+        FOR EACH ROW EXECUTE FUNCTION road_signs_after_change()''',
+)
+
+
+def create_schema(cursor) -> None:
+    """Створити всі таблиці, індекси та тригери (ідемпотентно, PostgreSQL 14+)"""
+    for statement in SCHEMA_DDL:
+        cursor.execute(statement)
+
+
+# Покривні індекси сітки каталогу (див. BROWSE_INDEX_DDL у schema.py): INCLUDE дає index-only scan
+# для проєкції без description
+BROWSE_INDEX_DDL = (
+    '''CREATE INDEX IF NOT EXISTS idx_road_signs_browse ON road_signs (category, id) INCLUDE (name, image_hash)''',
+    '''CREATE INDEX IF NOT EXISTS idx_road_signs_grid ON road_signs (id) INCLUDE (name, category, image_hash)''',
+    '''DROP INDEX IF EXISTS idx_road_signs_category_id''',
+)
+
+
+def create_browse_indexes(cursor) -> None:
+    """Покривні індекси сітки каталогу (ідемпотентно)"""
+    for statement in BROWSE_INDEX_DDL:
+        cursor.execute(statement)
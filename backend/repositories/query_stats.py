@@ -0,0 +1,126 @@
+import contextlib
+import contextvars
+import logging
+import os
+import threading
+import time
+
+# Поріг повільного запиту, мс; не задано - лог повільних запитів вимкнено
+SLOW_QUERY_MS = float(os.environ["SLOW_QUERY_MS"]) if os.getenv("SLOW_QUERY_MS") else None
+
+slow_query_log = logging.getLogger("road_signs.slow_queries")
+
+# Облік поза Flask-запитом: ASGI-обробники, query_budget() у тестах (run_db копіює контекст у екзекутор)
+_current = contextvars.ContextVar("query_stats", default=None)
+
+
+class QueryStats:
+    """Кількість SQL-запитів і сумарний час у БД для одного HTTP-запиту (або блоку query_budget)"""
+    __slots__ = ('request_id', 'statements', 'seconds', '_lock')
+
+    def __init__(self, request_id: str = None):
+        self.request_id = request_id
+        self.statements = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()  # мутації рахує ще й потік-писач
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.statements += 1
+            self.seconds += seconds
+
+
+class QueryBudgetExceeded(Exception):
+    """Маршрут (або блок коду в тесті) виконав більше SQL-запитів, ніж дозволяє його бюджет"""
+
+    def __init__(self, name: str, budget: int, statements: int):
+        super().__init__(f"{name} issued {statements} SQL statements, budget is {budget}")
+        self.budget = budget
+        self.statements = statements
+
+
+def current() -> QueryStats | None:
+    return _current.get()
+
+
+def activate(stats: QueryStats):
+    """Рахувати запити поточного контексту в stats; повертає токен для deactivate()"""
+    return _current.set(stats)
+
+
+def deactivate(token) -> None:
+    _current.reset(token)
+
+
+@contextlib.contextmanager
+def query_budget(budget: int, name: str = "block"):
+    """
+    Для тестів: QueryBudgetExceeded, якщо код усередині блоку виконав більше budget запитів.
+        with query_budget(1):
+            repo.update(sign_id, data)
+    """
+    stats = QueryStats()
+    token = activate(stats)
+    try:
+        yield stats
+    finally:
+        deactivate(token)
+    if stats.statements > budget:
+        raise QueryBudgetExceeded(name, budget, stats.statements)
+
+
+def query_plan(conn, sql: str, params) -> str | None:
+    """EXPLAIN QUERY PLAN того самого запиту (лише SQLite: EXPLAIN у PostgreSQL зламав би транзакцію при помилці)"""
+    if getattr(conn, 'dialect', 'sqlite') != 'sqlite':
+        return None
+    try:
+        rows = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    except Exception:  # BEGIN/PRAGMA/DDL тощо не мають плану
+        return None
+    return "; ".join(row[-1] for row in rows) or None
+
+
+class TracedConnection:
+    """
+    Обгортка з'єднання, яку повертає get_db_connection, коли ввімкнено облік запитів або лог
+    повільних запитів: рахує execute/executemany у QueryStats, а запити, довші за slow_ms,
+    пише в лог road_signs.slow_queries разом з EXPLAIN QUERY PLAN.
+    """
+
+    def __init__(self, conn, stats: QueryStats = None, slow_ms: float = None):
+        self._conn = conn
+        self._stats = stats
+        self._slow_ms = slow_ms
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+    def execute(self, sql: str, params=()):
+        started = time.perf_counter()
+        try:
+            return self._conn.execute(sql, params)
+        finally:
+            self._record(sql, params, time.perf_counter() - started)
+
+    def executemany(self, sql: str, seq_of_params):
+        started = time.perf_counter()
+        try:
+            return self._conn.executemany(sql, seq_of_params)
+        finally:
+            self._record(sql, None, time.perf_counter() - started)
+
+    def _record(self, sql: str, params, seconds: float) -> None:
+        if self._stats is not None:
+            self._stats.record(seconds)
+        if self._slow_ms is None or seconds * 1000 < self._slow_ms:
+            return
+        # Параметри не логуються (хеші паролів); для executemany план не будується
+        plan = query_plan(self._conn, sql, params) if params is not None else None
+        slow_query_log.warning("slow query %.1f ms, request %s: %s | plan: %s", seconds * 1000,
+                               self._stats.request_id if self._stats else None, " ".join(sql.split()), plan)
@@ -1,19 +1,214 @@
-from .base import get_db_connection
+import os
+import re
+import threading
+
+from .base import get_db_connection, get_dialect, run_write
+from .instrumentation import instrumented
+from .postgres_schema import SEARCH_VECTOR
 from domain.catalog.road_sign import RoadSign
 
 
+def _build_match_query(text: str) -> str:
+    """(Private) Перетворює пошуковий рядок у вираз FTS5: кожне слово - префіксний пошук"""
+    tokens = re.findall(r"\w+", text.casefold())
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def _build_tsquery(text: str) -> str:
+    """(Private) Те саме для PostgreSQL: to_tsquery з префіксним пошуком кожного слова"""
+    tokens = re.findall(r"\w+", text.casefold())
+    return ' & '.join(f"{token}:*" for token in tokens)
+
+
+# Зображення адресуються хешем вмісту (services/image_store.py); префікс можна замінити адресою CDN
+IMAGE_URL_PREFIX = os.getenv("IMAGE_URL_PREFIX", "/images").rstrip('/')
+
+
+def image_urls(image_hash: str | None) -> tuple[str | None, str | None]:
+    """(image_url, thumbnail_url) знака; списки показують лише мініатюру"""
+    if not image_hash:
+        return None, None
+    return f"{IMAGE_URL_PREFIX}/{image_hash}/original", f"{IMAGE_URL_PREFIX}/{image_hash}/thumb"
+
+
+def _image_url_sql(variant: str) -> str:
+    prefix = IMAGE_URL_PREFIX.replace("'", "''")
+    return f"CASE WHEN image_hash IS NULL THEN NULL ELSE '{prefix}/' || image_hash || '/{variant}' END"
+
+
+def _sign_json_object(function: str) -> str:
+    return (f"{function}('id', id, 'name', name, 'category', category, "
+            f"'description', description, 'image_url', {_image_url_sql('original')}, "
+            f"'thumbnail_url', {_image_url_sql('thumb')})")
+
+
+# Рядок road_signs як JSON-об'єкт, зібраний самою БД (та сама форма, що й RoadSign.to_dict)
+_SIGN_JSON_OBJECT = _sign_json_object('json_object')
+_PG_SIGN_JSON_OBJECT = _sign_json_object('json_build_object')
+
+# Запити, що відрізняються між SQLite і PostgreSQL; решта SQL у репозиторії спільна
+_QUERIES = {
+    'sqlite': {
+        'all_json': f"SELECT json_group_array({_SIGN_JSON_OBJECT}) FROM (SELECT * FROM road_signs ORDER BY id)",
+        'category_json': (f"SELECT json_group_array({_SIGN_JSON_OBJECT}) "
+                          f"FROM (SELECT * FROM road_signs WHERE category = ? ORDER BY id)"),
+        'search': """SELECT s.* FROM road_signs_fts
+                     JOIN road_signs s ON s.id = road_signs_fts.rowid
+                     WHERE road_signs_fts MATCH ?
+                     ORDER BY rank
+                     LIMIT ? OFFSET ?""",
+    },
+    'postgres': {
+        'all_json': f"SELECT COALESCE(json_agg({_PG_SIGN_JSON_OBJECT} ORDER BY id), '[]')::text FROM road_signs",
+        'category_json': (f"SELECT COALESCE(json_agg({_PG_SIGN_JSON_OBJECT} ORDER BY id), '[]')::text "
+                          f"FROM road_signs WHERE category = ?"),
+        'search': f"""SELECT * FROM road_signs, to_tsquery('simple', ?) query
+                      WHERE {SEARCH_VECTOR} @@ query
+                      ORDER BY ts_rank({SEARCH_VECTOR}, query) DESC, id
+                      LIMIT ? OFFSET ?""",
+    },
+}
+
+
+# Поля знака, доступні для проєкції fields=, у порядку відповіді
+SIGN_FIELDS = ('id', 'name', 'category', 'description', 'image_url', 'thumbnail_url')
+# Колонки, які можна змінити через update(); назви колонок потрапляють у SQL, тож лише з цього списку
+UPDATABLE_FIELDS = ('name', 'category', 'description')
+MAX_FILTER_CATEGORIES = 32
+
+
+def _field_column(field: str) -> str:
+    return 'image_hash' if field in ('image_url', 'thumbnail_url') else field
+
+
+def _field_sql(field: str) -> str:
+    if field == 'image_url':
+        return _image_url_sql('original')
+    if field == 'thumbnail_url':
+        return _image_url_sql('thumb')
+    return field
+
+
+class SignQuery:
+    """
+    Запит списку знаків: кілька категорій, проєкція полів і keyset-курсор.
+    Вибираються лише колонки запитаних полів, тож сітка без description читається
+    з покривних індексів (repositories/schema.py, BROWSE_INDEX_DDL), а не з рядків таблиці.
+    """
+    __slots__ = ('categories', 'fields', 'limit', 'after')
+
+    def __init__(self, categories=(), fields=None, limit: int = None, after: int = None):
+        categories = tuple(sorted(set(categories)))
+        if len(categories) > MAX_FILTER_CATEGORIES or '' in categories:
+            raise ValueError(f"category must be 1..{MAX_FILTER_CATEGORIES} non-empty names")
+        unknown = sorted(set(fields or ()) - set(SIGN_FIELDS))
+        if unknown or (fields is not None and not fields):
+            raise ValueError(f"fields must be a subset of {','.join(SIGN_FIELDS)}")
+        self.categories = categories
+        # Канонічний порядок: однакові запити мають однаковий ключ кешу і однакове тіло
+        self.fields = tuple(f for f in SIGN_FIELDS if f in fields) if fields else SIGN_FIELDS
+        self.limit = limit
+        self.after = after or 0
+
+    @property
+    def key(self) -> tuple:
+        return self.categories, self.fields, self.limit, self.after
+
+    def build(self, dialect: str) -> tuple[str, list]:
+        """(sql, params): JSON-масив сторінки, кількість рядків і id останнього (курсор)"""
+        # id потрібен завжди: за ним сортування і курсор наступної сторінки
+        columns = sorted({'id', *(_field_column(f) for f in self.fields)})
+        conditions, params = [], []
+        if self.categories:
+            conditions.append(f"category IN ({', '.join('?' * len(self.categories))})")
+            params.extend(self.categories)
+        if self.after:
+            conditions.append("id > ?")
+            params.append(self.after)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+        page = f"SELECT {', '.join(columns)} FROM road_signs{where} ORDER BY id"
+        if self.limit is not None:
+            page += " LIMIT ?"
+            params.append(self.limit)
+
+        pairs = ', '.join(f"'{f}', {_field_sql(f)}" for f in self.fields)
+        if dialect == 'postgres':
+            data = f"COALESCE(json_agg(json_build_object({pairs}) ORDER BY id), '[]')::text"
+        else:
+            data = f"json_group_array(json_object({pairs}))"
+        return f"SELECT {data}, COUNT(*), MAX(id) FROM ({page}) page", params
+
+
+def _row_to_dict(row) -> dict:
+    """(Private) Рядок з БД одразу в dict для серіалізації, без проміжного RoadSign"""
+    image_url, thumbnail_url = image_urls(row['image_hash'])
+    return {
+        'id': row['id'],
+        'name': row['name'],
+        'category': row['category'],
+        'description': row['description'],
+        'image_url': image_url,
+        'thumbnail_url': thumbnail_url
+    }
+
+
 def _convert_to_road_sign(row):
     """(Private) Конвертує рядок з БД в об'єкт RoadSign"""
+    image_url, thumbnail_url = image_urls(row['image_hash'])
     return RoadSign(
         id=row['id'],
         name=row['name'],
         category=row['category'],
-        description=row['description']
+        description=row['description'],
+        image_url=image_url,
+        thumbnail_url=thumbnail_url
     )
 
 
+def _insert_many_sqlite(conn, rows: list[tuple]) -> list[int]:
+    """(Private) У транзакції писача id партії йдуть підряд: блокування запису вже взяте"""
+    conn.executemany("INSERT INTO road_signs (name, category, description) VALUES (?, ?, ?)", rows)
+    last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+    return list(range(last_id - len(rows) + 1, last_id + 1))
+
+
+def _insert_many_postgres(conn, rows: list[tuple]) -> list[int]:
+    """(Private) Один INSERT ... SELECT FROM unnest(масиви): один round-trip на партію, id - з RETURNING"""
+    names, categories, descriptions = (list(column) for column in zip(*rows))
+    ids = conn.execute(
+        """INSERT INTO road_signs (name, category, description)
+           SELECT * FROM unnest(?::text[], ?::text[], ?::text[])
+           RETURNING id""",
+        (names, categories, descriptions)
+    ).fetchall()
+    # Значення послідовності видаються рядкам по черзі, тож порядок id = порядок вхідних рядків
+    return sorted(row[0] for row in ids)
+
+
 class RoadSignRepository:
+    # Версія каталогу: збільшується при кожній зміні (create/update/delete),
+    # за нею кеші визначають, чи застаріли їхні дані
+    _version = 0
+    _version_lock = threading.Lock()
+    _change_listeners = []
+
+    @classmethod
+    def add_change_listener(cls, listener) -> None:
+        """Підписатися на зміни каталогу (listener викликається після кожного commit)"""
+        cls._change_listeners.append(listener)
+
+    @classmethod
+    def _bump_version(cls) -> None:
+        with cls._version_lock:
+            cls._version += 1
+        for listener in cls._change_listeners:
+            listener()
 
+    def get_version(self) -> int:
+        """Поточна версія каталогу"""
+        return RoadSignRepository._version
+
+    @instrumented("road_signs.get_all")
     def get_all(self) -> list[RoadSign]:
         """Отримати всі знаки з БД"""
         conn = get_db_connection()
@@ -21,6 +216,36 @@ class RoadSignRepository:
         conn.close()
         return [_convert_to_road_sign(row) for row in rows]
 
+    @instrumented("road_signs.get_all_json")
+    def get_all_json(self, category: str = None) -> bytes:
+        """
+        JSON-масив знаків (усіх або однієї категорії), зібраний функціями JSON1 у SQLite.
+        Швидкий шлях для списків: жодного RoadSign чи dict на рядок.
+        """
+        queries = _QUERIES[get_dialect()]
+        if category is None:
+            query, params = queries['all_json'], ()
+        else:
+            query, params = queries['category_json'], (category,)
+        conn = get_db_connection()
+        data = conn.execute(query, params).fetchone()[0]
+        conn.close()
+        return data.encode('utf-8')
+
+    @instrumented("road_signs.find_json")
+    def find_json(self, query: SignQuery) -> tuple[bytes, int | None]:
+        """
+        JSON-масив знаків за SignQuery, зібраний самою БД, і курсор наступної сторінки
+        (None - сторінка остання або запит без limit).
+        """
+        sql, params = query.build(get_dialect())
+        conn = get_db_connection()
+        data, count, last_id = conn.execute(sql, params).fetchone()
+        conn.close()
+        next_after = last_id if query.limit is not None and count == query.limit else None
+        return data.encode('utf-8'), next_after
+
+    @instrumented("road_signs.get_by_category")
     def get_by_category(self, category: str) -> list[RoadSign]:
         """Отримати знаки за категорією"""
         conn = get_db_connection()
@@ -28,6 +253,57 @@ class RoadSignRepository:
         conn.close()
         return [_convert_to_road_sign(row) for row in rows]
 
+    @instrumented("road_signs.get_page")
+    def get_page(self, limit: int, after: int = None, category: str = None) -> list[RoadSign]:
+        """
+        Keyset-пагінація: наступні `limit` знаків з id > after.
+        Для категорії запит іде по індексу road_signs(category, id).
+        """
+        conditions, params = ["id > ?"], [after or 0]
+        if category is not None:
+            conditions.insert(0, "category = ?")
+            params.insert(0, category)
+        query = f"SELECT * FROM road_signs WHERE {' AND '.join(conditions)} ORDER BY id LIMIT ?"
+
+        conn = get_db_connection()
+        rows = conn.execute(query, params + [limit]).fetchall()
+        conn.close()
+        return [_convert_to_road_sign(row) for row in rows]
+
+    @instrumented("road_signs.iter_all")
+    def iter_all(self, category: str = None, batch_size: int = 500):
+        """
+        Генератор знаків (у вигляді dict) прямо з курсора, партіями по batch_size.
+        Увесь список ніколи не матеріалізується в пам'яті.
+        """
+        conn = get_db_connection()
+        try:
+            if category is None:
+                cursor = conn.execute("SELECT * FROM road_signs ORDER BY id")
+            else:
+                cursor = conn.execute("SELECT * FROM road_signs WHERE category = ? ORDER BY id", (category,))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield _row_to_dict(row)
+        finally:
+            conn.close()
+
+    @instrumented("road_signs.search")
+    def search(self, text: str, limit: int = 20, offset: int = 0) -> list[RoadSign]:
+        """Повнотекстовий пошук за назвою та описом, результати впорядковані за bm25"""
+        dialect = get_dialect()
+        match = _build_tsquery(text) if dialect == 'postgres' else _build_match_query(text)
+        if not match:
+            return []
+        conn = get_db_connection()
+        rows = conn.execute(_QUERIES[dialect]['search'], (match, limit, offset)).fetchall()
+        conn.close()
+        return [_convert_to_road_sign(row) for row in rows]
+
+    @instrumented("road_signs.get_by_id")
     def get_by_id(self, sign_id: int) -> RoadSign | None:
         """Отримати один знак за ID"""
         conn = get_db_connection()
@@ -35,40 +311,66 @@ class RoadSignRepository:
         conn.close()
         return _convert_to_road_sign(row) if row else None
 
+    @instrumented("road_signs.create")
     def create(self, name: str, category: str, description: str = None) -> RoadSign:
         """Створити новий знак і повернути його об'єкт."""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO road_signs (name, category, description) VALUES (?, ?, ?)",
+        # RETURNING повертає створений рядок тим самим запитом (і в SQLite, і в PostgreSQL)
+        created_row = run_write(lambda conn: conn.execute(
+            "INSERT INTO road_signs (name, category, description) VALUES (?, ?, ?) RETURNING *",
             (name, category, description)
-        )
-        last_id = cursor.lastrowid
-        conn.commit()
-
-        # Отримуємо створений об'єкт, щоб повернути його у відповідь
-        created_row = conn.execute("SELECT * FROM road_signs WHERE id = ?", (last_id,)).fetchone()
-        conn.close()
+        ).fetchone())
+        self._bump_version()
         return _convert_to_road_sign(created_row)
 
-    def update(self, sign_id: int, data: dict) -> None:
-        """Оновити наявний знак за ID."""
-        conn = get_db_connection()
-        # Створюємо динамічний SQL-запит
+    @instrumented("road_signs.create_many")
+    def create_many(self, rows: list[tuple]) -> list[int]:
+        """
+        Вставити партію знаків (name, category, description) однією транзакцією.
+        Повертає id створених знаків у порядку вхідних рядків.
+        """
+        if not rows:
+            return []
+        insert = _insert_many_postgres if get_dialect() == 'postgres' else _insert_many_sqlite
+        ids = run_write(lambda conn: insert(conn, rows))
+        self._bump_version()
+        return ids
+
+    @instrumented("road_signs.update")
+    def update(self, sign_id: int, data: dict) -> RoadSign | None:
+        """
+        Оновити наявний знак за ID і повернути його новий стан (None - знака немає).
+        ValueError - порожні дані або поля поза UPDATABLE_FIELDS.
+        """
+        unknown = set(data) - set(UPDATABLE_FIELDS)
+        if not data or unknown:
+            raise ValueError(f"Fields to update must be a non-empty subset of {', '.join(UPDATABLE_FIELDS)}")
+        # Створюємо динамічний SQL-запит; RETURNING замість окремих SELECT до і після оновлення
         set_clauses = [f"{k} = ?" for k in data.keys()]
-        query = f"UPDATE road_signs SET {', '.join(set_clauses)} WHERE id = ?"
+        query = f"UPDATE road_signs SET {', '.join(set_clauses)} WHERE id = ? RETURNING *"
         params = list(data.values()) + [sign_id]
 
-        conn.execute(query, params)
-        conn.commit()
-        conn.close()
+        row = run_write(lambda conn: conn.execute(query, params).fetchone())
+        if row is None:
+            return None
+        self._bump_version()
+        return _convert_to_road_sign(row)
 
+    @instrumented("road_signs.set_image")
+    def set_image(self, sign_id: int, image_hash: str | None) -> int:
+        """Прив'язати до знака зображення (digest зі сховища) або відв'язати (None)."""
+        rows_affected = run_write(lambda conn: conn.execute(
+            "UPDATE road_signs SET image_hash = ? WHERE id = ?", (image_hash, sign_id)
+        ).rowcount)
+        if rows_affected:
+            self._bump_version()
+        return rows_affected
+
+    @instrumented("road_signs.delete")
     def delete(self, sign_id: int) -> int:
         """Видалити знак за ID і повернути кількість видалених рядків (0 або 1)."""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM road_signs WHERE id = ?", (sign_id,))
-        rows_affected = cursor.rowcount
-        conn.commit()
-        conn.close()
-        return rows_affected
\ No newline at end of file
+        rows_affected = run_write(lambda conn: conn.execute(
+            "DELETE FROM road_signs WHERE id = ?", (sign_id,)
+        ).rowcount)
+        if rows_affected:
+            self._bump_version()
+        return rows_affected
@@ -0,0 +1,178 @@
+def ensure_column(cursor, table: str, column: str, definition: str) -> None:
+    """Додати колонку в наявну таблицю, якщо її ще немає (для баз, створених старою версією)"""
+    columns = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+    if column not in columns:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+# --- Повнотекстовий пошук (SQLite FTS5) ---
+# External-content таблиця: текст зберігається лише в road_signs,
+# FTS-індекс синхронізується тригерами на будь-якому шляху запису.
+# unicode61 виконує case folding і для кирилиці; remove_diacritics 0,
+# щоб "й"/"ї" не зливались з "и"/"і".
+SEARCH_INDEX_DDL = (
+    '''CREATE VIRTUAL TABLE IF NOT EXISTS road_signs_fts USING fts5(
+        name, description,
+        content='road_signs', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 0',
+        prefix='2 3'
+    )''',
+    '''CREATE TRIGGER IF NOT EXISTS road_signs_fts_ai AFTER INSERT ON road_signs BEGIN
+        INSERT INTO road_signs_fts (rowid, name, description) VALUES (new.id, new.name, new.description);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS road_signs_fts_ad AFTER DELETE ON road_signs BEGIN
+        INSERT INTO road_signs_fts (road_signs_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS road_signs_fts_au AFTER UPDATE OF name, description ON road_signs BEGIN
+        INSERT INTO road_signs_fts (road_signs_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO road_signs_fts (rowid, name, description) VALUES (new.id, new.name, new.description);
+    END''',
+)
+
+
+def create_search_index(cursor) -> None:
+    """Створити FTS5-індекс знаків (ідемпотентно) і заповнити його наявними даними"""
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'road_signs_fts'"
+    ).fetchone()
+    for statement in SEARCH_INDEX_DDL:
+        cursor.execute(statement)
+    if not exists:
+        cursor.execute("INSERT INTO road_signs_fts (road_signs_fts) VALUES ('rebuild')")
+        # Назва знака важить більше за опис при ранжуванні bm25
+        cursor.execute("INSERT INTO road_signs_fts (road_signs_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')")
+
+
+# --- Матеріалізований індекс категорій ---
+# Кількість знаків у кожній категорії підтримують тригери в тій самій транзакції,
+# що й запис знака, тож лічильники коректні на будь-якому шляху запису (create, batch, update, delete).
+# Категорія без знаків видаляється.
+CATEGORY_INDEX_DDL = (
+    '''CREATE TABLE IF NOT EXISTS categories (
+        name TEXT PRIMARY KEY,
+        sign_count INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID''',
+    '''CREATE TRIGGER IF NOT EXISTS categories_ai AFTER INSERT ON road_signs BEGIN
+        INSERT INTO categories (name, sign_count) VALUES (new.category, 1)
+        ON CONFLICT (name) DO UPDATE SET sign_count = sign_count + 1;
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS categories_ad AFTER DELETE ON road_signs BEGIN
+        UPDATE categories SET sign_count = sign_count - 1 WHERE name = old.category;
+        DELETE FROM categories WHERE name = old.category AND sign_count <= 0;
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS categories_au AFTER UPDATE OF category ON road_signs
+    WHEN old.category IS NOT new.category BEGIN
+        UPDATE categories SET sign_count = sign_count - 1 WHERE name = old.category;
+        DELETE FROM categories WHERE name = old.category AND sign_count <= 0;
+        INSERT INTO categories (name, sign_count) VALUES (new.category, 1)
+        ON CONFLICT (name) DO UPDATE SET sign_count = sign_count + 1;
+    END''',
+)
+
+
+def create_category_index(cursor) -> None:
+    """Створити таблицю категорій з тригерами (ідемпотентно) і заповнити її наявними знаками"""
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'categories'"
+    ).fetchone()
+    for statement in CATEGORY_INDEX_DDL:
+        cursor.execute(statement)
+    if not exists:
+        cursor.execute(
+            "INSERT INTO categories (name, sign_count) SELECT category, COUNT(*) FROM road_signs GROUP BY category"
+        )
+
+
+def add_sign_images(cursor) -> None:
+    """Колонка з хешем зображення знака (файли - у services/image_store.py)"""
+    ensure_column(cursor, 'road_signs', 'image_hash', 'TEXT')
+
+
+# --- Покривні індекси для сітки каталогу (GET /signs?category=...&fields=...) ---
+# Проєкція без description читається лише з індексів: з категоріями - по (category, id),
+# без фільтра - по id. idx_road_signs_browse також замінює колишній індекс (category, id)
+BROWSE_INDEX_DDL = (
+    '''CREATE INDEX IF NOT EXISTS idx_road_signs_browse ON road_signs (category, id, name, image_hash)''',
+    '''CREATE INDEX IF NOT EXISTS idx_road_signs_grid ON road_signs (id, name, category, image_hash)''',
+    '''DROP INDEX IF EXISTS idx_road_signs_category_id''',
+)
+
+
+def create_browse_indexes(cursor) -> None:
+    """Покривні індекси для списків знаків з проєкцією полів (ідемпотентно)"""
+    for statement in BROWSE_INDEX_DDL:
+        cursor.execute(statement)
+
+
+# --- Журнал змін каталогу (GET /signs/changes) ---
+# Тригери пишуть запис у тій самій транзакції, що й зміна знака; version - монотонний номер змін.
+# AUTOINCREMENT гарантує, що номери не повторюються навіть після компактування.
+# horizon - найбільша версія, видалена компактуванням: клієнти зі старішою since мають перезавантажити каталог.
+CHANGE_LOG_DDL = (
+    '''CREATE TABLE IF NOT EXISTS sign_changes (
+        version INTEGER PRIMARY KEY AUTOINCREMENT,
+        sign_id INTEGER NOT NULL,
+        op TEXT NOT NULL CHECK (op IN ('upsert', 'delete')),
+        changed_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
+    )''',
+    '''CREATE INDEX IF NOT EXISTS idx_sign_changes_sign_id ON sign_changes (sign_id, version)''',
+    '''CREATE TABLE IF NOT EXISTS sign_changes_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        horizon INTEGER NOT NULL DEFAULT 0
+    )''',
+    '''CREATE TRIGGER IF NOT EXISTS sign_changes_ai AFTER INSERT ON road_signs BEGIN
+        INSERT INTO sign_changes (sign_id, op) VALUES (new.id, 'upsert');
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS sign_changes_au AFTER UPDATE ON road_signs BEGIN
+        INSERT INTO sign_changes (sign_id, op) VALUES (new.id, 'upsert');
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS sign_changes_ad AFTER DELETE ON road_signs BEGIN
+        INSERT INTO sign_changes (sign_id, op) VALUES (old.id, 'delete');
+    END''',
+)
+
+
+def create_change_log(cursor) -> None:
+    """Створити журнал змін з тригерами (ідемпотентно); наявні знаки потрапляють у журнал як upsert"""
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sign_changes'"
+    ).fetchone()
+    for statement in CHANGE_LOG_DDL:
+        cursor.execute(statement)
+    cursor.execute("INSERT OR IGNORE INTO sign_changes_state (id, horizon) VALUES (1, 0)")
+    if not exists:
+        # since=0 має віддати весь каталог, зокрема знаки, створені до появи журналу
+        cursor.execute("INSERT INTO sign_changes (sign_id, op) SELECT id, 'upsert' FROM road_signs ORDER BY id")
+
+
+# --- Базова схема (міграція 1) ---
+# Заморожена: саме такою була схема, коли з'явились версіоновані міграції. Бази без
+# PRAGMA user_version (створені init_database) проходять її без змін. Будь-яка зміна схеми -
+# лише нова нумерована міграція; SEARCH_INDEX_DDL теж частина цієї версії.
+BASELINE_DDL = (
+    '''CREATE TABLE IF NOT EXISTS road_signs (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, category TEXT NOT NULL, description TEXT)''',
+    '''CREATE INDEX IF NOT EXISTS idx_road_signs_category_id ON road_signs (category, id)''',
+    '''CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE NOT NULL, password_hash TEXT NOT NULL, role TEXT DEFAULT 'guest', role_version INTEGER NOT NULL DEFAULT 0, created_at DATETIME DEFAULT CURRENT_TIMESTAMP)''',
+)
+
+
+def create_baseline_schema(cursor) -> None:
+    """Схема версії 1 (ідемпотентно)"""
+    for statement in BASELINE_DDL:
+        cursor.execute(statement)
+    create_search_index(cursor)
+    ensure_column(cursor, 'users', 'role_version', 'INTEGER NOT NULL DEFAULT 0')
+
+
+def create_schema(cursor) -> None:
+    """
+    Актуальна схема одним викликом (тести, бенчмарки): базова схема і всі подальші зміни
+    в порядку міграцій, тож результат збігається з migrate() без демо-даних.
+    """
+    create_baseline_schema(cursor)
+    create_category_index(cursor)
+    add_sign_images(cursor)
+    create_change_log(cursor)
+    create_browse_indexes(cursor)
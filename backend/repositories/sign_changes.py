@@ -0,0 +1,101 @@
+import json
+import time
+
+from .base import get_db_connection, get_dialect, run_write
+from .instrumentation import instrumented
+from .road_sign import _PG_SIGN_JSON_OBJECT, _SIGN_JSON_OBJECT
+
+# Дельта: остання зміна кожного знака після since разом з його поточним станом (null - видалено).
+# Кілька правок одного знака між синхронізаціями стискаються в одну.
+_CHANGES_PAGE = """
+    SELECT c.version, c.sign_id, s.*
+    FROM (SELECT sign_id, MAX(version) AS version FROM sign_changes WHERE version > ? GROUP BY sign_id) c
+    LEFT JOIN road_signs s ON s.id = c.sign_id
+    ORDER BY c.version
+    LIMIT ?
+"""
+
+_QUERIES = {
+    'sqlite': {
+        'changes': f"""
+            SELECT json_group_array(json_object(
+                'version', version,
+                'op', CASE WHEN id IS NULL THEN 'delete' ELSE 'upsert' END,
+                'id', sign_id,
+                'sign', CASE WHEN id IS NULL THEN NULL ELSE json({_SIGN_JSON_OBJECT}) END
+            ))
+            FROM ({_CHANGES_PAGE}) page""",
+        'head': "SELECT seq FROM sqlite_sequence WHERE name = 'sign_changes'",
+        'move_horizon': "UPDATE sign_changes_state SET horizon = MAX(horizon, ?) WHERE id = 1",
+    },
+    'postgres': {
+        'changes': f"""
+            SELECT COALESCE(json_agg(json_build_object(
+                'version', version,
+                'op', CASE WHEN id IS NULL THEN 'delete' ELSE 'upsert' END,
+                'id', sign_id,
+                'sign', CASE WHEN id IS NULL THEN NULL ELSE {_PG_SIGN_JSON_OBJECT} END
+            ) ORDER BY version), '[]')::text
+            FROM ({_CHANGES_PAGE}) page""",
+        'head': "SELECT CASE WHEN is_called THEN last_value ELSE 0 END FROM sign_changes_version_seq",
+        'move_horizon': "UPDATE sign_changes_state SET horizon = GREATEST(horizon, ?) WHERE id = 1",
+    },
+}
+
+
+class SignChangeRepository:
+    """Журнал змін каталогу, який ведуть тригери road_signs (repositories/schema.py, postgres_schema.py)"""
+
+    @instrumented("sign_changes.get_state")
+    def get_state(self) -> tuple[int, int]:
+        """(head, horizon): остання версія журналу і межа, нижче якої записи компактовано"""
+        conn = get_db_connection()
+        head = conn.execute(_QUERIES[get_dialect()]['head']).fetchone()
+        horizon = conn.execute("SELECT horizon FROM sign_changes_state WHERE id = 1").fetchone()
+        conn.close()
+        return (head[0] if head else 0), (horizon[0] if horizon else 0)
+
+    @instrumented("sign_changes.get_head")
+    def get_head(self) -> int:
+        """Остання версія журналу: змінюється з кожним записом каталогу в будь-якому процесі"""
+        conn = get_db_connection()
+        head = conn.execute(_QUERIES[get_dialect()]['head']).fetchone()
+        conn.close()
+        return head[0] if head else 0
+
+    @instrumented("sign_changes.get_changes")
+    def get_changes(self, since: int, limit: int) -> list[dict]:
+        """Зміни з версією > since, по одній на знак, у порядку версій"""
+        conn = get_db_connection()
+        data = conn.execute(_QUERIES[get_dialect()]['changes'], (since, limit)).fetchone()[0]
+        conn.close()
+        return json.loads(data)
+
+    @instrumented("sign_changes.compact")
+    def compact(self, retention: float) -> int:
+        """
+        Компактування: прибирає записи, перекриті новішою зміною того самого знака
+        (на відповідь жодного since це не впливає), і видалення, старші за retention секунд.
+        Після видалення tombstone межа horizon зсувається - такі клієнти отримають 410 і перезавантажать каталог.
+        Повертає кількість видалених записів.
+        """
+        cutoff = int(time.time() - retention)
+        move_horizon = _QUERIES[get_dialect()]['move_horizon']
+
+        def compact(conn) -> int:
+            removed = conn.execute(
+                """DELETE FROM sign_changes WHERE version NOT IN
+                   (SELECT MAX(version) FROM sign_changes GROUP BY sign_id)"""
+            ).rowcount
+            expired = conn.execute(
+                """SELECT MAX(version) FROM sign_changes
+                   WHERE op = 'delete' AND changed_at < ?""", (cutoff,)
+            ).fetchone()[0]
+            if expired is not None:
+                removed += conn.execute(
+                    "DELETE FROM sign_changes WHERE op = 'delete' AND version <= ?", (expired,)
+                ).rowcount
+                conn.execute(move_horizon, (expired,))
+            return removed
+
+        return run_write(compact)
@@ -1,4 +1,5 @@
-from .base import get_db_connection
+from .base import get_db_connection, run_write
+from .instrumentation import instrumented
 from domain.users.user import User, Admin
 
 
@@ -22,7 +23,14 @@ def _convert_to_user(row) -> User | Admin | None:
 
 
 class UserRepository:
+    # Підписники на зміну ролі: listener(user_id, role, role_version)
+    _role_listeners = []
 
+    @classmethod
+    def add_role_change_listener(cls, listener) -> None:
+        cls._role_listeners.append(listener)
+
+    @instrumented("users.get_all")
     def get_all(self) -> list[User]:
         """Отримати всіх користувачів (без хешів паролів)"""
         conn = get_db_connection()
@@ -30,6 +38,38 @@ class UserRepository:
         conn.close()
         return [_convert_to_user(row) for row in rows]
 
+    @instrumented("users.get_page")
+    def get_page(self, limit: int, after: int = None) -> list[User]:
+        """Keyset-пагінація користувачів за id"""
+        conn = get_db_connection()
+        rows = conn.execute(
+            "SELECT id, username, role FROM users WHERE id > ? ORDER BY id LIMIT ?", (after or 0, limit)
+        ).fetchall()
+        conn.close()
+        return [_convert_to_user(row) for row in rows]
+
+    @instrumented("users.iter_all")
+    def iter_all(self, batch_size: int = 500):
+        """Генератор користувачів (у вигляді dict) прямо з курсора"""
+        conn = get_db_connection()
+        try:
+            cursor = conn.execute("SELECT id, username, role FROM users ORDER BY id")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield {
+                        'id': row['id'],
+                        'username': row['username'],
+                        'email': None,
+                        'role': row['role'],
+                        'is_admin': row['role'] == 'admin'
+                    }
+        finally:
+            conn.close()
+
+    @instrumented("users.get_by_id")
     def get_by_id(self, user_id: int) -> User | None:
         """Отримати користувача за ID (безпечно, без хешу)"""
         conn = get_db_connection()
@@ -37,6 +77,15 @@ class UserRepository:
         conn.close()
         return _convert_to_user(row)
 
+    @instrumented("users.get_role_version")
+    def get_role_version(self, user_id: int) -> tuple[str, int] | None:
+        """Роль і версія ролі користувача (для перевірки JWT-claims)"""
+        conn = get_db_connection()
+        row = conn.execute("SELECT role, role_version FROM users WHERE id = ?", (user_id,)).fetchone()
+        conn.close()
+        return (row['role'], row['role_version']) if row else None
+
+    @instrumented("users.get_by_username_for_auth")
     def get_by_username_for_auth(self, username: str) -> dict | None:
         """
         Отримати повні дані (включаючи хеш!) для логіну.
@@ -47,19 +96,28 @@ class UserRepository:
         conn.close()
         return row
 
+    @instrumented("users.create")
     def create(self, username: str, hashed_password: str, role: str = 'guest') -> None:
         """Створити нового користувача"""
-        conn = get_db_connection()
-        conn.execute(
+        run_write(lambda conn: conn.execute(
             "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
             (username, hashed_password, role)
-        )
-        conn.commit()
-        conn.close()
+        ))
+
+    @instrumented("users.update_password_hash")
+    def update_password_hash(self, user_id: int, password_hash: str) -> None:
+        """Замінити хеш пароля (наприклад, після зміни bcrypt cost factor)"""
+        run_write(lambda conn: conn.execute(
+            "UPDATE users SET password_hash = ? WHERE id = ?", (password_hash, user_id)
+        ))
 
+    @instrumented("users.update_role")
     def update_role(self, user_id: int, new_role: str) -> None:
-        """Оновити роль користувача"""
-        conn = get_db_connection()
-        conn.execute("UPDATE users SET role = ? WHERE id = ?", (new_role, user_id))
-        conn.commit()
-        conn.close()
\ No newline at end of file
+        """Оновити роль користувача; role_version збільшується, тож старі JWT стають недійсними"""
+        row = run_write(lambda conn: conn.execute(
+            "UPDATE users SET role = ?, role_version = role_version + 1 WHERE id = ? RETURNING role_version",
+            (new_role, user_id)
+        ).fetchone())
+        if row:
+            for listener in self._role_listeners:
+                listener(user_id, new_role, row['role_version'])
\ No newline at end of file
@@ -0,0 +1,142 @@
+import logging
+import os
+import queue
+import threading
+import time
+
+from .instrumentation import record_write_batch
+
+# Скільки операцій максимум в одній транзакції і скільки писач чекає на попутні операції.
+# 0 мс - без очікування: групуються операції, що накопичились, поки йшов попередній commit,
+# тож поодинокий запис не платить затримкою, а під навантаженням пакети ростуть самі.
+WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", "64"))
+WRITE_BATCH_DELAY = float(os.getenv("WRITE_BATCH_DELAY_MS", "0")) / 1000
+# Найдовше очікування commit викликачем; довше - писач завис або помер, запит отримує 503
+WRITE_TIMEOUT = float(os.getenv("WRITE_TIMEOUT", "30"))
+
+_STOP = object()
+
+logger = logging.getLogger(__name__)
+
+
+class WriterUnavailable(RuntimeError):
+    """Операція не дочекалась commit за timeout: потік-писач завис або помер (результат невідомий)"""
+
+    retry_after = 5
+
+
+class _Write:
+    __slots__ = ('fn', 'done', 'result', 'error')
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class GroupCommitWriter:
+    """
+    Єдиний писач SQLite-бази: окремий потік із власним з'єднанням бере мутації з черги
+    і виконує їх пакетами в одній транзакції (group commit) - один fsync WAL на пакет
+    замість одного на операцію і жодної боротьби потоків за блокування файлу.
+    Кожна операція - у своєму SAVEPOINT: помилка однієї відкочує лише її, решта пакета комітиться.
+    submit() блокує викликача до commit і повертає результат або піднімає помилку саме його операції.
+    """
+
+    def __init__(self, connect, batch_size: int = WRITE_BATCH_SIZE, batch_delay: float = WRITE_BATCH_DELAY,
+                 timeout: float = WRITE_TIMEOUT):
+        self.connect = connect
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._conn = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn):
+        """
+        Виконати fn(conn) у транзакції писача; fn не викликає commit/rollback сам.
+        Мертвий потік-писач перезапускається; WriterUnavailable - commit не дочекались за timeout.
+        """
+        write = _Write(fn)
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                if self._thread is not None:
+                    logger.error("sqlite writer thread died, restarting")
+                self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+                self._thread.start()
+            self._queue.put(write)
+        if not write.done.wait(self.timeout):
+            raise WriterUnavailable(f"write was not committed within {self.timeout:g} s")
+        if write.error is not None:
+            raise write.error
+        return write.result
+
+    def close(self) -> None:
+        """Дочекатися вже поставлених операцій і зупинити потік (наступний submit запустить новий)"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is not None:
+                self._queue.put(_STOP)
+                thread.join()
+
+    def _next_batch(self, first: _Write) -> tuple[list[_Write], bool]:
+        batch, deadline = [first], time.monotonic() + self.batch_delay
+        while len(batch) < self.batch_size:
+            try:
+                remaining = deadline - time.monotonic()
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        try:
+            stop = False
+            while not stop:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+                batch, stop = self._next_batch(item)
+                self._commit(batch)
+        finally:
+            conn, self._conn = self._conn, None
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    logger.exception("failed to close sqlite writer connection")
+
+    def _commit(self, batch: list[_Write]) -> None:
+        started = time.perf_counter()
+        conn = self._conn
+        try:
+            if conn is None:
+                # З'єднання належить потоку писача; помилка підключення дістається операціям пакета
+                conn = self._conn = self.connect()
+            conn.execute("BEGIN IMMEDIATE")
+            for write in batch:
+                conn.execute("SAVEPOINT write_op")
+                try:
+                    write.result = write.fn(conn)
+                    conn.execute("RELEASE write_op")
+                except Exception as e:
+                    conn.execute("ROLLBACK TO write_op")
+                    conn.execute("RELEASE write_op")
+                    write.error = e
+            conn.commit()
+        except Exception as e:
+            # BEGIN чи COMMIT не вдались (диск, блокування іншим процесом понад busy_timeout) - не записано нічого
+            if conn is not None and conn.in_transaction:
+                conn.rollback()
+            for write in batch:
+                write.result, write.error = None, write.error or e
+        finally:
+            record_write_batch(len(batch), time.perf_counter() - started)
+            for write in batch:
+                write.done.set()
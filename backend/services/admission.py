@@ -0,0 +1,163 @@
+import math
+import os
+import threading
+import time
+
+from services.metrics import ADMISSION_LIMIT, ADMISSION_REJECTIONS
+
+MAX_RETRY_AFTER = 30  # с; далі клієнту краще показати помилку, ніж чекати
+
+
+class ClassLimits:
+    """Межі адаптивного ліміту одночасних запитів і цільова затримка для класу маршрутів"""
+    __slots__ = ('initial', 'min_limit', 'max_limit', 'target_latency', 'max_queue_delay')
+
+    def __init__(self, initial: int, min_limit: int, max_limit: int, target_latency: float,
+                 max_queue_delay: float = None):
+        self.initial = initial
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        # Середня затримка вище цілі означає, що запити стоять у черзі (пул БД, GIL, bcrypt)
+        self.target_latency = target_latency
+        # Запит, що вже чекав у черзі проксі довше (X-Request-Start), відкидається одразу
+        self.max_queue_delay = max_queue_delay
+
+
+class AdaptiveLimit:
+    """
+    Адаптивний ліміт одночасних запитів (AIMD, як вікно TCP): затримка вимірюється вікнами
+    приблизно по одній "хвилі" запитів (limit завершень). Якщо середня затримка вікна вища
+    за ціль - ліміт зменшується в backoff разів; якщо нижча і ліміт був вичерпаний - росте на sqrt(limit).
+    Ліміт, до якого навантаження не доходить, не нарощується.
+    """
+
+    MIN_WINDOW = 10  # завершень у вікні щонайменше
+
+    def __init__(self, limits: ClassLimits, backoff: float = 0.9):
+        self.limits = limits
+        self.backoff = backoff
+        self.limit = float(limits.initial)
+        self.inflight = 0
+        self.avg_latency = limits.target_latency / 2  # EWMA, с (для Retry-After)
+        self._window_count = 0
+        self._window_sum = 0.0
+        self._window_saturated = False
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.inflight >= int(self.limit):
+                self._window_saturated = True
+                return False
+            self.inflight += 1
+            if self.inflight >= int(self.limit):
+                self._window_saturated = True
+            return True
+
+    def release(self, latency: float) -> None:
+        with self._lock:
+            self.inflight -= 1
+            self.avg_latency += (latency - self.avg_latency) * 0.1
+            self._window_count += 1
+            self._window_sum += latency
+            if self._window_count < max(self.MIN_WINDOW, self.limit):
+                return
+            window_latency = self._window_sum / self._window_count
+            if window_latency > self.limits.target_latency:
+                limit = self.limit * self.backoff
+            elif self._window_saturated:
+                limit = self.limit + math.sqrt(self.limit)
+            else:
+                limit = self.limit
+            self.limit = max(self.limits.min_limit, min(self.limits.max_limit, limit))
+            self._window_count, self._window_sum, self._window_saturated = 0, 0.0, False
+
+    def retry_after(self) -> int:
+        """Оцінка, за скільки секунд звільниться місце: середня затримка на кількість 'хвиль' черги"""
+        with self._lock:
+            waves = self.inflight / max(self.limit, 1)
+            latency = self.avg_latency
+        return max(1, min(MAX_RETRY_AFTER, math.ceil(latency * waves)))
+
+
+def parse_request_start(header: str | None, now: float) -> float:
+    """
+    Скільки запит чекав у проксі до воркера: X-Request-Start: t=<час> (nginx ${msec} - секунди,
+    деякі балансувальники - мілі- або мікросекунди). Без заголовка - 0.
+    """
+    if not header:
+        return 0.0
+    try:
+        started = float(header.strip().removeprefix('t='))
+    except ValueError:
+        return 0.0
+    if started > 1e14:
+        started /= 1e6
+    elif started > 1e11:
+        started /= 1e3
+    return max(0.0, now - started)
+
+
+class AdmissionController:
+    """
+    Контроль допуску перед обробниками: окремий адаптивний ліміт на кожен клас маршрутів
+    (дешеві читання каталогу, адмінські записи, bcrypt-автентифікація), тож перевантаження
+    одного класу не забирає потоки в інших. Надлишок відкидається одразу - 503 з Retry-After,
+    поки запит ще нічого не коштував.
+    """
+
+    def __init__(self, classes: dict[str, ClassLimits]):
+        self.limiters = {name: AdaptiveLimit(limits) for name, limits in classes.items()}
+        for name, limiter in self.limiters.items():
+            ADMISSION_LIMIT.labels(name).set(limiter.limit)
+
+    def admit(self, route_class: str, queue_delay: float = 0.0):
+        """
+        Повертає (ticket, retry_after): ticket передається в release() після відповіді,
+        None - запит відкинуто.
+        """
+        limiter = self.limiters[route_class]
+        max_delay = limiter.limits.max_queue_delay
+        if (max_delay is not None and queue_delay > max_delay) or not limiter.try_acquire():
+            ADMISSION_REJECTIONS.labels(route_class).inc()
+            return None, limiter.retry_after()
+        return (route_class, time.perf_counter() - queue_delay), 0
+
+    def release(self, ticket) -> None:
+        route_class, started = ticket
+        limiter = self.limiters[route_class]
+        limiter.release(time.perf_counter() - started)
+        ADMISSION_LIMIT.labels(route_class).set(limiter.limit)
+
+
+def classify(endpoint: str | None, method: str) -> str:
+    """Клас маршруту: 'auth' (bcrypt), 'write' (зміни каталогу та ролей) або 'read'"""
+    if endpoint in ('login', 'register'):
+        return 'auth'
+    if method not in ('GET', 'HEAD'):
+        return 'write'
+    return 'read'
+
+
+def create_admission_controller() -> AdmissionController | None:
+    """ADMISSION_CONTROL=0 вимикає контроль допуску; межі класів налаштовуються змінними оточення"""
+    if os.getenv("ADMISSION_CONTROL", "1") == "0":
+        return None
+    hold = max(1, int(os.getenv("GUNICORN_THREADS", "8")) // 2)
+
+    def limits(prefix: str, initial: int, min_limit: int, max_limit: int, target_ms: int, max_queue_delay: float):
+        return ClassLimits(int(os.getenv(f"ADMISSION_{prefix}_INITIAL", initial)),
+                           int(os.getenv(f"ADMISSION_{prefix}_MIN", min_limit)),
+                           int(os.getenv(f"ADMISSION_{prefix}_MAX", max_limit)),
+                           float(os.getenv(f"ADMISSION_{prefix}_TARGET_MS", target_ms)) / 1000,
+                           float(os.getenv(f"ADMISSION_{prefix}_MAX_QUEUE_DELAY", max_queue_delay)))
+
+    return AdmissionController({
+        'read': limits('READ', 64, 8, 512, 250, 2.0),
+        'write': limits('WRITE', 16, 2, 64, 1000, 5.0),
+        # bcrypt займає процес пулу на 100-300 мс: багато одночасних логінів лише подовжують чергу
+        'auth': limits('AUTH', 8, 1, 32, 2000, 5.0),
+        # Long-poll і SSE під WSGI займають потік воркера на весь час очікування: фіксований ліміт
+        # (min = max), за замовчуванням половина потоків gunicorn - решта лишається звичайним запитам
+        'hold': limits('HOLD', hold, hold, hold, 60_000, 5.0),
+    })
@@ -0,0 +1,218 @@
+"""
+Спільна частина маршрутів WSGI (app.py) і ASGI (asgi.py): розбір query-параметрів,
+тіла відповідей і відображення помилок у єдиний формат {"error","code","details","requestId"}.
+
+Функції не залежать від фреймворку: params - будь-який mapping з get/getlist
+(request.args у Flask, request.query_params у Starlette). Розбір піднімає ApiError,
+обробники повертають (status, body) - адаптер лише перетворює їх на відповідь свого фреймворку.
+"""
+from flask_jwt_extended import create_access_token
+
+from repositories.road_sign import SignQuery
+from repositories.write_queue import WriterUnavailable
+from services.change_feed import MAX_WAIT, ChangesCompacted
+from services.password_hasher import HasherBusy
+from services.sign_suggest import MAX_PREFIX_LENGTH, MAX_SUGGESTIONS
+from services.snapshots import iter_csv, iter_ndjson
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+DEFAULT_SEARCH_LIMIT = 20
+DEFAULT_SUGGEST_LIMIT = 10
+
+# format= експорту -> (генератор рядків з iter_all, media type)
+EXPORT_FORMATS = {
+    'ndjson': (iter_ndjson, 'application/x-ndjson'),
+    'csv': (iter_csv, 'text/csv'),
+}
+
+
+class ApiError(Exception):
+    """Відповідь-помилка: статус, назва, машинний код, деталі і додаткові заголовки (Retry-After)"""
+
+    def __init__(self, status: int, error: str, code, details, headers: dict = None):
+        super().__init__(details)
+        self.status = status
+        self.error = error
+        self.code = code
+        self.details = details
+        self.headers = headers or {}
+
+    def body(self, request_id: str | None) -> dict:
+        return {"error": self.error, "code": self.code, "details": self.details, "requestId": request_id}
+
+
+def validation_error(code: str, details: str) -> ApiError:
+    return ApiError(400, "Validation Error", code, details)
+
+
+def http_error(status: int, name: str, description) -> ApiError:
+    """HTTP-виняток фреймворку (404, 405, 413...); code - сам статус, як і раніше"""
+    return ApiError(status, name, status, description)
+
+
+def error_for_exception(e: Exception) -> ApiError | None:
+    """Відомі винятки сервісного шару -> ApiError; None - адаптер обробляє виняток сам"""
+    if isinstance(e, ApiError):
+        return e
+    if isinstance(e, WriterUnavailable):
+        # Запис міг і не відбутися: клієнт повторює з тим самим Idempotency-Key
+        return ApiError(503, "Service Unavailable", "WRITE_UNAVAILABLE", str(e),
+                        {"Retry-After": str(e.retry_after)})
+    if isinstance(e, HasherBusy):
+        # Пул bcrypt переповнений - маршрути /register і /login не обробляють це самі
+        return ApiError(503, "Service Unavailable", "AUTH_OVERLOADED", "Too many concurrent authentication requests",
+                        {"Retry-After": str(e.retry_after)})
+    if isinstance(e, ChangesCompacted):
+        return ApiError(410, "Gone", "CHANGES_COMPACTED",
+                        f"{e}; reload the catalog and continue from version {e.head}")
+    return None
+
+
+def unknown_error(e: Exception) -> ApiError:
+    return ApiError(500, "Internal Server Error", getattr(e, "code", "UNKNOWN_ERROR"), str(e))
+
+
+# --- Списки знаків ---
+
+def wants_pagination(params) -> bool:
+    return 'limit' in params or 'after' in params
+
+
+def wants_stream(params) -> bool:
+    return params.get('stream') in ('1', 'true')
+
+
+def wants_query(params) -> bool:
+    return 'category' in params or 'fields' in params
+
+
+def check_stream_args(params, *other) -> None:
+    """stream=1 віддає весь список: з limit/after (і фільтрами other) не поєднується - 400, а не мовчазний ігнор"""
+    conflicting = [name for name in ('limit', 'after', *other) if name in params]
+    if wants_stream(params) and conflicting:
+        raise validation_error("INVALID_STREAM_QUERY", f"stream cannot be combined with {', '.join(conflicting)}")
+
+
+def read_pagination_args(params) -> tuple[int, int]:
+    """(limit, after) - курсор keyset-пагінації"""
+    try:
+        limit = int(params.get('limit', DEFAULT_PAGE_SIZE))
+        after = int(params.get('after', 0))
+    except ValueError:
+        limit = after = None
+    if limit is None or not 1 <= limit <= MAX_PAGE_SIZE or after < 0:
+        raise validation_error("INVALID_PAGINATION",
+                               f"limit must be 1..{MAX_PAGE_SIZE}, after must be a non-negative id")
+    return limit, after
+
+
+def read_sign_query(params) -> SignQuery:
+    """Повторювані category=, fields=id,name,... і, за наявності limit/after, keyset-пагінація"""
+    limit = after = None
+    if wants_pagination(params):
+        limit, after = read_pagination_args(params)
+    fields = params.get('fields')
+    try:
+        return SignQuery(params.getlist('category'), fields.split(',') if fields is not None else None, limit, after)
+    except ValueError as e:
+        raise validation_error("INVALID_SIGN_QUERY", str(e))
+
+
+def read_export_format(params) -> tuple[str, object, str]:
+    """(format, генератор рядків, media type)"""
+    export_format = params.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        raise validation_error("INVALID_EXPORT_FORMAT", "format must be 'ndjson' or 'csv'")
+    iter_rows, media_type = EXPORT_FORMATS[export_format]
+    return export_format, iter_rows, media_type
+
+
+def export_headers(export_format: str) -> dict:
+    return {'Content-Disposition': f'attachment; filename=signs.{export_format}'}
+
+
+# --- Пошук і підказки ---
+
+def search_signs(params, search) -> tuple[int, dict]:
+    """search(query, limit, offset) -> [RoadSign]: RoadSignRepository.search"""
+    query = params.get('q', '').strip()
+    try:
+        limit = int(params.get('limit', DEFAULT_SEARCH_LIMIT))
+        offset = int(params.get('offset', 0))
+    except ValueError:
+        limit = offset = -1
+    if not query or not 1 <= limit <= MAX_PAGE_SIZE or offset < 0:
+        raise validation_error("INVALID_SEARCH_QUERY",
+                               f"q is required, limit must be 1..{MAX_PAGE_SIZE}, offset must be non-negative")
+    signs = search(query, limit, offset)
+    next_offset = offset + limit if len(signs) == limit else None
+    return 200, {'message': 'success', 'data': [s.to_dict() for s in signs], 'next_offset': next_offset}
+
+
+def suggest_signs(params, lookup) -> tuple[int, dict]:
+    """lookup(prefix, limit): SignSuggestIndex.suggest (з синхронізацією) або lookup (ASGI синхронізує сам)"""
+    prefix = params.get('prefix', '')
+    try:
+        limit = int(params.get('limit', DEFAULT_SUGGEST_LIMIT))
+    except ValueError:
+        limit = -1
+    if not prefix.strip() or len(prefix) > MAX_PREFIX_LENGTH or not 1 <= limit <= MAX_SUGGESTIONS:
+        raise validation_error("INVALID_SUGGEST_QUERY",
+                               f"prefix must be 1..{MAX_PREFIX_LENGTH} characters, limit must be 1..{MAX_SUGGESTIONS}")
+    return 200, {'message': 'success', 'data': lookup(prefix, limit)}
+
+
+# --- Журнал змін ---
+
+def read_changes_args(params, last_event_id: str = None) -> tuple[int | None, int, float]:
+    """(since, limit, wait); since=None - клієнт лише дізнається поточну версію"""
+    since = params.get('since', last_event_id)
+    try:
+        since = int(since) if since is not None else None
+        limit = int(params.get('limit', MAX_PAGE_SIZE))
+        wait = float(params.get('wait', 0))
+    except ValueError:
+        since, limit, wait = -1, 0, 0
+    if (since is not None and since < 0) or not 1 <= limit <= MAX_PAGE_SIZE or not 0 <= wait <= MAX_WAIT:
+        raise validation_error("INVALID_CHANGES_QUERY",
+                               f"since must be non-negative, limit 1..{MAX_PAGE_SIZE}, wait 0..{MAX_WAIT:g} seconds")
+    return since, limit, wait
+
+
+def changes_head(version: int) -> tuple[int, dict]:
+    return 200, {'message': 'success', 'data': [], 'version': version, 'has_more': False}
+
+
+def changes_batch(batch: dict) -> tuple[int, dict]:
+    return 200, {'message': 'success', 'data': batch['changes'], 'version': batch['version'],
+                 'has_more': batch['has_more']}
+
+
+SSE_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+
+# --- Автентифікація ---
+
+def username_exists() -> tuple[int, dict]:
+    return 409, {"error": "Username exists"}
+
+
+def registered() -> tuple[int, dict]:
+    return 201, {"message": "User registered"}
+
+
+def login_result(user_row, role_cache) -> tuple[int, dict]:
+    """
+    Відповідь /login; user_row=None - невірні облікові дані.
+    JWT створює flask_jwt_extended - потрібен контекст Flask-застосунку (ASGI входить у нього сам).
+    """
+    if not user_row:
+        return 401, {"error": "Invalid credentials"}
+    access_token = create_access_token(
+        identity=str(user_row['id']),
+        additional_claims={'role': user_row['role'], 'rv': user_row['role_version']}
+    )
+    role_cache.set(user_row['id'], user_row['role'], user_row['role_version'])
+    return 200, {"message": "Login successful", "access_token": access_token,
+                 "user": {'id': user_row['id'], 'username': user_row['username'], 'role': user_row['role']}}
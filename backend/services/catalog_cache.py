@@ -0,0 +1,205 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from repositories.category import CategoryRepository
+from repositories.road_sign import RoadSignRepository, SignQuery
+from repositories.sign_changes import SignChangeRepository
+from services.json_codec import dumps
+from services.metrics import CATALOG_CACHE_LOOKUPS
+
+MAX_ENTRIES = 1024  # верхня межа кількості закешованих відповідей
+# Як часто звіряти версію каталогу з БД: записи інших воркерів і вузлів видно не пізніше ніж за цей час
+VERSION_CHECK_INTERVAL = float(os.getenv("CATALOG_VERSION_CHECK_MS", "500")) / 1000
+
+
+class CachedBody:
+    """Готове тіло JSON-відповіді разом з його сильним ETag"""
+    __slots__ = ('version', 'body', 'etag')
+
+    def __init__(self, version, body: bytes):
+        self.version = version
+        self.body = body
+        self.etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def list_body(data_json: bytes) -> bytes:
+    """Обгортка {"message": "success", "data": [...]} навколо вже готового JSON-масиву"""
+    return b'{"message":"success","data":' + data_json + b'}'
+
+
+class CatalogCache:
+    """
+    Read-through кеш перед RoadSignRepository.
+    Зберігає вже серіалізовані тіла відповідей для кожного маршруту/категорії.
+    Запис вважається актуальним, поки не змінилась версія каталогу: лічильник змін цього процесу
+    і голова журналу змін у БД (change_repo), яка звіряється не частіше ніж раз на version_check_interval.
+    Без change_repo кеш бачить лише зміни, зроблені в цьому процесі.
+    """
+
+    def __init__(self, repo: RoadSignRepository, max_entries: int = MAX_ENTRIES,
+                 category_repo: CategoryRepository = None, change_repo: SignChangeRepository = None,
+                 version_check_interval: float = VERSION_CHECK_INTERVAL, clock=time.monotonic):
+        self.repo = repo
+        self.category_repo = category_repo or CategoryRepository()
+        self.change_repo = change_repo
+        self.max_entries = max_entries
+        self.version_check_interval = version_check_interval
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_version = None
+        self._checked_local = None
+        self._next_check = 0.0
+
+    def version(self):
+        """Поточна версія каталогу; власний запис процесу змушує перечитати голову журналу одразу"""
+        local = self.repo.get_version()
+        if self.change_repo is None:
+            return local
+        now = self.clock()
+        if local != self._checked_local or now >= self._next_check:
+            self._checked_local, self._next_check = local, now + self.version_check_interval
+            self._db_version = self.change_repo.get_head()
+        return local, self._db_version
+
+    def _lookup(self, key) -> CachedBody | None:
+        version = self.version()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.version != version:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, key, entry: CachedBody) -> None:
+        version = self.version()
+        with self._lock:
+            # Не кешуємо дані, якщо каталог змінився під час завантаження
+            if entry.version != version:
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _lookup_counted(self, key) -> CachedBody | None:
+        entry = self._lookup(key)
+        CATALOG_CACHE_LOOKUPS.labels('miss' if entry is None else 'hit').inc()
+        return entry
+
+    def _load(self, key, load) -> CachedBody | None:
+        version = self.version()
+        body = load()
+        if body is None:
+            return None
+        entry = CachedBody(version, body)
+        self._store(key, entry)
+        return entry
+
+    def _get_or_load(self, key, load) -> CachedBody | None:
+        entry = self._lookup_counted(key)
+        return entry if entry is not None else self._load(key, load)
+
+    # Ключ кешу і завантажувач для кожного маршруту (спільні для синхронного та async-доступу)
+    # Списки збирає сам SQLite (get_all_json), тож на рядок не створюється жодного Python-об'єкта
+    def _all_signs_spec(self):
+        return ('all',), lambda: list_body(self.repo.get_all_json())
+
+    def _signs_by_category_spec(self, category: str):
+        return ('category', category), lambda: list_body(self.repo.get_all_json(category))
+
+    def _page_spec(self, limit: int, after: int = None, category: str = None):
+        def load():
+            signs = self.repo.get_page(limit, after, category)
+            next_after = signs[-1].id if len(signs) == limit else None
+            return dumps({'message': 'success', 'data': [s.to_dict() for s in signs], 'next_after': next_after})
+
+        return ('page', category, after, limit), load
+
+    def _query_spec(self, query: SignQuery):
+        def load():
+            data, next_after = self.repo.find_json(query)
+            if query.limit is None:
+                return list_body(data)
+            return list_body(data)[:-1] + b',"next_after":' + dumps(next_after) + b'}'
+
+        return ('query',) + query.key, load
+
+    def _sign_by_id_spec(self, sign_id: int):
+        def load():
+            sign = self.repo.get_by_id(sign_id)
+            return dumps({'message': 'success', 'data': sign.to_dict()}) if sign else None
+
+        return ('id', sign_id), load
+
+    def _categories_spec(self):
+        # Лічильники оновлюють тригери в транзакціях запису, що й так змінюють версію каталогу
+        def load():
+            return dumps({'message': 'success', 'data': [c.to_dict() for c in self.category_repo.get_all()]})
+
+        return ('categories',), load
+
+    def all_signs(self) -> CachedBody:
+        return self._get_or_load(*self._all_signs_spec())
+
+    def signs_by_category(self, category: str) -> CachedBody:
+        return self._get_or_load(*self._signs_by_category_spec(category))
+
+    def page(self, limit: int, after: int = None, category: str = None) -> CachedBody:
+        return self._get_or_load(*self._page_spec(limit, after, category))
+
+    def query(self, query: SignQuery) -> CachedBody:
+        return self._get_or_load(*self._query_spec(query))
+
+    def sign_by_id(self, sign_id: int) -> CachedBody | None:
+        return self._get_or_load(*self._sign_by_id_spec(sign_id))
+
+    def categories(self) -> CachedBody:
+        return self._get_or_load(*self._categories_spec())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class AsyncCatalogCache:
+    """
+    Доступ до того самого CatalogCache з event loop (ASGI-режим).
+    Влучання віддається одразу, без переходу в інший потік; промах завантажується через `run`
+    (DB-екзекутор), щоб запит до SQLite не блокував цикл подій.
+    """
+
+    def __init__(self, cache: CatalogCache, run):
+        self.cache = cache
+        self.run = run
+
+    async def _get_or_load(self, spec) -> CachedBody | None:
+        key, load = spec
+        entry = self.cache._lookup_counted(key)
+        if entry is not None:
+            return entry
+        return await self.run(self.cache._load, key, load)
+
+    async def all_signs(self) -> CachedBody:
+        return await self._get_or_load(self.cache._all_signs_spec())
+
+    async def signs_by_category(self, category: str) -> CachedBody:
+        return await self._get_or_load(self.cache._signs_by_category_spec(category))
+
+    async def page(self, limit: int, after: int = None, category: str = None) -> CachedBody:
+        return await self._get_or_load(self.cache._page_spec(limit, after, category))
+
+    async def query(self, query: SignQuery) -> CachedBody:
+        return await self._get_or_load(self.cache._query_spec(query))
+
+    async def sign_by_id(self, sign_id: int) -> CachedBody | None:
+        return await self._get_or_load(self.cache._sign_by_id_spec(sign_id))
+
+    async def categories(self) -> CachedBody:
+        return await self._get_or_load(self.cache._categories_spec())
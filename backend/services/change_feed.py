@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+
+from repositories.base import DB_ERRORS
+from repositories.sign_changes import SignChangeRepository
+from services.json_codec import dumps
+
+MAX_WAIT = 30.0  # найдовший long-poll, с
+POLL_INTERVAL = float(os.getenv("CHANGES_POLL_INTERVAL", "1.0"))  # зміни з інших воркерів видно через БД
+RETENTION = float(os.getenv("CHANGES_RETENTION", str(7 * 24 * 3600)))
+COMPACT_INTERVAL = float(os.getenv("CHANGES_COMPACT_INTERVAL", "3600"))
+SSE_HEARTBEAT = 15.0
+SSE_MAX_SECONDS = float(os.getenv("CHANGES_SSE_MAX_SECONDS", "300"))
+
+logger = logging.getLogger(__name__)
+
+
+class ChangesCompacted(Exception):
+    """since старіша за межу компактування (або новіша за журнал) - клієнту потрібна повна синхронізація"""
+
+    def __init__(self, since: int, horizon: int, head: int):
+        super().__init__(f"Changes since version {since} are not available (horizon {horizon}, head {head})")
+        self.horizon = horizon
+        self.head = head
+
+
+def sse_event(batch: dict) -> bytes:
+    """Подія Server-Sent Events; id = версія, з якої EventSource продовжить після перепідключення"""
+    return b'id: %d\nevent: changes\ndata: %s\n\n' % (batch['version'], dumps(batch))
+
+
+SSE_KEEPALIVE = b': keep-alive\n\n'
+
+
+class ChangeFeed:
+    """
+    Інкрементальна синхронізація каталогу: дельти з журналу змін, long-poll і SSE.
+    notify() підписаний на зміни RoadSignRepository і будить очікувачів цього процесу одразу;
+    зміни, зроблені іншими воркерами, помічаються опитуванням БД раз на poll_interval.
+    """
+
+    def __init__(self, repo: SignChangeRepository = None, poll_interval: float = POLL_INTERVAL,
+                 retention: float = RETENTION, compact_interval: float = COMPACT_INTERVAL):
+        self.repo = repo or SignChangeRepository()
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.compact_interval = compact_interval
+        self._cond = threading.Condition()
+        self._async_waiters = set()
+        self._last_compaction = time.monotonic()
+
+    # --- Читання ---
+
+    def read(self, since: int, limit: int) -> dict:
+        """{'version', 'changes', 'has_more'}; version - since для наступного запиту"""
+        head, horizon = self.repo.get_state()
+        if since < horizon or since > head:
+            raise ChangesCompacted(since, horizon, head)
+        changes = self.repo.get_changes(since, limit + 1)
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        if has_more:
+            version = changes[-1]['version']
+        else:
+            version = max([head] + [c['version'] for c in changes])
+        return {'version': version, 'changes': changes, 'has_more': has_more}
+
+    def head(self) -> int:
+        return self.repo.get_state()[0]
+
+    # --- Очікування (WSGI: блокує потік запиту) ---
+
+    def wait(self, since: int, limit: int, timeout: float, idle=None) -> dict:
+        """idle() викликається перед кожним очікуванням (Flask: повернути з'єднання запиту в пул)"""
+        deadline = time.monotonic() + timeout
+        while True:
+            batch = self.read(since, limit)
+            remaining = deadline - time.monotonic()
+            if batch['changes'] or remaining <= 0:
+                return batch
+            if idle is not None:
+                idle()
+            with self._cond:
+                self._cond.wait(min(self.poll_interval, remaining))
+
+    def iter_events(self, since: int, limit: int, heartbeat: float = SSE_HEARTBEAT,
+                    max_seconds: float = SSE_MAX_SECONDS):
+        """
+        SSE-потік. Обмежений max_seconds, щоб не тримати потік воркера вічно:
+        EventSource сам перепідключиться з Last-Event-ID.
+        """
+        deadline = time.monotonic() + max_seconds
+        while time.monotonic() < deadline:
+            batch = self.wait(since, limit, min(heartbeat, max(deadline - time.monotonic(), 0)))
+            if batch['changes']:
+                since = batch['version']
+                yield sse_event(batch)
+            else:
+                yield SSE_KEEPALIVE
+
+    # --- Очікування (ASGI: без потоку на клієнта) ---
+
+    async def wait_async(self, since: int, limit: int, timeout: float, run) -> dict:
+        """run - виконавець блокуючих викликів (run_db)"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            batch = await run(self.read, since, limit)
+            remaining = deadline - loop.time()
+            if batch['changes'] or remaining <= 0:
+                return batch
+            waiter = (loop, loop.create_future())
+            with self._cond:
+                self._async_waiters.add(waiter)
+            try:
+                await asyncio.wait([waiter[1]], timeout=min(self.poll_interval, remaining))
+            finally:
+                with self._cond:
+                    self._async_waiters.discard(waiter)
+
+    async def iter_events_async(self, since: int, limit: int, run, heartbeat: float = SSE_HEARTBEAT):
+        while True:
+            batch = await self.wait_async(since, limit, heartbeat, run)
+            if batch['changes']:
+                since = batch['version']
+                yield sse_event(batch)
+            else:
+                yield SSE_KEEPALIVE
+
+    # --- Сповіщення і компактування ---
+
+    def notify(self) -> None:
+        """Listener RoadSignRepository: викликається після commit кожної зміни"""
+        with self._cond:
+            self._cond.notify_all()
+            waiters = list(self._async_waiters)
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+        self._maybe_compact()
+
+    def _maybe_compact(self) -> None:
+        now = time.monotonic()
+        with self._cond:
+            if now - self._last_compaction < self.compact_interval:
+                return
+            self._last_compaction = now
+        try:
+            self.repo.compact(self.retention)
+        except DB_ERRORS as e:
+            # Зміна вже закомічена - збій компактування не повинен ламати відповідь на запис
+            logger.warning("change log compaction failed: %s", e)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
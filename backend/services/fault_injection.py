@@ -0,0 +1,193 @@
+import fnmatch
+import json
+import os
+import random
+import threading
+
+try:
+    from opentelemetry import trace
+except ImportError:  # без OpenTelemetry ін'єкції видно лише в метриках
+    trace = None
+
+from services.metrics import FAULT_DELAY, FAULTS_INJECTED
+
+# Профіль, що відтворює колишній "хаос" лабораторної (CHAOS_ENABLED=1):
+# затримки та 500/503 на записах знаків - для перевірки ретраїв і ідемпотентності у фронтенді
+DEMO_PROFILES = {
+    'routes': [
+        {
+            'methods': ['POST', 'PATCH'],
+            'path': '/signs*',
+            'latency': {'rate': 0.15, 'distribution': 'uniform', 'min_ms': 1200, 'max_ms': 2000},
+            'errors': {'rate': 0.10, 'statuses': [500, 503]},
+        },
+        {
+            'methods': ['GET'],
+            'path': '/health',
+            'latency': {'rate': 0.10, 'distribution': 'fixed', 'ms': 2000},
+        },
+    ],
+}
+
+ERROR_NAMES = {500: 'Unexpected Error', 502: 'Bad Gateway', 503: 'Service Unavailable', 504: 'Gateway Timeout'}
+
+
+class LatencyDistribution:
+    """
+    Розподіл штучної затримки, мс:
+    fixed(ms), uniform(min_ms, max_ms), exponential(mean_ms), lognormal(median_ms, sigma).
+    max_ms обрізає хвіст exponential/lognormal.
+    """
+    KINDS = ('fixed', 'uniform', 'exponential', 'lognormal')
+
+    def __init__(self, distribution: str = 'fixed', ms: float = 0, min_ms: float = 0, max_ms: float = None,
+                 mean_ms: float = 0, median_ms: float = 0, sigma: float = 0.5):
+        if distribution not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution '{distribution}', expected one of {self.KINDS}")
+        self.distribution = distribution
+        self.ms = ms
+        self.min_ms = min_ms
+        self.max_ms = max_ms
+        self.mean_ms = mean_ms
+        self.median_ms = median_ms
+        self.sigma = sigma
+
+    def sample(self, rng: random.Random) -> float:
+        """Затримка в секундах"""
+        if self.distribution == 'fixed':
+            ms = self.ms
+        elif self.distribution == 'uniform':
+            ms = rng.uniform(self.min_ms, self.max_ms if self.max_ms is not None else self.min_ms)
+        elif self.distribution == 'exponential':
+            ms = rng.expovariate(1 / self.mean_ms) if self.mean_ms > 0 else 0
+        else:
+            ms = self.median_ms * rng.lognormvariate(0, self.sigma)
+        if self.max_ms is not None:
+            ms = min(ms, self.max_ms)
+        return max(ms, 0) / 1000
+
+
+class FaultRule:
+    """Профіль збоїв для маршрутів, що збігаються з glob-шаблоном шляху та методом"""
+    __slots__ = ('path', 'methods', 'latency_rate', 'latency', 'error_rate', 'statuses')
+
+    def __init__(self, path: str, methods=None, latency_rate: float = 0.0, latency: LatencyDistribution = None,
+                 error_rate: float = 0.0, statuses=(500, 503)):
+        self.path = path
+        self.methods = frozenset(m.upper() for m in methods) if methods else None
+        self.latency_rate = latency_rate if latency is not None else 0.0
+        self.latency = latency
+        self.error_rate = error_rate
+        self.statuses = tuple(statuses)
+
+    def matches(self, method: str, path: str) -> bool:
+        return (self.methods is None or method in self.methods) and fnmatch.fnmatchcase(path, self.path)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'FaultRule':
+        latency = dict(data.get('latency') or {})
+        errors = data.get('errors') or {}
+        latency_rate = latency.pop('rate', 1.0 if latency else 0.0)
+        return cls(
+            path=data.get('path', '*'),
+            methods=data.get('methods'),
+            latency_rate=latency_rate,
+            latency=LatencyDistribution(**latency) if latency else None,
+            error_rate=errors.get('rate', 0.0),
+            statuses=errors.get('statuses', (500, 503)),
+        )
+
+
+class Fault:
+    """Рішення для одного запиту: затримка (с) і/або статус помилки"""
+    __slots__ = ('delay', 'status', 'rule')
+
+    def __init__(self, delay: float, status: int | None, rule: FaultRule):
+        self.delay = delay
+        self.status = status
+        self.rule = rule
+
+    @property
+    def error_name(self) -> str:
+        return ERROR_NAMES.get(self.status, 'Injected Fault')
+
+
+class FaultInjector:
+    """
+    Рушій ін'єкції збоїв: перше правило, що збіглося з (method, path), вирішує долю запиту.
+    seed вмикає детермінований режим: один генератор на рушій, тож та сама послідовність
+    запитів отримує ті самі збої (для відтворюваних тестів і бенчмарків).
+    """
+
+    def __init__(self, rules: list[FaultRule], seed: int = None):
+        self.rules = list(rules)
+        self.seed = seed
+        self._rng = random.Random(seed) if seed is not None else random.Random()
+        self._lock = threading.Lock() if seed is not None else None
+
+    def decide(self, method: str, path: str) -> Fault | None:
+        rule = next((r for r in self.rules if r.matches(method, path)), None)
+        if rule is None:
+            return None
+        if self._lock is None:
+            return self._roll(rule, self._rng)
+        with self._lock:
+            return self._roll(rule, self._rng)
+
+    @staticmethod
+    def _roll(rule: FaultRule, rng: random.Random) -> Fault | None:
+        delay = rule.latency.sample(rng) if rule.latency_rate and rng.random() < rule.latency_rate else 0.0
+        status = rng.choice(rule.statuses) if rule.error_rate and rng.random() < rule.error_rate else None
+        if not delay and status is None:
+            return None
+        return Fault(delay, status, rule)
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'FaultInjector':
+        return cls([FaultRule.from_dict(r) for r in config.get('routes', [])], seed=config.get('seed'))
+
+
+def record_fault(fault: Fault) -> None:
+    """Метрики і атрибути поточного спану: ін'єкції видно в трейсах поруч зі справжніми затримками"""
+    if fault.delay:
+        FAULTS_INJECTED.labels('latency').inc()
+        FAULT_DELAY.labels(fault.rule.path).observe(fault.delay * 1000)
+    if fault.status is not None:
+        FAULTS_INJECTED.labels(str(fault.status)).inc()
+    if trace is not None:
+        span = trace.get_current_span()
+        if span.is_recording():
+            attributes = {'fault.rule': fault.rule.path, 'fault.delay_ms': round(fault.delay * 1000, 1)}
+            if fault.status is not None:
+                attributes['fault.status'] = fault.status
+            span.set_attributes({'fault.injected': True, **attributes})
+            span.add_event('fault_injected', attributes)
+
+
+def load_fault_profiles(value) -> dict | None:
+    """Профілі з dict, JSON-рядка або шляху до JSON-файлу; None/'' - ін'єкцію вимкнено"""
+    if not value:
+        return None
+    if isinstance(value, dict):
+        return value
+    value = value.strip()
+    if value.startswith('{'):
+        return json.loads(value)
+    with open(value, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def fault_profiles_from_env():
+    """FAULT_PROFILES (JSON або шлях до файлу); CHAOS_ENABLED=1 - вбудований демо-профіль"""
+    if os.getenv("FAULT_PROFILES"):
+        return os.getenv("FAULT_PROFILES")
+    if os.getenv("CHAOS_ENABLED", "0") == "1":
+        return DEMO_PROFILES
+    return None
+
+
+def create_fault_injector(value) -> FaultInjector | None:
+    profiles = load_fault_profiles(value)
+    if not profiles or not profiles.get('routes'):
+        return None
+    return FaultInjector.from_config(profiles)
@@ -0,0 +1,201 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Скільки секунд дублікат чекає на результат першого запиту
+WAIT_TIMEOUT = 10.0
+# Через скільки секунд незавершений запис (впав воркер) можна перехопити
+STALE_PENDING_AFTER = 30.0
+
+
+class StoredResponse:
+    """Збережений результат запиту з певним Idempotency-Key"""
+    __slots__ = ('fingerprint', 'status', 'body')
+
+    def __init__(self, fingerprint: str, status: int, body: bytes):
+        self.fingerprint = fingerprint
+        self.status = status
+        self.body = body
+
+
+class IdempotencyInProgress(Exception):
+    """Запит з таким ключем ще виконується (в цьому або іншому воркері)"""
+
+
+class IdempotencyKeyReused(Exception):
+    """Ключ вже використано для запиту з іншим тілом/маршрутом"""
+
+
+class IdempotencyStore:
+    """
+    Сховище відповідей за Idempotency-Key.
+    - LRU + TTL у пам'яті обмежують споживання пам'яті;
+    - опційна SQLite-таблиця зберігає ключі між рестартами і спільна для воркерів;
+    - одночасні запити з однаковим ключем об'єднуються: дублікат чекає на результат першого.
+    """
+
+    def __init__(self, max_entries: int = 10_000, ttl: float = 24 * 3600, db_path: str = None,
+                 wait_timeout: float = WAIT_TIMEOUT, clock=time.time):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self.wait_timeout = wait_timeout
+        self.clock = clock
+        self._completed = OrderedDict()  # key -> (StoredResponse, expires_at)
+        self._in_flight = {}  # key -> threading.Event
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # --- Публічний API ---
+
+    def begin(self, key: str, fingerprint: str) -> StoredResponse | None:
+        """
+        Повертає збережену відповідь (якщо запит вже виконано) або None,
+        що означає: викликач став власником ключа і мусить викликати complete() або abandon().
+        """
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            with self._lock:
+                stored = self._get_cached(key)
+                if stored is None:
+                    event = self._in_flight.get(key)
+                    if event is None:
+                        event = threading.Event()
+                        self._in_flight[key] = event
+                        owner = True
+                    else:
+                        owner = False
+
+            if stored is not None:
+                return self._check(stored, fingerprint)
+
+            if not owner:
+                # Дублікат у цьому ж процесі - чекаємо, поки перший запит завершиться
+                if not event.wait(max(0.0, deadline - time.monotonic())):
+                    raise IdempotencyInProgress(key)
+                continue
+
+            if not self.db_path:
+                return None
+            try:
+                stored = self._claim_persistent(key, fingerprint, deadline)
+            except Exception:
+                self._finish(key)
+                raise
+            if stored is None:
+                return None
+            self._finish(key, stored)
+            return self._check(stored, fingerprint)
+
+    def complete(self, key: str, response: StoredResponse) -> None:
+        """Зберегти результат і розбудити всіх, хто чекає на цей ключ"""
+        if self.db_path:
+            with self._connection() as conn:
+                conn.execute(
+                    "UPDATE idempotency_keys SET status = ?, body = ? WHERE key = ?",
+                    (response.status, response.body, key)
+                )
+        self._finish(key, response)
+
+    def abandon(self, key: str) -> None:
+        """Запит завершився помилкою: звільнити ключ, щоб клієнт міг повторити спробу"""
+        if self.db_path:
+            with self._connection() as conn:
+                conn.execute("DELETE FROM idempotency_keys WHERE key = ? AND status IS NULL", (key,))
+        self._finish(key)
+
+    # --- Внутрішні методи ---
+
+    @staticmethod
+    def _check(stored: StoredResponse, fingerprint: str) -> StoredResponse:
+        if stored.fingerprint != fingerprint:
+            raise IdempotencyKeyReused()
+        return stored
+
+    def _get_cached(self, key: str) -> StoredResponse | None:
+        item = self._completed.get(key)
+        if item is None:
+            return None
+        stored, expires_at = item
+        if expires_at < self.clock():
+            del self._completed[key]
+            return None
+        self._completed.move_to_end(key)
+        return stored
+
+    def _finish(self, key: str, stored: StoredResponse = None) -> None:
+        with self._lock:
+            if stored is not None:
+                self._completed[key] = (stored, self.clock() + self.ttl)
+                self._completed.move_to_end(key)
+                while len(self._completed) > self.max_entries:
+                    self._completed.popitem(last=False)
+            event = self._in_flight.pop(key, None)
+        if event is not None:
+            event.set()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Файл і таблиця створюються при першому запиті, а не під час імпорту застосунку
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute('''CREATE TABLE IF NOT EXISTS idempotency_keys (
+                key TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                status INTEGER,
+                body BLOB,
+                created_at REAL NOT NULL
+            ) WITHOUT ROWID''')
+            self._local.conn = conn
+        return conn
+
+    def _claim_persistent(self, key: str, fingerprint: str, deadline: float) -> StoredResponse | None:
+        """Займає ключ у спільній таблиці або чекає на результат іншого воркера"""
+        conn = self._connection()
+        while True:
+            now = self.clock()
+            with conn:
+                conn.execute("DELETE FROM idempotency_keys WHERE created_at < ?", (now - self.ttl,))
+                conn.execute(
+                    "DELETE FROM idempotency_keys WHERE key = ? AND status IS NULL AND created_at < ?",
+                    (key, now - STALE_PENDING_AFTER)
+                )
+                inserted = conn.execute(
+                    "INSERT OR IGNORE INTO idempotency_keys (key, fingerprint, created_at) VALUES (?, ?, ?)",
+                    (key, fingerprint, now)
+                ).rowcount
+            if inserted:
+                return None
+
+            row = conn.execute(
+                "SELECT fingerprint, status, body FROM idempotency_keys WHERE key = ?", (key,)
+            ).fetchone()
+            if row and row[1] is not None:
+                return StoredResponse(row[0], row[1], row[2] or b'')
+            if row and row[0] != fingerprint:
+                raise IdempotencyKeyReused()
+            if time.monotonic() >= deadline:
+                raise IdempotencyInProgress(key)
+            time.sleep(0.05)
+
+
+def create_idempotency_store() -> IdempotencyStore:
+    """
+    IDEMPOTENCY_BACKEND=memory (за замовчуванням) або sqlite -
+    спільна для воркерів таблиця у файлі IDEMPOTENCY_DB.
+    """
+    db_path = None
+    if os.getenv("IDEMPOTENCY_BACKEND", "memory") == "sqlite":
+        default_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    'data', 'idempotency.db')
+        db_path = os.getenv("IDEMPOTENCY_DB", default_path)
+    return IdempotencyStore(
+        max_entries=int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000")),
+        ttl=float(os.getenv("IDEMPOTENCY_TTL", str(24 * 3600))),
+        db_path=db_path,
+    )
@@ -0,0 +1,156 @@
+import contextlib
+import hashlib
+import io
+import os
+import re
+import tempfile
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # без Pillow зберігається лише оригінал, мініатюри віддаються ним же
+    Image = ImageOps = None
+
+DEFAULT_IMAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'images')
+MAX_IMAGE_BYTES = int(os.getenv("MAX_IMAGE_BYTES", str(5 * 1024 * 1024)))
+THUMBNAIL_SIZE = int(os.getenv("THUMBNAIL_SIZE", "256"))
+WEBP_QUALITY = 80
+
+VARIANTS = ('original', 'thumb')
+MIMETYPES = {'png': 'image/png', 'jpg': 'image/jpeg', 'gif': 'image/gif', 'webp': 'image/webp'}
+_DIGEST_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+class InvalidImage(ValueError):
+    """Тіло запиту не є підтримуваним зображенням або завелике"""
+
+
+def sniff_format(data: bytes) -> str | None:
+    """Формат за сигнатурою файлу (Content-Type від клієнта не довіряємо)"""
+    if data.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if data.startswith(b'\xff\xd8\xff'):
+        return 'jpg'
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+def is_digest(value: str) -> bool:
+    return bool(_DIGEST_RE.match(value or ''))
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """Унікальний тимчасовий файл (і між потоками одного воркера) у тому ж каталозі і rename"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f".{os.path.basename(path)}.", suffix='.tmp')
+    try:
+        os.fchmod(fd, 0o644)  # mkstemp створює 0600, а файли може віддавати nginx
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+class ImageStore:
+    """
+    Зображення знаків, адресовані хешем вмісту (sha256): <root>/<ab>/<digest>/<variant>.<ext>.
+    Файл за адресою ніколи не змінюється, тож його можна кешувати назавжди (immutable),
+    а однакові завантаження зберігаються один раз.
+    Мініатюра і WebP-варіанти генеруються під час завантаження, а не на запит.
+    """
+
+    def __init__(self, root: str = DEFAULT_IMAGE_DIR, thumbnail_size: int = THUMBNAIL_SIZE,
+                 max_bytes: int = MAX_IMAGE_BYTES):
+        self.root = root
+        self.thumbnail_size = thumbnail_size
+        self.max_bytes = max_bytes
+
+    def _dir(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def save(self, data: bytes) -> str:
+        """Зберегти зображення з усіма варіантами; повертає digest"""
+        if not data:
+            raise InvalidImage("Image body is empty")
+        if len(data) > self.max_bytes:
+            raise InvalidImage(f"Image is larger than {self.max_bytes} bytes")
+        fmt = sniff_format(data)
+        if fmt is None:
+            raise InvalidImage("Supported image formats: PNG, JPEG, GIF, WebP")
+
+        digest = hashlib.sha256(data).hexdigest()
+        directory = self._dir(digest)
+        original = os.path.join(directory, f'original.{fmt}')
+        if os.path.exists(original):
+            return digest  # уже збережено разом з варіантами
+        os.makedirs(directory, exist_ok=True)
+        for name, body in self._render_variants(data, fmt):
+            _write_atomic(os.path.join(directory, name), body)
+        _write_atomic(original, data)  # останнім: його наявність означає, що варіанти готові
+        return digest
+
+    def _render_variants(self, data: bytes, fmt: str):
+        """(name, bytes) для мініатюри у форматі оригіналу та WebP-версій"""
+        if Image is None:
+            return
+        try:
+            image = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+            image.load()
+        except Exception as e:
+            raise InvalidImage(f"Image cannot be decoded: {e}") from e
+        has_alpha = image.mode in ('RGBA', 'LA', 'P')
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+
+        thumb = image.copy()
+        thumb.thumbnail((self.thumbnail_size, self.thumbnail_size), Image.LANCZOS)
+        thumb_fmt = 'jpg' if fmt == 'jpg' else 'png'
+        yield f'thumb.{thumb_fmt}', self._encode(thumb, thumb_fmt)
+        yield 'thumb.webp', self._encode(thumb, 'webp')
+        if fmt != 'webp':
+            yield 'original.webp', self._encode(image, 'webp')
+
+    @staticmethod
+    def _encode(image, fmt: str) -> bytes:
+        buffer = io.BytesIO()
+        if fmt == 'jpg':
+            image.save(buffer, 'JPEG', quality=85, optimize=True, progressive=True)
+        elif fmt == 'png':
+            image.save(buffer, 'PNG', optimize=True)
+        else:
+            image.save(buffer, 'WEBP', quality=WEBP_QUALITY, method=6)
+        return buffer.getvalue()
+
+    def resolve(self, digest: str, variant: str, accept_webp: bool = False) -> tuple[str, str] | None:
+        """
+        (шлях, mimetype) файлу для відповіді: WebP, якщо клієнт його приймає і варіант є;
+        мініатюри немає (без Pillow) - оригінал. None - зображення не існує.
+        """
+        if not is_digest(digest) or variant not in VARIANTS:
+            return None
+        directory = self._dir(digest)
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return None
+        by_variant = {}
+        for name in names:
+            stem, _, ext = name.partition('.')
+            if ext in MIMETYPES:
+                by_variant.setdefault(stem, {})[ext] = name
+        candidates = by_variant.get(variant) or by_variant.get('original')
+        if not candidates:
+            return None
+        if accept_webp and 'webp' in candidates:
+            ext = 'webp'
+        else:
+            ext = next((e for e in candidates if e != 'webp'), 'webp')
+        return os.path.join(directory, candidates[ext]), MIMETYPES[ext]
+
+
+def create_image_store(root: str = None) -> ImageStore:
+    """IMAGE_DIR, THUMBNAIL_SIZE, MAX_IMAGE_BYTES з оточення"""
+    return ImageStore(root or os.getenv("IMAGE_DIR", DEFAULT_IMAGE_DIR))
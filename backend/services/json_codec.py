@@ -0,0 +1,15 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson - опційне прискорення, без нього працює stdlib json
+    orjson = None
+
+ENCODER = 'orjson' if orjson is not None else 'json'
+
+
+def dumps(obj) -> bytes:
+    """Компактний JSON у UTF-8 байтах (orjson, якщо встановлено, інакше stdlib)"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
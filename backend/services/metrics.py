@@ -0,0 +1,67 @@
+import os
+
+try:
+    from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge,
+                                   Histogram, generate_latest)
+except ImportError:  # без prometheus_client /metrics недоступний, метрики - no-op
+    Counter = Gauge = Histogram = None
+    CONTENT_TYPE_LATEST = 'text/plain; version=0.0.4; charset=utf-8'
+
+from repositories.instrumentation import NoopMetric
+
+# Імена HTTP-метрик збігаються з тими, що використовує docs/my-demo-red-dashboard.json
+HTTP_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def _metric(kind, name, documentation, labelnames=(), **kwargs):
+    if kind is None:
+        return NoopMetric()
+    if kind is Gauge and os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        kwargs.setdefault('multiprocess_mode', 'livesum')
+    return kind(name, documentation, labelnames, **kwargs)
+
+
+HTTP_REQUEST_DURATION = _metric(Histogram, 'http_request_duration_ms', 'HTTP request duration, ms',
+                                ['route', 'method', 'status'], buckets=HTTP_BUCKETS_MS)
+HTTP_REQUESTS = _metric(Counter, 'http_requests', 'HTTP requests', ['route', 'method', 'status'])
+HTTP_REQUEST_ERRORS = _metric(Counter, 'http_requests_error', 'HTTP requests with 5xx status',
+                              ['route', 'method', 'status'])
+HTTP_REQUEST_DB_STATEMENTS = _metric(Histogram, 'http_request_db_statements', 'SQL statements per HTTP request',
+                                     ['route'], buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100))
+HTTP_REQUEST_DB_DURATION = _metric(Histogram, 'http_request_db_duration_ms',
+                                   'Time spent in SQL statements per HTTP request, ms', ['route'],
+                                   buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000))
+HTTP_INFLIGHT = _metric(Gauge, 'http_inflight_requests', 'Requests currently being processed')
+
+RATE_LIMIT_REJECTIONS = _metric(Counter, 'rate_limit_rejections', 'Requests rejected by the rate limiter',
+                                ['route'])
+IDEMPOTENCY_EVENTS = _metric(Counter, 'idempotency_events',
+                             'Idempotency outcomes: replay, in_progress, key_reused', ['outcome'])
+ADMISSION_REJECTIONS = _metric(Counter, 'admission_rejections',
+                               'Requests shed by admission control before the handler', ['route_class'])
+ADMISSION_LIMIT = _metric(Gauge, 'admission_concurrency_limit', 'Current adaptive concurrency limit',
+                          ['route_class'])
+FAULTS_INJECTED = _metric(Counter, 'faults_injected', 'Faults injected by the fault-injection engine', ['kind'])
+FAULT_DELAY = _metric(Histogram, 'fault_injected_delay_ms', 'Injected latency by fault rule, ms', ['rule'],
+                      buckets=HTTP_BUCKETS_MS)
+CATALOG_CACHE_LOOKUPS = _metric(Counter, 'catalog_cache_lookups', 'Catalog cache lookups', ['result'])
+PASSWORD_HASH_DURATION = _metric(Histogram, 'password_hash_duration_ms',
+                                 'bcrypt hash/check duration including queueing, ms', ['operation'],
+                                 buckets=(10, 50, 100, 200, 300, 500, 1000, 2500, 5000, 10000))
+PASSWORD_HASH_REJECTIONS = _metric(Counter, 'password_hash_rejections',
+                                   'Hash requests rejected because the worker pool was saturated')
+STARTUP_SECONDS = _metric(Gauge, 'app_startup_seconds',
+                          'Cold start phases: import, create_app, telemetry, warm_up', ['phase'],
+                          multiprocess_mode='max')
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Тіло та Content-Type для GET /metrics (з підтримкою multiprocess-режиму gunicorn)"""
+    if Counter is None:
+        return b'# prometheus_client is not installed\n', CONTENT_TYPE_LATEST
+    registry = REGISTRY
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,163 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+import bcrypt
+
+from services.metrics import PASSWORD_HASH_DURATION, PASSWORD_HASH_REJECTIONS
+
+DEFAULT_ROUNDS = 12
+
+
+def _hash_password(password: str, rounds: int) -> str:
+    """(Worker) bcrypt-хеш пароля; виконується в окремому процесі"""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check_password(password_hash: str, password: str) -> bool:
+    """(Worker) Перевірка пароля проти bcrypt-хешу"""
+    return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
+
+def get_rounds(password_hash: str) -> int | None:
+    """Cost factor з хешу формату $2b$12$..."""
+    try:
+        return int(password_hash.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class HasherBusy(Exception):
+    """Черга хешування переповнена; retry_after - оцінка часу до звільнення"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Password hashing queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """
+    Хешування паролів bcrypt в обмеженому пулі процесів.
+    Запит-потік не тримає CPU/GIL на 100-300 мс, а при переповненій черзі
+    одразу отримує HasherBusy замість того, щоб чекати і блокувати інші маршрути.
+    mode='inline' виконує bcrypt у потоці запиту (поведінка до пулу, для порівняння в бенчмарку).
+    """
+
+    def __init__(self, rounds: int = DEFAULT_ROUNDS, workers: int = 2, max_queue: int = 16,
+                 timeout: float = 10.0, mode: str = 'process'):
+        self.rounds = rounds
+        self.workers = workers
+        self.timeout = timeout
+        self.mode = mode
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._pending = 0
+        self._avg_duration = 0.25  # EWMA тривалості одного хешування, с
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Пул створюється ліниво: у кожному воркері gunicorn - свій, вже після fork
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def _retry_after(self) -> int:
+        return max(1, math.ceil(self._pending * self._avg_duration / self.workers))
+
+    def _submit(self, operation: str, fn, *args) -> Future:
+        """Поставити завдання в пул; слот звільняється, коли воркер справді завершить роботу"""
+        if not self._slots.acquire(blocking=False):
+            PASSWORD_HASH_REJECTIONS.inc()
+            raise HasherBusy(self._retry_after())
+        started = time.perf_counter()
+        with self._lock:
+            self._pending += 1
+
+        def done(_future=None):
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._pending -= 1
+                self._avg_duration = 0.8 * self._avg_duration + 0.2 * elapsed
+            self._slots.release()
+            PASSWORD_HASH_DURATION.labels(operation).observe(elapsed * 1000)
+
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            done()
+            raise
+        future.add_done_callback(done)
+        return future
+
+    def _run_inline(self, operation: str, fn, *args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            PASSWORD_HASH_DURATION.labels(operation).observe((time.perf_counter() - started) * 1000)
+
+    def _run(self, operation: str, fn, *args):
+        if self.mode == 'inline':
+            return self._run_inline(operation, fn, *args)
+        future = self._submit(operation, fn, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise self._timed_out(future) from None
+
+    def _timed_out(self, future: Future) -> HasherBusy:
+        """
+        Пул не встиг за timeout - той самий 503, що й при переповненій черзі.
+        Завдання, що ще чекає в черзі, скасовується; вже запущене довершиться і звільнить слот саме.
+        """
+        future.cancel()
+        PASSWORD_HASH_REJECTIONS.inc()
+        return HasherBusy(self._retry_after())
+
+    async def _run_async(self, operation: str, fn, *args):
+        """Для ASGI: event loop не блокується, поки bcrypt рахує в іншому процесі"""
+        loop = asyncio.get_running_loop()
+        if self.mode == 'inline':
+            return await loop.run_in_executor(None, self._run_inline, operation, fn, *args)
+        submitted = self._submit(operation, fn, *args)
+        # shield: таймаут не скасовує вже запущене хешування, слот звільниться після нього
+        try:
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(submitted, loop=loop)), self.timeout)
+        except asyncio.TimeoutError:
+            raise self._timed_out(submitted) from None
+
+    def hash(self, password: str) -> str:
+        return self._run('hash', _hash_password, password, self.rounds)
+
+    def check(self, password_hash: str, password: str) -> bool:
+        return self._run('check', _check_password, password_hash, password)
+
+    async def hash_async(self, password: str) -> str:
+        return await self._run_async('hash', _hash_password, password, self.rounds)
+
+    async def check_async(self, password_hash: str, password: str) -> bool:
+        return await self._run_async('check', _check_password, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Хеш створено з іншим cost factor - після успішного логіну його варто перерахувати"""
+        return get_rounds(password_hash) != self.rounds
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+def create_password_hasher() -> PasswordHasher:
+    """Конфігурація з оточення: BCRYPT_LOG_ROUNDS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE, PASSWORD_HASH_MODE"""
+    return PasswordHasher(
+        rounds=int(os.getenv("BCRYPT_LOG_ROUNDS", str(DEFAULT_ROUNDS))),
+        workers=int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2)))),
+        max_queue=int(os.getenv("PASSWORD_HASH_QUEUE", "16")),
+        mode=os.getenv("PASSWORD_HASH_MODE", "process"),
+    )
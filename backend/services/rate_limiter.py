@@ -0,0 +1,160 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+
+class RateLimitRule:
+    """Token bucket: до `capacity` запитів поспіль, далі `refill_rate` запитів за секунду"""
+    __slots__ = ('capacity', 'refill_rate')
+
+    def __init__(self, capacity: int, refill_rate: float):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+
+    @property
+    def idle_ttl(self) -> float:
+        """Через цей час простою відро гарантовано повне, тож його можна забути"""
+        return self.capacity / self.refill_rate
+
+
+def _consume(tokens: float, updated_at: float, now: float, rule: RateLimitRule):
+    """(Private) Поповнює відро і пробує взяти один токен. Повертає (tokens, allowed, retry_after)"""
+    tokens = min(rule.capacity, tokens + (now - updated_at) * rule.refill_rate)
+    if tokens >= 1:
+        return tokens - 1, True, 0
+    retry_after = math.ceil((1 - tokens) / rule.refill_rate)
+    return tokens, False, max(retry_after, 1)
+
+
+class MemoryBucketStore:
+    """
+    Сховище відер у пам'яті процесу.
+    Ключі розподілені по шардах з окремими блокуваннями; кожен шард - LRU
+    з жорстким лімітом розміру, а відра, що простоюють довше за TTL, видаляються.
+    """
+
+    def __init__(self, idle_ttl: float, shards: int = 16, max_buckets: int = 100_000):
+        self.idle_ttl = idle_ttl
+        self._shards = [OrderedDict() for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._shard_capacity = max(1, max_buckets // shards)
+
+    def consume(self, key: str, rule: RateLimitRule, now: float):
+        index = zlib.crc32(key.encode('utf-8')) % len(self._shards)
+        shard = self._shards[index]
+        with self._locks[index]:
+            tokens, updated_at = shard.pop(key, (rule.capacity, now))
+            tokens, allowed, retry_after = _consume(tokens, updated_at, now, rule)
+            shard[key] = (tokens, now)
+
+            # Найстаріші записи - на початку: прибираємо прострочені та зайві
+            while shard:
+                oldest_key, (_, oldest_at) = next(iter(shard.items()))
+                if len(shard) > self._shard_capacity or now - oldest_at > self.idle_ttl:
+                    del shard[oldest_key]
+                else:
+                    break
+        return allowed, retry_after
+
+    def __len__(self):
+        return sum(len(shard) for shard in self._shards)
+
+
+class SQLiteBucketStore:
+    """
+    Спільне для всіх воркерів сховище відер у окремому SQLite-файлі.
+    Кожне списання токена - одна коротка IMMEDIATE-транзакція.
+    """
+
+    CLEANUP_EVERY = 1000  # раз на стільки звернень видаляємо відра, що простоюють
+
+    def __init__(self, path: str, idle_ttl: float = 3600):
+        self.path = path
+        self.idle_ttl = idle_ttl
+        self._local = threading.local()
+        self._calls = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        # Файл і таблиця створюються при першому запиті, а не під час імпорту застосунку
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute('''CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+                key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL
+            ) WITHOUT ROWID''')
+            self._local.conn = conn
+        return conn
+
+    def consume(self, key: str, rule: RateLimitRule, now: float):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, updated_at = row if row else (rule.capacity, now)
+            tokens, allowed, retry_after = _consume(tokens, updated_at, now, rule)
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                (key, tokens, now)
+            )
+            self._calls += 1
+            if self._calls % self.CLEANUP_EVERY == 0:
+                conn.execute("DELETE FROM rate_limit_buckets WHERE updated_at < ?", (now - self.idle_ttl,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed, retry_after
+
+
+class RateLimiter:
+    """
+    Обмеження частоти запитів.
+    Ліміт обирається за маршрутом (route_rules) або за типом клієнта
+    (автентифікований користувач чи анонімний IP).
+    """
+
+    def __init__(self, store, default_rule: RateLimitRule, user_rule: RateLimitRule = None,
+                 route_rules: dict = None, clock=time.time):
+        self.store = store
+        self.default_rule = default_rule
+        self.user_rule = user_rule or default_rule
+        self.route_rules = route_rules or {}
+        self.clock = clock
+
+    def hit(self, identity: str, endpoint: str = None, authenticated: bool = False):
+        """Зарахувати запит. Повертає (allowed, retry_after_seconds)"""
+        if endpoint in self.route_rules:
+            rule, scope = self.route_rules[endpoint], endpoint
+        else:
+            rule, scope = (self.user_rule if authenticated else self.default_rule), 'default'
+        return self.store.consume(f"{scope}:{identity}", rule, self.clock())
+
+
+def create_rate_limiter(default_rule: RateLimitRule, user_rule: RateLimitRule = None,
+                        route_rules: dict = None) -> RateLimiter:
+    """
+    Створює лімітер за конфігурацією середовища:
+    RATE_LIMIT_BACKEND=memory (за замовчуванням, окремо в кожному процесі)
+    або sqlite (спільний для всіх воркерів файл RATE_LIMIT_DB).
+    """
+    rules = [default_rule, user_rule or default_rule, *(route_rules or {}).values()]
+    idle_ttl = max(rule.idle_ttl for rule in rules)
+
+    backend = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    if backend == "sqlite":
+        default_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    'data', 'rate_limits.db')
+        path = os.getenv("RATE_LIMIT_DB", default_path)
+        store = SQLiteBucketStore(path, idle_ttl)
+    else:
+        store = MemoryBucketStore(idle_ttl, max_buckets=int(os.getenv("RATE_LIMIT_MAX_BUCKETS", "100000")))
+    return RateLimiter(store, default_rule, user_rule, route_rules)
@@ -0,0 +1,44 @@
+import threading
+import time
+
+
+class RoleVersionCache:
+    """
+    In-process кеш (role, role_version) користувачів для перевірки JWT-claims.
+    Локальні зміни ролі оновлюють кеш одразу (через listener репозиторію),
+    зміни з інших воркерів підхоплюються не пізніше ніж через ttl секунд.
+    """
+
+    def __init__(self, loader, ttl: float = 30.0, max_entries: int = 10_000, clock=time.monotonic):
+        self.loader = loader  # user_id -> (role, role_version) | None
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = {}  # user_id -> (role, role_version, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int):
+        """Повертає (role, role_version) або None, якщо користувача не існує"""
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(user_id)
+        if entry is not None and entry[2] > now:
+            return entry[0], entry[1]
+
+        loaded = self.loader(user_id)
+        if loaded is None:
+            self.invalidate(user_id)
+            return None
+        self.set(user_id, *loaded)
+        return loaded
+
+    def set(self, user_id: int, role: str, role_version: int) -> None:
+        with self._lock:
+            if len(self._entries) >= self.max_entries and user_id not in self._entries:
+                # Простий захист пам'яті: вистачає одного "холодного" завантаження з БД
+                self._entries.clear()
+            self._entries[user_id] = (role, role_version, self.clock() + self.ttl)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
@@ -0,0 +1,175 @@
+import bisect
+import logging
+import re
+import threading
+import time
+import unicodedata
+
+from repositories.base import DB_ERRORS
+from services.change_feed import POLL_INTERVAL, ChangeFeed, ChangesCompacted
+
+MAX_PREFIX_LENGTH = 64  # довші ключі обрізаються: префікс для підказки довшим не буває
+MAX_WORDS_PER_NAME = 8  # ключів на знак щонайбільше - пам'ять лінійна за кількістю знаків
+MAX_SUGGESTIONS = 20
+SYNC_BATCH = 500
+
+_APOSTROPHES = str.maketrans({'’': "'", 'ʼ': "'", '`': "'"})
+_WORD = re.compile(r"\w[\w']*")
+
+logger = logging.getLogger(__name__)
+
+
+def fold(text: str) -> str:
+    """Ключ пошуку: NFKC, casefold, одна форма апострофа, стиснуті пробіли"""
+    text = unicodedata.normalize('NFKC', text).casefold().translate(_APOSTROPHES)
+    return ' '.join(text.split())
+
+
+class SignSuggestIndex:
+    """
+    Індекс підказок за префіксом назви знака в пам'яті процесу: два відсортовані масиви
+    (ключ, id) - повні назви і початки слів усередині назви. Пошук - bisect і зріз на limit,
+    O(log n + k) без звернень до БД. Спершу повертаються назви, що починаються з префікса,
+    далі - назви з таким словом.
+
+    Індекс будується з get_all() і далі оновлюється дельтами журналу змін: notify() підписаний
+    на зміни RoadSignRepository, зміни з інших воркерів підхоплюються не рідше ніж раз на poll_interval.
+    """
+
+    def __init__(self, sign_repo, feed: ChangeFeed = None, poll_interval: float = POLL_INTERVAL,
+                 clock=time.monotonic):
+        self.sign_repo = sign_repo
+        self.feed = feed or ChangeFeed()
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.version = None  # версія журналу змін, до якої індекс актуальний; None - не побудований
+        self._signs = {}  # id -> (name, category)
+        self._names = []  # [(ключ назви, id)], відсортовано
+        self._words = []  # [(ключ від початку слова, id)], відсортовано
+        self._stale = False
+        self._synced_at = 0.0
+        self._lock = threading.Lock()  # дані індексу
+        self._sync_lock = threading.Lock()  # одна синхронізація з БД за раз
+
+    def __len__(self) -> int:
+        return len(self._signs)
+
+    # --- Підтримка актуальності ---
+
+    def notify(self) -> None:
+        """Listener змін каталогу: дельту підтягне наступний запит, а не потік запису"""
+        self._stale = True
+
+    def needs_sync(self) -> bool:
+        return self.version is None or self._stale or self.clock() - self._synced_at >= self.poll_interval
+
+    def rebuild(self) -> None:
+        """Повна побудова з get_all(); версія береться до читання - зміни між ними застосуються повторно"""
+        version = self.feed.head()
+        self._stale = False
+        signs = {s.id: (s.name, s.category) for s in self.sign_repo.get_all()}
+        names, words = [], []
+        for sign_id, (name, _) in signs.items():
+            full, starts = self._keys(name)
+            names.append((full, sign_id))
+            words.extend((key, sign_id) for key in starts)
+        names.sort()
+        words.sort()
+        with self._lock:
+            self._signs, self._names, self._words = signs, names, words
+            self.version = version
+        self._synced_at = self.clock()
+
+    def sync(self, blocking: bool = True) -> None:
+        """
+        Застосувати зміни з журналу після self.version. blocking=False - якщо синхронізацію
+        вже виконує інший потік, запит обслуговується поточним станом індексу.
+        """
+        if not self._sync_lock.acquire(blocking):
+            return
+        try:
+            if self.version is None:
+                self.rebuild()
+                return
+            self._stale = False
+            try:
+                while True:
+                    batch = self.feed.read(self.version, SYNC_BATCH)
+                    with self._lock:
+                        for change in batch['changes']:
+                            sign = change['sign']
+                            self._remove(change['id'])
+                            if sign is not None:
+                                self._add(sign['id'], sign['name'], sign['category'])
+                        self.version = batch['version']
+                    if not batch['has_more']:
+                        break
+            except ChangesCompacted:
+                self.rebuild()
+            self._synced_at = self.clock()
+        finally:
+            self._sync_lock.release()
+
+    def _add(self, sign_id: int, name: str, category: str) -> None:
+        full, starts = self._keys(name)
+        self._signs[sign_id] = (name, category)
+        bisect.insort(self._names, (full, sign_id))
+        for key in starts:
+            bisect.insort(self._words, (key, sign_id))
+
+    def _remove(self, sign_id: int) -> None:
+        entry = self._signs.pop(sign_id, None)
+        if entry is None:
+            return
+        full, starts = self._keys(entry[0])
+        _discard(self._names, (full, sign_id))
+        for key in starts:
+            _discard(self._words, (key, sign_id))
+
+    @staticmethod
+    def _keys(name: str) -> tuple[str, list[str]]:
+        """Ключ повної назви і ключі від початку 2-го, 3-го... слова, обрізані до MAX_PREFIX_LENGTH"""
+        folded = fold(name)
+        starts = [m.start() for m in _WORD.finditer(folded)][1:MAX_WORDS_PER_NAME]
+        return folded[:MAX_PREFIX_LENGTH], sorted({folded[i:i + MAX_PREFIX_LENGTH] for i in starts})
+
+    # --- Пошук ---
+
+    def refresh(self) -> None:
+        """Підтягнути дельту, якщо індекс застарів; збій БД не заважає віддавати вже побудований індекс"""
+        if not self.needs_sync():
+            return
+        try:
+            self.sync(blocking=self.version is None)
+        except DB_ERRORS as e:
+            if self.version is None:
+                raise
+            logger.warning("suggest index sync failed, serving stale entries: %s", e)
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[dict]:
+        """До limit знаків {'id', 'name', 'category'}, назва або слово назви яких починається з prefix"""
+        self.refresh()
+        return self.lookup(prefix, limit)
+
+    def lookup(self, prefix: str, limit: int = 10) -> list[dict]:
+        """Пошук лише в пам'яті, без синхронізації (ASGI виконує refresh() в екзекуторі БД)"""
+        prefix = fold(prefix)[:MAX_PREFIX_LENGTH]
+        if not prefix:
+            return []
+        found = []
+        with self._lock:
+            for entries in (self._names, self._words):
+                i = bisect.bisect_left(entries, (prefix,))
+                while len(found) < limit and i < len(entries) and entries[i][0].startswith(prefix):
+                    sign_id = entries[i][1]
+                    if sign_id not in found:
+                        found.append(sign_id)
+                    i += 1
+            signs = [(sign_id, self._signs[sign_id]) for sign_id in found]
+        return [{'id': sign_id, 'name': name, 'category': category} for sign_id, (name, category) in signs]
+
+
+def _discard(entries: list, item: tuple) -> None:
+    i = bisect.bisect_left(entries, item)
+    if i < len(entries) and entries[i] == item:
+        del entries[i]
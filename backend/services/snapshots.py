@@ -0,0 +1,264 @@
+import argparse
+import contextlib
+import csv
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+try:
+    import brotli
+except ImportError:  # brotli - опційна залежність, без неї пишемо лише .gz
+    brotli = None
+
+try:
+    import fcntl
+except ImportError:  # не POSIX: без блокування між процесами (лише між потоками одного процесу)
+    fcntl = None
+
+from repositories.road_sign import RoadSignRepository
+from repositories.sign_changes import SignChangeRepository
+from services.change_feed import POLL_INTERVAL
+from services.json_codec import dumps
+
+MANIFEST_NAME = 'catalog.json'
+LOCK_NAME = '.snapshots.lock'
+EXPORT_FIELDS = ('id', 'name', 'category', 'description', 'image_url')
+EXPORT_CHUNK_SIZE = 500
+
+logger = logging.getLogger(__name__)
+
+
+# --- Експорт (спільний шлях для снапшотів і GET /signs/export) ---
+
+def iter_ndjson(signs):
+    """NDJSON: по одному JSON-об'єкту знака на рядок, частинами по EXPORT_CHUNK_SIZE"""
+    buffer = []
+    for sign in signs:
+        buffer.append(dumps(sign))
+        if len(buffer) >= EXPORT_CHUNK_SIZE:
+            yield b'\n'.join(buffer) + b'\n'
+            buffer.clear()
+    if buffer:
+        yield b'\n'.join(buffer) + b'\n'
+
+
+def iter_csv(signs):
+    """CSV з заголовком, частинами по EXPORT_CHUNK_SIZE"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for count, sign in enumerate(signs, start=1):
+        writer.writerow([sign.get(field) for field in EXPORT_FIELDS])
+        if count % EXPORT_CHUNK_SIZE == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+# --- Снапшоти ---
+
+def _content_hash(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """Унікальний тимчасовий файл у тому ж каталозі і rename: паралельні записи не бачать чужих половин"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f".{os.path.basename(path)}.", suffix='.tmp')
+    try:
+        os.fchmod(fd, 0o644)  # mkstemp створює 0600, а файли читає nginx
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+@contextlib.contextmanager
+def _directory_lock(out_dir: str):
+    """Одна регенерація на каталог снапшотів серед усіх воркерів (flock на файлі-замку)"""
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(out_dir, LOCK_NAME), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _write_snapshot_file(out_dir: str, prefix: str, payload) -> str:
+    """Пише <prefix>.<hash>.json разом з .gz/.br варіантами; повертає ім'я файлу"""
+    body = dumps(payload)
+    name = f"{prefix}.{_content_hash(body)}.json"
+    path = os.path.join(out_dir, name)
+    if not os.path.exists(path):  # той самий вміст - той самий файл, перезаписувати нема чого
+        _write_atomic(f"{path}.gz", gzip.compress(body, compresslevel=9, mtime=0))
+        if brotli is not None:
+            _write_atomic(f"{path}.br", brotli.compress(body, quality=11))
+        _write_atomic(path, body)
+    return name
+
+
+def _read_manifest(out_dir: str) -> dict | None:
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _manifest_files(manifest: dict | None) -> set:
+    if not manifest:
+        return set()
+    return {manifest['all'], *manifest['categories'].values()}
+
+
+def snapshot_version(out_dir: str) -> int | None:
+    """Версія журналу змін, з якої згенеровано поточні снапшоти (None - снапшотів ще немає)"""
+    manifest = _read_manifest(out_dir)
+    return manifest.get('version') if manifest else None
+
+
+def write_snapshots(repo: RoadSignRepository, out_dir: str, version: int = None) -> dict:
+    """
+    Генерує снапшоти всього каталогу та кожної категорії з хешем вмісту в імені.
+    catalog.json (маніфест) посилається на актуальні файли; файли попереднього
+    покоління зберігаються, щоб клієнти зі старим маніфестом догрузили свої дані.
+    version - голова журналу змін, прочитана до вибірки (записується в маніфест).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    with _directory_lock(out_dir):
+        return _write_snapshots(repo, out_dir, version)
+
+
+def _write_snapshots(repo: RoadSignRepository, out_dir: str, version: int | None) -> dict:
+    signs, by_category = [], {}
+    for sign in repo.iter_all():
+        signs.append(sign)
+        by_category.setdefault(sign['category'], []).append(sign)
+
+    manifest = {
+        'generated_at': int(time.time()),
+        'version': version,
+        'all': _write_snapshot_file(out_dir, 'signs', {'message': 'success', 'data': signs}),
+        'categories': {
+            category: _write_snapshot_file(
+                out_dir,
+                f"signs-{_content_hash(category.encode('utf-8'))}",
+                {'message': 'success', 'data': items}
+            )
+            for category, items in by_category.items()
+        },
+    }
+
+    previous = _read_manifest(out_dir)
+    _write_atomic(
+        os.path.join(out_dir, MANIFEST_NAME),
+        dumps(manifest)
+    )
+
+    keep = _manifest_files(manifest) | _manifest_files(previous)
+    for name in os.listdir(out_dir):
+        base = name.removesuffix('.gz').removesuffix('.br')
+        if base.startswith('signs') and base.endswith('.json') and base not in keep:
+            os.remove(os.path.join(out_dir, name))
+    return manifest
+
+
+class SnapshotWriter:
+    """
+    Регенерація снапшотів після змін каталогу. Власні зміни процесу (schedule) регенеруються
+    з затримкою `delay`: серія записів дає одну регенерацію. Фоновий потік (start) звіряє
+    версію маніфесту з головою журналу змін раз на poll_interval, тож записи інших воркерів
+    і вузлів теж оновлюють снапшоти. Каталог, уже оновлений іншим воркером, не перегенеровується.
+    """
+
+    def __init__(self, repo: RoadSignRepository, out_dir: str, delay: float = 1.0,
+                 change_repo: SignChangeRepository = None, poll_interval: float = POLL_INTERVAL):
+        self.repo = repo
+        self.out_dir = out_dir
+        self.delay = delay
+        self.change_repo = change_repo or SignChangeRepository()
+        self.poll_interval = poll_interval
+        self._timer = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()  # дві регенерації одночасно не пишуть у каталог
+
+    def schedule(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(self.delay, self._run)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def start(self) -> None:
+        """Снапшот одразу (якщо його немає або він застарів) і далі стеження за журналом змін"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name="snapshot-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def refresh(self) -> bool:
+        """Регенерувати снапшоти, якщо маніфест відстає від журналу змін; True - файли переписано"""
+        with self._write_lock:
+            head = self.change_repo.get_head()
+            if snapshot_version(self.out_dir) == head:
+                return False
+            os.makedirs(self.out_dir, exist_ok=True)
+            with _directory_lock(self.out_dir):
+                # Перевірка під замком: поки чекали, інший воркер міг уже записати цю версію
+                if snapshot_version(self.out_dir) == head:
+                    return False
+                _write_snapshots(self.repo, self.out_dir, head)
+            return True
+
+    def _run(self) -> None:
+        with self._lock:
+            self._timer = None
+        self._refresh_logged()
+
+    def _watch(self) -> None:
+        while True:
+            self._refresh_logged()
+            if self._stop.wait(self.poll_interval):
+                return
+
+    def _refresh_logged(self) -> None:
+        try:
+            self.refresh()
+        except Exception:  # наприклад, міграції ще не виконані - спробуємо на наступному циклі
+            logger.exception("snapshot regeneration failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Згенерувати статичні снапшоти каталогу знаків")
+    parser.add_argument('--out', default=os.getenv('SNAPSHOT_DIR', os.path.join('data', 'snapshots')),
+                        help="каталог для файлів снапшотів (за замовчуванням $SNAPSHOT_DIR або data/snapshots)")
+    args = parser.parse_args()
+    manifest = write_snapshots(RoadSignRepository(), args.out, SignChangeRepository().get_head())
+    print(f"Snapshot {manifest['all']} + {len(manifest['categories'])} categories -> {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,24 @@
+from services.json_codec import dumps
+
+STREAM_CHUNK_SIZE = 200  # кількість елементів в одному chunk-у відповіді
+
+
+def stream_json_list(items, chunk_size: int = STREAM_CHUNK_SIZE):
+    """
+    Генерує тіло {"message": "success", "data": [...]} частинами.
+    Елементи беруться з ітератора по одному, тому великий список
+    ніколи не збирається в пам'яті повністю.
+    """
+    yield b'{"message":"success","data":['
+    buffer = []
+    first = True
+    for item in items:
+        encoded = dumps(item)
+        buffer.append(encoded if first else b',' + encoded)
+        first = False
+        if len(buffer) >= chunk_size:
+            yield b''.join(buffer)
+            buffer.clear()
+    if buffer:
+        yield b''.join(buffer)
+    yield b']}'
@@ -0,0 +1,14 @@
+"""
+WSGI-точка входу для gunicorn (wsgi_app = "wsgi:create()").
+
+Імпорт app.py міряється тут, а не в самому модулі: тривалість імпорту - частина холодного
+старту (фаза 'import' у лозі і метриці app_startup_seconds).
+"""
+import importlib
+import time
+
+
+def create():
+    started = time.perf_counter()
+    app = importlib.import_module('app')
+    return app.create_app({'IMPORT_SECONDS': time.perf_counter() - started})
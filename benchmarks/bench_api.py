@@ -0,0 +1,150 @@
+"""
+Навантаження на Flask-застосунок: конкурентна суміш читань, записів адміна та логінів.
+Два драйвери: Flask test client (без мережі) і реальний локальний WSGI-сервер з потоками.
+Ін'єкцію збоїв вимкнено, rate limiting - без обмежень.
+"""
+import json
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+
+from common import CATEGORIES, WORDS, latency_stats
+
+ADMIN_PASSWORD = 'bench-password'
+# Частки операцій у суміші
+MIX = (('read', 0.80), ('write', 0.15), ('login', 0.05))
+
+
+class TestClientDriver:
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, method, path, body=None, headers=None):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        resp = client.open(path, method=method, json=body, headers=headers or {})
+        return resp.status_code, resp.get_json(silent=True)
+
+
+class WSGIServerDriver:
+    def __init__(self, app, port):
+        from werkzeug.serving import make_server
+        self.server = make_server('127.0.0.1', port, app, threaded=True)
+        self.base_url = f"http://127.0.0.1:{port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def request(self, method, path, body=None, headers=None):
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                     headers={'Content-Type': 'application/json', **(headers or {})})
+        try:
+            with urllib.request.urlopen(req, timeout=30) as resp:
+                payload = resp.read()
+                status = resp.status
+        except urllib.error.HTTPError as e:
+            payload, status = e.read(), e.code
+        try:
+            return status, json.loads(payload) if payload else None
+        except ValueError:
+            return status, None
+
+    def close(self):
+        self.server.shutdown()
+
+
+def prepare_app():
+    """Застосунок з вимкненим хаосом і без rate limiting; додає адміна для записів"""
+    import app as app_module
+    from repositories.base import get_pool
+    from services.rate_limiter import MemoryBucketStore, RateLimiter, RateLimitRule
+
+    flask_app = app_module.create_app({'DATABASE': get_pool().database, 'FAULT_PROFILES': None,
+                                       'OTEL_ENABLED': False})
+    unlimited = RateLimitRule(10 ** 9, 10 ** 9)
+    app_module.rate_limiter = RateLimiter(MemoryBucketStore(unlimited.idle_ttl), unlimited)
+    if not app_module.user_repo.get_by_username_for_auth('bench-admin'):
+        app_module.user_repo.create('bench-admin', app_module.password_hasher.hash(ADMIN_PASSWORD), 'admin')
+    return app_module, flask_app
+
+
+def run_mix(driver, signs: int, duration: float, concurrency: int) -> dict:
+    status, body = driver.request('POST', '/login', {'username': 'bench-admin', 'password': ADMIN_PASSWORD})
+    assert status == 200, f"admin login failed: {status}"
+    auth = {'Authorization': f"Bearer {body['access_token']}"}
+
+    samples = {kind: [] for kind, _ in MIX}
+    errors = {kind: 0 for kind, _ in MIX}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def read(rng):
+        choice = rng.random()
+        if choice < 0.4:
+            return driver.request('GET', f"/signs/id/{rng.randint(1, signs)}")
+        if choice < 0.7:
+            return driver.request('GET', f"/signs?limit=50&after={rng.randint(0, signs)}")
+        if choice < 0.85:
+            return driver.request('GET', f"/signs/search?q={urllib.parse.quote(rng.choice(WORDS))}")
+        return driver.request('GET', f"/signs/{urllib.parse.quote(rng.choice(CATEGORIES))}?limit=50")
+
+    def write(rng):
+        if rng.random() < 0.5:
+            return driver.request('POST', '/signs', {'name': f"Навантаження {uuid.uuid4().hex[:8]}",
+                                                     'category': 'Тимчасові'},
+                                  {**auth, 'Idempotency-Key': uuid.uuid4().hex})
+        return driver.request('PATCH', f"/signs/{rng.randint(1, signs)}",
+                              {'description': f"Оновлено {uuid.uuid4().hex[:8]}"}, auth)
+
+    def login(rng):
+        return driver.request('POST', '/login', {'username': 'bench-admin', 'password': ADMIN_PASSWORD})
+
+    operations = {'read': read, 'write': write, 'login': login}
+
+    def worker(seed):
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            point, kind = rng.random(), MIX[-1][0]
+            for name, share in MIX:
+                if point < share:
+                    kind = name
+                    break
+                point -= share
+            started = time.perf_counter()
+            status, _ = operations[kind](rng)
+            elapsed = time.perf_counter() - started
+            with lock:
+                samples[kind].append(elapsed)
+                if status >= 400:
+                    errors[kind] += 1
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    result = {kind: {**latency_stats(values, elapsed), 'errors': errors[kind]}
+              for kind, values in samples.items() if values}
+    result['total_ops_per_sec'] = round(sum(len(v) for v in samples.values()) / elapsed, 1)
+    return result
+
+
+def run(signs: int, duration: float = 10.0, concurrency: int = 8, port: int = 5056) -> dict:
+    app_module, flask_app = prepare_app()
+    results = {'test_client': run_mix(TestClientDriver(flask_app), signs, duration, concurrency)}
+    server = WSGIServerDriver(flask_app, port)
+    try:
+        results['wsgi_server'] = run_mix(server, signs, duration, concurrency)
+    finally:
+        server.close()
+        app_module.password_hasher.shutdown()
+    return results
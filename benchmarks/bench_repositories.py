@@ -0,0 +1,59 @@
+"""Мікробенчмарки кожного методу RoadSignRepository та UserRepository."""
+import random
+
+from common import CATEGORIES, DUMMY_PASSWORD_HASH, WORDS, timed, timed_concurrent
+from repositories.road_sign import RoadSignRepository
+from repositories.user import UserRepository
+
+
+def run(signs: int, users: int, iterations: int = 200) -> dict:
+    rng = random.Random(7)
+    sign_repo, user_repo = RoadSignRepository(), UserRepository()
+    # Повні вивантаження на великих каталогах дорогі - для них менше повторів
+    bulk_iterations = max(3, min(iterations, 2_000_000 // max(signs, 1)))
+
+    def random_sign_id(_):
+        return rng.randint(1, signs)
+
+    results = {'road_signs': {}, 'users': {}}
+    r = results['road_signs']
+    r['get_all'] = timed(lambda i: sign_repo.get_all(), bulk_iterations)
+    r['get_all_json'] = timed(lambda i: sign_repo.get_all_json(), bulk_iterations)
+    r['get_by_category'] = timed(lambda i: sign_repo.get_by_category(CATEGORIES[i % len(CATEGORIES)]),
+                                 bulk_iterations)
+    r['iter_all'] = timed(lambda i: sum(1 for _ in sign_repo.iter_all()), bulk_iterations)
+    r['get_page'] = timed(lambda i: sign_repo.get_page(100, random_sign_id(i)), iterations)
+    r['get_page_category'] = timed(
+        lambda i: sign_repo.get_page(100, random_sign_id(i), CATEGORIES[i % len(CATEGORIES)]), iterations)
+    r['get_by_id'] = timed(lambda i: sign_repo.get_by_id(random_sign_id(i)), iterations)
+    r['search'] = timed(lambda i: sign_repo.search(rng.choice(WORDS)[:4], limit=20), iterations)
+    r['create'] = timed(lambda i: sign_repo.create(f"Бенчмарк {i}", 'Тимчасові', 'Опис'), iterations)
+    r['create_many_100'] = timed(
+        lambda i: sign_repo.create_many([(f"Пакет {i}-{j}", 'Тимчасові', None) for j in range(100)]),
+        max(3, iterations // 10))
+    r['update'] = timed(lambda i: sign_repo.update(random_sign_id(i), {'description': f"Оновлено {i}"}),
+                        iterations)
+    r['delete'] = timed(lambda i: sign_repo.delete(signs + 1 + i), iterations)
+    # Одночасні адмінські правки: писач групового commit об'єднує їх у спільні транзакції
+    r['create_concurrent_8'] = timed_concurrent(
+        lambda i: sign_repo.create(f"Паралельний {i}", 'Тимчасові', 'Опис'), iterations, 8)
+    r['get_version'] = timed(lambda i: sign_repo.get_version(), iterations)
+
+    def random_user_id(_):
+        return rng.randint(1, users)
+
+    u = results['users']
+    u['get_all'] = timed(lambda i: user_repo.get_all(), bulk_iterations)
+    u['get_page'] = timed(lambda i: user_repo.get_page(100, random_user_id(i)), iterations)
+    u['iter_all'] = timed(lambda i: sum(1 for _ in user_repo.iter_all()), bulk_iterations)
+    u['get_by_id'] = timed(lambda i: user_repo.get_by_id(random_user_id(i)), iterations)
+    u['get_role_version'] = timed(lambda i: user_repo.get_role_version(random_user_id(i)), iterations)
+    u['get_by_username_for_auth'] = timed(
+        lambda i: user_repo.get_by_username_for_auth(f"user{random_user_id(i) - 1}"), iterations)
+    u['create'] = timed(lambda i: user_repo.create(f"bench{i}", DUMMY_PASSWORD_HASH), iterations)
+    u['create_concurrent_8'] = timed_concurrent(
+        lambda i: user_repo.create(f"parallel{i}", DUMMY_PASSWORD_HASH), iterations, 8)
+    u['update_role'] = timed(lambda i: user_repo.update_role(random_user_id(i), 'guest'), iterations)
+    u['update_password_hash'] = timed(
+        lambda i: user_repo.update_password_hash(random_user_id(i), DUMMY_PASSWORD_HASH), iterations)
+    return results
@@ -0,0 +1,42 @@
+"""
+Холодний старт застосунку: кожен запуск - новий процес Python, як новий воркер після деплою.
+Окремо міряються імпорт app.py, create_app() і прогрів кешів; total - від старту інтерпретатора.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+from common import latency_stats
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend'))
+
+# Виконується в дочірньому процесі; друкує тривалості фаз у секундах
+CHILD_SCRIPT = '''
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+flask_app = app.create_app()
+booted = time.perf_counter()
+print(json.dumps({
+    'import': imported - started,
+    'create_app': flask_app.extensions['startup_seconds']['create_app'],
+    'warm_up': flask_app.extensions['startup_seconds'].get('warm_up', 0.0),
+    'boot': booted - started,
+}))
+'''
+
+
+def run(db_path: str, runs: int = 10) -> dict:
+    env = {**os.environ, 'DATABASE_URL': '', 'DATABASE_PATH': db_path, 'FAULT_PROFILES': '', 'OTEL_ENABLED': '0'}
+    phases = {'import': [], 'create_app': [], 'warm_up': [], 'boot': [], 'process': []}
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', CHILD_SCRIPT], cwd=BACKEND_DIR, env=env,
+                                check=True, capture_output=True, text=True).stdout
+        phases['process'].append(time.perf_counter() - started)
+        for phase, seconds in json.loads(output.strip().splitlines()[-1]).items():
+            phases[phase].append(seconds)
+    return {phase: latency_stats(samples) for phase, samples in phases.items()}
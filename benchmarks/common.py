@@ -0,0 +1,118 @@
+"""Спільні утиліти бенчмарків: синтетичні дані, статистика латентності, порівняння з baseline."""
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend')))
+
+from repositories.schema import create_schema
+
+CATEGORIES = ('Попереджувальні', 'Пріоритету', 'Заборонні', 'Наказові',
+              'Інформаційно-вказівні', 'Сервісу', 'Додаткові таблички', 'Тимчасові')
+WORDS = ('головна', 'дорога', 'стоп', 'в\'їзд', 'заборонено', 'обмеження', 'швидкості', 'пішохідний',
+         'перехід', 'небезпечний', 'поворот', 'рух', 'автобусів', 'стоянка', 'зупинка', 'кінець',
+         'зони', 'велосипедна', 'доріжка', 'тунель', 'міст', 'залізничний', 'переїзд', 'діти')
+SEED_CHUNK = 10_000
+# Хеш-заглушка для синтетичних користувачів, які не логіняться (bcrypt тут не потрібен)
+DUMMY_PASSWORD_HASH = '$2b$12$' + 'x' * 53
+
+
+def seed_database(path: str, signs: int, users: int, rng: random.Random = None) -> None:
+    """Створює БД зі схемою застосунку, `signs` знаками та `users` користувачами"""
+    rng = rng or random.Random(42)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    create_schema(conn.cursor())
+
+    def sign_rows():
+        for i in range(signs):
+            name = ' '.join(rng.sample(WORDS, 3)).capitalize() + f' {i}'
+            description = ' '.join(rng.choices(WORDS, k=12))
+            yield name, CATEGORIES[i % len(CATEGORIES)], description
+
+    rows = sign_rows()
+    while True:
+        chunk = [row for _, row in zip(range(SEED_CHUNK), rows)]
+        if not chunk:
+            break
+        conn.executemany("INSERT INTO road_signs (name, category, description) VALUES (?, ?, ?)", chunk)
+    conn.executemany(
+        "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
+        ((f"user{i}", DUMMY_PASSWORD_HASH, 'guest') for i in range(users))
+    )
+    conn.commit()
+    conn.close()
+
+
+def latency_stats(samples: list[float], elapsed: float = None) -> dict:
+    """Статистика по латентностях у секундах -> мілісекунди (p50/p95/p99) і пропускна здатність"""
+    ordered = sorted(samples)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] * 1000
+
+    stats = {
+        'count': len(ordered),
+        'p50_ms': round(pct(50), 3),
+        'p95_ms': round(pct(95), 3),
+        'p99_ms': round(pct(99), 3),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+    }
+    total = elapsed if elapsed is not None else sum(ordered)
+    stats['ops_per_sec'] = round(len(ordered) / total, 1) if total else None
+    return stats
+
+
+def timed(fn, iterations: int) -> dict:
+    """Викликає fn(i) `iterations` разів і повертає статистику латентності"""
+    samples = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - started)
+    return latency_stats(samples)
+
+
+def timed_concurrent(fn, iterations: int, threads: int) -> dict:
+    """Те саме з `threads` потоків одночасно; ops_per_sec - за реальним часом, а не сумою латентностей"""
+    samples, lock = [], threading.Lock()
+
+    def worker(offset):
+        local = []
+        for i in range(offset, iterations, threads):
+            started = time.perf_counter()
+            fn(i)
+            local.append(time.perf_counter() - started)
+        with lock:
+            samples.extend(local)
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return latency_stats(samples, time.perf_counter() - started)
+
+
+def find_regressions(report: dict, baseline: dict, tolerance: float, metric: str = 'p50_ms',
+                     floor_ms: float = 0.05, path: str = '') -> list[str]:
+    """
+    Порівнює звіт з baseline: метрика повільніша більш ніж на `tolerance` (0.5 = +50%) - регресія.
+    Дуже швидкі операції (< floor_ms) ігноруються, бо там домінує шум вимірювання.
+    """
+    regressions = []
+    for key, base_value in baseline.items():
+        current = report.get(key)
+        where = f"{path}.{key}" if path else key
+        if isinstance(base_value, dict) and isinstance(current, dict):
+            regressions += find_regressions(current, base_value, tolerance, metric, floor_ms, where)
+        elif key == metric and isinstance(current, (int, float)) and base_value >= floor_ms:
+            if current > base_value * (1 + tolerance):
+                regressions.append(f"{where}: {current} ms > {base_value} ms (+{tolerance:.0%} allowed)")
+    return regressions
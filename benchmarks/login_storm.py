@@ -0,0 +1,101 @@
+"""
+Латентність читання каталогу (GET /signs) під час "шторму" логінів.
+
+Порівнює bcrypt у потоці запиту (PASSWORD_HASH_MODE=inline, як було раніше)
+з винесенням хешування в обмежений пул процесів (PASSWORD_HASH_MODE=process).
+Запускається через реальний локальний WSGI-сервер з потоками:
+
+    python benchmarks/login_storm.py --mode inline
+    python benchmarks/login_storm.py --mode process
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend')))
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def request(url, body=None):
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--mode', choices=['inline', 'process'], default='process')
+    parser.add_argument('--logins', type=int, default=8, help="кількість паралельних потоків логіну")
+    parser.add_argument('--duration', type=float, default=10.0, help="тривалість шторму, с")
+    parser.add_argument('--port', type=int, default=5055)
+    args = parser.parse_args()
+
+    os.environ['PASSWORD_HASH_MODE'] = args.mode
+    from werkzeug.serving import make_server
+    import app as app_module
+    from repositories.migrations import migrate
+    from services.rate_limiter import MemoryBucketStore, RateLimiter, RateLimitRule
+
+    flask_app = app_module.create_app({'FAULT_PROFILES': None, 'OTEL_ENABLED': False})
+    migrate(flask_app.config['DATABASE'])
+    # Бенчмарк міряє хешування, а не rate limiting
+    unlimited = RateLimitRule(10 ** 9, 10 ** 9)
+    app_module.rate_limiter = RateLimiter(MemoryBucketStore(unlimited.idle_ttl), unlimited)
+
+    server = make_server('127.0.0.1', args.port, flask_app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    stop = threading.Event()
+    login_statuses = []
+
+    def login_storm():
+        while not stop.is_set():
+            status, _ = request(f"{base_url}/login", {'username': 'admin', 'password': 'admin123'})
+            login_statuses.append(status)
+
+    read_latencies = []
+    storm = [threading.Thread(target=login_storm) for _ in range(args.logins)]
+    for t in storm:
+        t.start()
+    deadline = time.perf_counter() + args.duration
+    while time.perf_counter() < deadline:
+        _, elapsed = request(f"{base_url}/signs")
+        read_latencies.append(elapsed * 1000)
+    stop.set()
+    for t in storm:
+        t.join()
+    server.shutdown()
+    app_module.password_hasher.shutdown()
+
+    print(json.dumps({
+        'mode': args.mode,
+        'login_threads': args.logins,
+        'catalog_reads': len(read_latencies),
+        'read_p50_ms': round(statistics.median(read_latencies), 2),
+        'read_p95_ms': round(percentile(read_latencies, 95), 2),
+        'read_max_ms': round(max(read_latencies), 2),
+        'logins_ok': login_statuses.count(200),
+        'logins_shed_503': login_statuses.count(503),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
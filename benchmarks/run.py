@@ -0,0 +1,93 @@
+"""
+Відтворюваний набір бенчмарків API та репозиторіїв.
+
+    # мікробенчмарки репозиторіїв на каталогах 1k/100k/1M знаків
+    python benchmarks/run.py --suite repositories --sizes 1000,100000,1000000
+
+    # навантаження на застосунок (test client + реальний WSGI-сервер), звіт у файл
+    python benchmarks/run.py --suite api --sizes 100000 --output report.json
+
+    # холодний старт: імпорт, create_app() і прогрів у нових процесах
+    python benchmarks/run.py --suite startup --sizes 100000
+
+    # порівняння з baseline: регресія p50 більше ніж на 50% -> код виходу 1
+    python benchmarks/run.py --suite repositories --sizes 1000 --baseline benchmarks/baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from common import find_regressions, seed_database
+from repositories.base import configure_pool
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки Road Signs API")
+    parser.add_argument('--suite', choices=['repositories', 'api', 'startup', 'all'], default='repositories')
+    parser.add_argument('--sizes', default='1000,100000', help="розміри каталогу через кому")
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--iterations', type=int, default=200, help="повторів на метод репозиторію")
+    parser.add_argument('--duration', type=float, default=10.0, help="тривалість навантаження API, с")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--output', help="куди записати JSON-звіт")
+    parser.add_argument('--baseline', help="JSON-звіт для порівняння")
+    parser.add_argument('--tolerance', type=float, default=0.5, help="допустиме сповільнення p50 (0.5 = +50%%)")
+    parser.add_argument('--update-baseline', action='store_true', help="записати звіт у файл --baseline")
+    args = parser.parse_args()
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'created_at': int(time.time()),
+            'suite': args.suite,
+        },
+    }
+    for size in (int(s) for s in args.sizes.split(',')):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, 'bench.db')
+            started = time.perf_counter()
+            seed_database(db_path, signs=size, users=args.users)
+            print(f"seeded {size} signs / {args.users} users in {time.perf_counter() - started:.1f}s",
+                  file=sys.stderr)
+            pool = configure_pool(db_path)
+
+            section = report.setdefault(f"signs_{size}", {})
+            if args.suite in ('repositories', 'all'):
+                import bench_repositories
+                section['repositories'] = bench_repositories.run(size, args.users, args.iterations)
+            if args.suite in ('api', 'all'):
+                import bench_api
+                section['api'] = bench_api.run(size, args.duration, args.concurrency)
+            if args.suite in ('startup', 'all'):
+                import bench_startup
+                section['startup'] = bench_startup.run(db_path)
+            pool.close_all()
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.baseline and args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            f.write(output)
+    elif args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print("no regressions against baseline", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Порівняння шляхів серіалізації списку знаків: час і пікова пам'ять (tracemalloc).
+
+    legacy   - RoadSign на рядок + to_dict + stdlib json (як було раніше)
+    dicts    - dict на рядок прямо з курсора + services.json_codec (orjson, якщо є)
+    sqlite   - RoadSignRepository.get_all_json: масив збирає SQLite, без об'єктів на рядок
+
+    python benchmarks/serialization.py --rows 50000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend')))
+
+from repositories.base import configure_pool
+from repositories.road_sign import RoadSignRepository
+from services.json_codec import ENCODER, dumps
+
+
+def seed(path, rows):
+    import sqlite3
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE road_signs (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, "
+                 "category TEXT NOT NULL, description TEXT)")
+    conn.executemany(
+        "INSERT INTO road_signs (name, category, description) VALUES (?, ?, ?)",
+        ((f"Знак {i}", f"Категорія {i % 8}", "Опис дорожнього знака " * 4) for i in range(rows))
+    )
+    conn.commit()
+    conn.close()
+
+
+def measure(fn, repeat):
+    fn()  # прогрів кешу сторінок SQLite
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed_ms = (time.perf_counter() - started) / repeat * 1000
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return round(elapsed_ms, 2), round(peak / 2 ** 20, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк серіалізації списку знаків")
+    parser.add_argument('--rows', type=int, default=50_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        seed(path, args.rows)
+        pool = configure_pool(path)
+        repo = RoadSignRepository()
+
+        paths = {
+            'legacy': lambda: json.dumps({'message': 'success', 'data': [s.to_dict() for s in repo.get_all()]}).encode(),
+            'dicts': lambda: dumps({'message': 'success', 'data': list(repo.iter_all())}),
+            'sqlite': lambda: b'{"message":"success","data":' + repo.get_all_json() + b'}',
+        }
+        report = {'rows': args.rows, 'encoder': ENCODER}
+        for name, fn in paths.items():
+            elapsed_ms, peak_mb = measure(fn, args.repeat)
+            report[name] = {'ms': elapsed_ms, 'peak_mb': peak_mb}
+        pool.close_all()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
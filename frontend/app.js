@@ -3,6 +3,11 @@ let consecutiveFailures = 0;
 const FAILURE_THRESHOLD = 3;
 let currentSignId = null;
 
+// Стан для інкрементальної синхронізації (GET /signs/changes)
+let catalogVersion = null;
+let currentSigns = [];
+let currentCategory = null;
+
 // === 1. SMART CLIENT (Стійкий до збоїв Fetch) ===
 
 const sleep = (ms) => new Promise(r => setTimeout(r, ms));
@@ -48,8 +53,10 @@ async function fetchWithResilience(url, options = {}) {
             }
 
             // 5xx Server Errors
+            // 503 від контролю допуску несе Retry-After - чекаємо стільки, скільки радить сервер
             if (res.status >= 500 && attempt < retries) {
-                const delay = getBackoffDelay(attempt);
+                const retryAfter = res.status === 503 ? res.headers.get('Retry-After') : null;
+                const delay = retryAfter ? parseInt(retryAfter) * 1000 : getBackoffDelay(attempt);
                 console.warn(`Помилка ${res.status}. Ретрай через ${delay}мс`);
                 await sleep(delay);
                 attempt++;
@@ -79,10 +86,21 @@ async function fetchWithResilience(url, options = {}) {
 
 // === 2. ДОПОМІЖНІ ФУНКЦІЇ ===
 
-async function generateIdempotencyKey(payload) {
-    const str = JSON.stringify(payload);
-    const hashBuffer = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(str));
-    return Array.from(new Uint8Array(hashBuffer)).map(b => b.toString(16).padStart(2, '0')).join('').substring(0, 16);
+// Ключ ідемпотентності - випадковий на кожну дію користувача. Повторна спроба тієї самої дії
+// (та сама операція з тим самим тілом після помилки) отримує той самий ключ, будь-яка нова дія - новий,
+// навіть якщо її тіло збігається з попередньою (редагування A->B->A, видалення відновленого знака).
+const pendingActions = new Map();
+
+function idempotencyKeyFor(action, body = '') {
+    const pending = pendingActions.get(action);
+    if (pending && pending.body === body) return pending.key;
+    const key = crypto.randomUUID();
+    pendingActions.set(action, { key, body });
+    return key;
+}
+
+function completeAction(action) {
+    pendingActions.delete(action);
 }
 
 function handleDegradedMode() {
@@ -101,12 +119,86 @@ function resetDegradedMode() {
 
 // === 3. ЛОГІКА ДОДАТКУ ===
 
+// Статичний снапшот каталогу від nginx (без звернення до API).
+// Адмін бачить свої зміни одразу, тому для нього снапшот не використовується.
+async function fetchSnapshot(category = null) {
+    const user = JSON.parse(localStorage.getItem('user'));
+    if (user && user.role === 'admin') return null;
+    try {
+        const manifestRes = await fetch('snapshots/catalog.json', { cache: 'no-cache' });
+        if (!manifestRes.ok) return null;
+        const manifest = await manifestRes.json();
+        const file = category ? manifest.categories[category] : manifest.all;
+        if (!file) return null;
+        const res = await fetch(`snapshots/${file}`);
+        return res.ok ? (await res.json()).data : null;
+    } catch (e) {
+        return null;
+    }
+}
+
+// Кнопки категорій з лічильниками; оновлюються разом зі списком, тож зміни каталогу видно одразу
+async function loadCategories() {
+    const c = document.getElementById('categoryButtons');
+    if(!c) return;
+    try {
+        const res = await fetchWithResilience(`${API_URL}/categories`);
+        const data = await res.json();
+        c.innerHTML = '';
+        data.data.forEach(cat => {
+            const b = document.createElement('button');
+            b.textContent = `${cat.name} (${cat.sign_count})`;
+            b.onclick = () => loadSignsByCategory(cat.name);
+            c.appendChild(b);
+        });
+    } catch (e) {}
+}
+
+// Версія журналу змін до завантаження списку: зміни після неї доїдуть через syncChanges
+async function fetchCatalogVersion() {
+    try {
+        const res = await fetchWithResilience(`${API_URL}/signs/changes`);
+        catalogVersion = (await res.json()).version;
+    } catch (e) {
+        catalogVersion = null;
+    }
+}
+
+// Після власних змін тягнемо лише дельту, а не весь каталог; 410 (історію компактовано) - повне перезавантаження
+async function syncChanges() {
+    if (catalogVersion === null) return currentCategory ? loadSignsByCategory(currentCategory) : loadAllSigns();
+    try {
+        const res = await fetchWithResilience(`${API_URL}/signs/changes?since=${catalogVersion}`);
+        const data = await res.json();
+        data.data.forEach(change => {
+            currentSigns = currentSigns.filter(s => s.id !== change.id);
+            if (change.sign && (!currentCategory || change.sign.category === currentCategory)) currentSigns.push(change.sign);
+        });
+        currentSigns.sort((a, b) => a.id - b.id);
+        catalogVersion = data.version;
+        displaySigns(currentSigns);
+        loadCategories();
+        if (data.has_more) syncChanges();
+    } catch (e) {
+        catalogVersion = null;
+        syncChanges();
+    }
+}
+
 async function loadAllSigns() {
+    loadCategories();
+    currentCategory = null;
     setLoading('loading', true);
+    await fetchCatalogVersion();
     try {
-        const res = await fetchWithResilience(`${API_URL}/signs`);
-        const data = await res.json();
-        displaySigns(data.data);
+        const snapshot = await fetchSnapshot();
+        if (snapshot) {
+            displaySigns(snapshot);
+        } else {
+            const res = await fetchWithResilience(`${API_URL}/signs`);
+            const data = await res.json();
+            displaySigns(data.data);
+        }
     } catch (err) {
         const el = document.getElementById('signsList');
         if(el) el.innerHTML = `<p style="color:red">Помилка: ${err.error || err.message}</p>`;
@@ -114,8 +206,12 @@ async function loadAllSigns() {
     setLoading('loading', false);
 }
 
+// URL зображення від API: відносний (/images/...) або повний (CDN)
+function imageSrc(url) { return url.startsWith('http') ? url : `${API_URL}${url}`; }
+
 // Відображення списку карток
 function displaySigns(signs) {
+    currentSigns = signs || [];
     const c = document.getElementById('signsList');
     if(!c) return;
     c.innerHTML = '';
@@ -130,6 +226,7 @@ function displaySigns(signs) {
         d.className = 'sign-card';
         d.onclick = () => openDetailModal(s.id);
         d.innerHTML = `
+            ${s.thumbnail_url ? `<img src="${imageSrc(s.thumbnail_url)}" alt="" loading="lazy" style="max-width: 100%; height: 120px; object-fit: contain;">` : ''}
             <span class="category">${s.category}</span>
             <h3>${s.name}</h3>
             <p>${s.description ? s.description.substring(0, 60) + '...' : ''}</p>
@@ -150,6 +247,9 @@ async function openDetailModal(id) {
         document.getElementById('detailName').textContent = sign.name;
         document.getElementById('detailCategory').textContent = sign.category;
         document.getElementById('detailDescription').textContent = sign.description || "Опис відсутній";
+        const img = document.getElementById('detailImage');
+        img.style.display = sign.image_url ? 'block' : 'none';
+        if (sign.image_url) img.src = imageSrc(sign.image_url);
 
         // Перевірка прав адміна для показу кнопок редагування
         const user = JSON.parse(localStorage.getItem('user'));
@@ -209,20 +309,22 @@ async function saveSign() {
     const method = id ? 'PATCH' : 'POST';
     const url = id ? `${API_URL}/signs/${id}` : `${API_URL}/signs`;
 
-    let idemKey = null;
-    if (!id) idemKey = await generateIdempotencyKey(payload);
+    // Ключ ідемпотентності і для створення, і для редагування: ретрай не виконає запис двічі
+    const action = `${method} ${url}`;
+    const body = JSON.stringify(payload);
 
     try {
         const res = await fetchWithResilience(url, {
             method: method,
-            body: JSON.stringify(payload),
-            idempotencyKey: idemKey
+            body: body,
+            idempotencyKey: idempotencyKeyFor(action, body)
         });
 
         if (res.ok) {
+            completeAction(action);
             alert(id ? 'Знак оновлено!' : 'Знак створено!');
             closeModal('signFormModal');
-            loadAllSigns();
+            syncChanges();
         }
     } catch (e) {
         alert('Помилка збереження: ' + (e.error || e));
@@ -230,15 +332,33 @@ async function saveSign() {
 }
 
 // Видалення знака
+async function uploadSignImage(file) {
+    if (!file) return;
+    try {
+        const res = await fetchWithResilience(`${API_URL}/signs/${currentSignId}/image`, {
+            method: 'PUT', body: file, headers: { 'Content-Type': file.type }
+        });
+        const data = await res.json();
+        const img = document.getElementById('detailImage');
+        img.src = imageSrc(data.data.image_url);
+        img.style.display = 'block';
+        syncChanges();
+    } catch (e) {
+        alert(`Помилка завантаження: ${e.error || e.message}`);
+    }
+}
+
 async function deleteCurrentSign() {
     if (!confirm('Ви впевнені, що хочете видалити цей знак?')) return;
 
     try {
-        const res = await fetchWithResilience(`${API_URL}/signs/${currentSignId}`, { method: 'DELETE' });
+        const url = `${API_URL}/signs/${currentSignId}`;
+        const res = await fetchWithResilience(url, { method: 'DELETE', idempotencyKey: idempotencyKeyFor(`DELETE ${url}`) });
         if (res.ok || res.status === 204) {
+            completeAction(`DELETE ${url}`);
             alert('Знак видалено');
             closeModal('detailModal');
-            loadAllSigns();
+            syncChanges();
         }
     } catch (e) {
         alert('Помилка видалення');
@@ -304,11 +424,18 @@ function updateUI() {
 function setLoading(id, state) { const el = document.getElementById(id); if(el) el.style.display = state ? 'block' : 'none'; }
 
 async function loadSignsByCategory(cat) {
+    currentCategory = cat;
     setLoading('loading', true);
+    await fetchCatalogVersion();
     try {
-        const res = await fetchWithResilience(`${API_URL}/signs/${cat}`);
-        const data = await res.json();
-        displaySigns(data.data);
+        const snapshot = await fetchSnapshot(cat);
+        if (snapshot) {
+            displaySigns(snapshot);
+        } else {
+            const res = await fetchWithResilience(`${API_URL}/signs/${encodeURIComponent(cat)}`);
+            const data = await res.json();
+            displaySigns(data.data);
+        }
     } catch (e) {}
     setLoading('loading', false);
 }
@@ -344,7 +471,9 @@ async function loadAllUsers() {
 
 async function promoteUser(id) {
     try {
-        await fetchWithResilience(`${API_URL}/users/${id}/promote`, {method:'POST'});
+        const url = `${API_URL}/users/${id}/promote`;
+        await fetchWithResilience(url, {method:'POST', idempotencyKey: idempotencyKeyFor(`POST ${url}`)});
+        completeAction(`POST ${url}`);
         loadAllUsers();
     } catch(e){}
 }
@@ -356,14 +485,13 @@ async function createTestSign() {
         category: "Тестові",
         description: "Авто-тест"
     };
-    const key = await generateIdempotencyKey(payload);
     try {
         const res = await fetchWithResilience(`${API_URL}/signs`, {
-            method: 'POST', body: JSON.stringify(payload), idempotencyKey: key
+            method: 'POST', body: JSON.stringify(payload), idempotencyKey: crypto.randomUUID()
         });
         const d = await res.json();
         alert(`ID: ${d.data.id}`);
-        loadAllSigns();
+        syncChanges();
     } catch (e) { alert('Помилка'); }
 }
 
@@ -0,0 +1,76 @@
+import pytest
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend')))
+
+from services.admission import (AdaptiveLimit, AdmissionController, ClassLimits, classify,
+                                parse_request_start)
+
+
+def simulate(limit: AdaptiveLimit, capacity: int, base_latency: float, rounds: int = 1000) -> list[float]:
+    """
+    Сервер з обмеженою пропускною здатністю: поки одночасних запитів не більше capacity, затримка
+    базова, далі запити стоять у черзі і затримка росте пропорційно. Попит необмежений.
+    """
+    history = []
+    for _ in range(rounds):
+        taken = 0
+        while limit.try_acquire():
+            taken += 1
+        latency = base_latency * max(1.0, taken / capacity)
+        for _ in range(taken):
+            limit.release(latency)
+        history.append(limit.limit)
+    return history
+
+
+def test_limit_converges_to_target_latency_under_overload():
+    """Ліміт сходиться до рівня, на якому черга тримає затримку біля цілі, а не до max_limit."""
+    limit = AdaptiveLimit(ClassLimits(initial=64, min_limit=2, max_limit=512, target_latency=0.05))
+
+    history = simulate(limit, capacity=8, base_latency=0.01)
+
+    # ціль = 5x базової затримки -> близько 5 * capacity одночасних запитів
+    assert 20 <= min(history[500:]) and max(history[500:]) <= 80
+
+
+def test_limit_grows_when_saturated_without_queueing():
+    limit = AdaptiveLimit(ClassLimits(initial=8, min_limit=2, max_limit=100, target_latency=0.05))
+
+    simulate(limit, capacity=1000, base_latency=0.01, rounds=200)
+
+    assert limit.limit == 100
+
+
+def test_controller_sheds_excess_per_class_with_retry_after():
+    """Заповнений клас відкидає надлишок, інші класи працюють; Retry-After - ціле число секунд."""
+    controller = AdmissionController({'read': ClassLimits(2, 1, 4, 0.1), 'auth': ClassLimits(1, 1, 1, 1.0)})
+
+    tickets = [controller.admit('auth')[0], controller.admit('read')[0]]
+    rejected, retry_after = controller.admit('auth')
+
+    assert rejected is None and 1 <= retry_after <= 30
+    assert all(tickets)
+    controller.release(tickets[0])
+    assert controller.admit('auth')[0] is not None
+
+
+def test_stale_requests_from_proxy_queue_are_rejected():
+    controller = AdmissionController({'read': ClassLimits(8, 1, 8, 0.1, max_queue_delay=1.0)})
+
+    assert controller.admit('read', queue_delay=2.5)[0] is None
+    assert controller.admit('read', queue_delay=0.1)[0] is not None
+
+
+@pytest.mark.parametrize('header', ['t=1700000000.0', 't=1700000000000', 't=1700000000000000'])
+def test_parse_request_start_accepts_seconds_millis_and_micros(header):
+    assert parse_request_start(header, 1700000005.0) == pytest.approx(5.0)
+    assert parse_request_start(None, 1700000005.0) == parse_request_start('garbage', 1700000005.0) == 0.0
+
+
+def test_classify_route_classes():
+    assert classify('login', 'POST') == 'auth'
+    assert classify('create_sign', 'POST') == 'write'
+    assert classify('get_all_signs', 'GET') == 'read'
@@ -0,0 +1,354 @@
+import asyncio
+import io
+import itertools
+import json
+import pytest
+from urllib.parse import quote
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend')))
+
+pytest.importorskip("flask")
+pytest.importorskip("flask_jwt_extended")
+pytest.importorskip("flask_cors")
+
+from flask_jwt_extended import create_access_token
+
+import app as app_module
+from repositories import base
+from repositories.road_sign import RoadSignRepository
+from repositories.migrations import migrate
+from repositories.query_stats import QueryBudgetExceeded
+from services.admission import AdmissionController, ClassLimits
+from services.idempotency import IdempotencyStore
+from services.password_hasher import HasherBusy
+
+_addresses = itertools.count(1)
+
+
+@pytest.fixture
+def flask_app(tmp_path, monkeypatch):
+    monkeypatch.setenv("BCRYPT_LOG_ROUNDS", "4")  # хеш адміна з демо-даних міграції
+    db_path = str(tmp_path / "app.db")
+    migrate(db_path)  # два демо-знаки і адміністратор
+    flask_app = app_module.create_app({'DATABASE': db_path, 'TESTING': True, 'PRELOAD': True, 'WARM_UP': False})
+    # Стан рівня модуля, прив'язаний до попередньої БД
+    app_module.catalog_cache.clear()
+    app_module.suggest_index.version = None
+    monkeypatch.setattr(app_module, 'idempotency_store', IdempotencyStore())
+    yield flask_app
+    base.configure_pool(base.DATABASE)
+
+
+@pytest.fixture
+def wsgi_client(flask_app):
+    # Окрема адреса на тест: анонімні запити не впираються в rate limiter попередніх тестів
+    client = flask_app.test_client()
+    client.environ_base['REMOTE_ADDR'] = f"10.0.0.{next(_addresses) % 250}"
+    return client
+
+
+class AsgiResponse:
+    """Відповідь з інтерфейсом відповіді тестового клієнта Flask (status_code, headers, data, get_json)"""
+
+    def __init__(self, status_code: int, raw_headers: list, data: bytes):
+        from starlette.datastructures import Headers
+        self.status_code = status_code
+        self.headers = Headers(raw=raw_headers)
+        self.data = data
+
+    def get_json(self):
+        return json.loads(self.data)
+
+
+class AsgiClient:
+    """
+    Мінімальний HTTP-клієнт для ASGI-застосунку: starlette.testclient потребує httpx.
+    Кожен запит - один виклик application(scope, receive, send) на власному event loop клієнта.
+    """
+
+    def __init__(self, application, address: str):
+        self.application = application
+        self.address = address
+        self.loop = asyncio.new_event_loop()
+
+    def close(self):
+        self.loop.close()
+
+    def request(self, method: str, url: str, json=None, data: bytes = b'', headers: dict = None) -> AsgiResponse:
+        return self.loop.run_until_complete(self._request(method, url, json, data, headers or {}))
+
+    def get(self, url, **kwargs): return self.request('GET', url, **kwargs)
+    def post(self, url, **kwargs): return self.request('POST', url, **kwargs)
+    def patch(self, url, **kwargs): return self.request('PATCH', url, **kwargs)
+    def delete(self, url, **kwargs): return self.request('DELETE', url, **kwargs)
+
+    async def _request(self, method, url, json_body, data, headers):
+        path, _, query = url.partition('?')
+        if json_body is not None:
+            data = json.dumps(json_body).encode()
+            headers = {'Content-Type': 'application/json', **headers}
+        raw_headers = [(b'host', b'testserver'), (b'content-length', str(len(data)).encode())]
+        raw_headers += [(name.lower().encode(), value.encode()) for name, value in headers.items()]
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'scheme': 'http',
+            'method': method, 'path': path, 'raw_path': quote(path).encode(), 'root_path': '',
+            'query_string': quote(query, safe='=&').encode(), 'headers': raw_headers,
+            'client': (self.address, 50000), 'server': ('testserver', 80),
+        }
+        messages = [{'type': 'http.request', 'body': data, 'more_body': False}]
+        response = {'body': b''}
+        finished = asyncio.Event()
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await finished.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                response.update(status=message['status'], headers=message.get('headers', []))
+            elif message['type'] == 'http.response.body':
+                response['body'] += message.get('body', b'')
+                if not message.get('more_body'):
+                    finished.set()
+
+        await self.application(scope, receive, send)
+        return AsgiResponse(response['status'], response['headers'], response['body'])
+
+
+@pytest.fixture
+def asgi_client(flask_app, monkeypatch):
+    pytest.importorskip("starlette")
+    pytest.importorskip("a2wsgi")
+    # asgi.py при імпорті створює власний Flask-застосунок: з БД тесту і без init_worker
+    monkeypatch.setenv("DATABASE_PATH", flask_app.config['DATABASE'])
+    monkeypatch.setenv("APP_PRELOAD", "1")
+    import asgi
+    client = AsgiClient(asgi.application, f"10.0.1.{next(_addresses) % 250}")
+    yield client
+    client.close()
+
+
+@pytest.fixture(params=['wsgi', 'asgi'])
+def client(request):
+    """Контракт API однаковий в обох режимах: ті самі тести для app.py і asgi.py"""
+    return request.getfixturevalue(f"{request.param}_client")
+
+
+def admin_headers(flask_app, username="editor", **headers):
+    """Адмін у БД і JWT з його актуальною версією ролі (без bcrypt і /login)"""
+    app_module.user_repo.create(username, "not-a-real-hash")
+    user_id = app_module.user_repo.get_by_username_for_auth(username)['id']
+    app_module.user_repo.update_role(user_id, 'admin')
+    role, role_version = app_module.user_repo.get_role_version(user_id)
+    with flask_app.app_context():
+        token = create_access_token(identity=str(user_id), additional_claims={'role': role, 'rv': role_version})
+    return {'Authorization': f"Bearer {token}", **headers}
+
+
+def test_idempotent_create_replays_and_rejects_reused_key(flask_app, client):
+    headers = admin_headers(flask_app, **{'Idempotency-Key': 'create-1'})
+    sign = {'name': "Стоп", 'category': "Заборонні"}
+
+    first = client.post('/signs', json=sign, headers=headers)
+    replay = client.post('/signs', json=sign, headers=headers)
+    reused = client.post('/signs', json={**sign, 'name': "Інший"}, headers=headers)
+    missing = client.post('/signs', json=sign, headers={'Authorization': headers['Authorization']})
+
+    assert first.status_code == replay.status_code == 201
+    assert replay.headers['Idempotent-Replayed'] == 'true'
+    assert replay.get_json()['data']['id'] == first.get_json()['data']['id']
+    assert (reused.status_code, reused.get_json()['code']) == (422, 'IDEMPOTENCY_KEY_REUSED')
+    assert (missing.status_code, missing.get_json()['code']) == (400, 'IDEMPOTENCY_KEY_REQUIRED')
+    assert len(client.get('/signs').get_json()['data']) == 3  # два демо-знаки і один створений
+
+
+def test_token_with_stale_role_version_is_rejected(flask_app, client):
+    headers = admin_headers(flask_app)
+    user_id = app_module.user_repo.get_by_username_for_auth("editor")['id']
+    app_module.user_repo.update_role(user_id, 'admin')  # версія ролі змінилась після видачі токена
+
+    resp = client.delete('/signs/1', headers=headers)
+
+    assert (resp.status_code, resp.get_json()['code']) == (401, 'TOKEN_ROLE_STALE')
+
+
+def test_patch_validates_fields(flask_app, client):
+    headers = admin_headers(flask_app)
+    sign_id = app_module.sign_repo.create("Стоп", "Заборонні").id
+
+    for body in ({}, {'image_hash': 'x'}, {'name': ''}):
+        resp = client.patch(f'/signs/{sign_id}', json=body, headers=headers)
+        assert (resp.status_code, resp.get_json()['code']) == (400, 'INVALID_SIGN_UPDATE')
+    resp = client.patch(f'/signs/{sign_id}', json={'description': "Зупинитися"}, headers=headers)
+    assert resp.get_json()['data']['description'] == "Зупинитися"
+    assert client.patch('/signs/999', json={'name': "x"}, headers=headers).status_code == 404
+
+
+def test_batch_reports_each_row(flask_app, client):
+    headers = admin_headers(flask_app, **{'Idempotency-Key': 'batch-1'})
+    rows = [{'name': "Стоп", 'category': "Заборонні"}, {'name': ""}, "not an object",
+            {'name': "Головна дорога", 'category': "Пріоритету", 'description': 1}]
+
+    resp = client.post('/signs:batch', json=rows, headers=headers)
+
+    data = resp.get_json()
+    assert (data['created'], data['failed']) == (1, 3)
+    assert [r['status'] for r in data['results']] == ['created', 'error', 'error', 'error']
+
+
+def test_stream_rejects_pagination_and_filters(client):
+    streamed = client.get('/signs?stream=1')
+    assert streamed.status_code == 200 and len(streamed.get_json()) == 2
+
+    for url in ('/signs?stream=1&limit=1', '/signs?stream=1&category=Заборонні', '/signs/Заборонні?stream=1&after=1'):
+        resp = client.get(url)
+        assert (resp.status_code, resp.get_json()['code']) == (400, 'INVALID_STREAM_QUERY')
+
+
+def test_oversized_image_upload_is_rejected_before_reading(flask_app, wsgi_client, monkeypatch):
+    headers = admin_headers(flask_app, **{'Content-Type': 'image/png'})
+    monkeypatch.setattr(flask_app.extensions['image_store'], 'max_bytes', 16)
+    monkeypatch.setattr(app_module, 'MULTIPART_OVERHEAD', 8)
+
+    declared = wsgi_client.put('/signs/1/image', data=b'\x89PNG' + b'0' * 100, headers=headers)
+    chunked = wsgi_client.put('/signs/1/image', input_stream=io.BytesIO(b'\x89PNG' + b'0' * 100),
+                         headers={**headers, 'Transfer-Encoding': 'chunked'},
+                         environ_overrides={'wsgi.input_terminated': True})  # як у gunicorn для chunked
+
+    assert (declared.status_code, declared.get_json()['code']) == (413, 'IMAGE_TOO_LARGE')
+    assert (chunked.status_code, chunked.get_json()['code']) == (413, 'IMAGE_TOO_LARGE')
+
+
+def test_catalog_responses_honour_if_none_match(client):
+    app_module.sign_repo.create("Стоп", "Заборонні")
+
+    first = client.get('/signs')
+    cached = client.get('/signs', headers={'If-None-Match': first.headers['ETag']})
+
+    assert first.status_code == 200 and first.headers['Cache-Control'] == 'no-cache'
+    assert cached.status_code == 304 and cached.data == b''
+
+
+def test_admission_sheds_reads_with_retry_after(client, monkeypatch):
+    controller = AdmissionController({name: ClassLimits(1, 1, 1, 1.0) for name in ('read', 'write', 'auth')})
+    monkeypatch.setattr(app_module, 'admission', controller)
+    ticket, _ = controller.admit('read')  # єдине місце класу зайняте
+
+    rejected = client.get('/signs')
+    health = client.get('/health')
+    controller.release(ticket)
+
+    assert (rejected.status_code, rejected.get_json()['code']) == (503, 'OVERLOADED')
+    assert 1 <= int(rejected.headers['Retry-After']) <= 30
+    assert health.status_code == 200
+    assert client.get('/signs').status_code == 200
+
+
+def test_long_poll_and_sse_have_their_own_admission_limit(wsgi_client, monkeypatch):
+    """Очікування на /signs/changes обмежені класом 'hold'; SSE тримає місце, доки відповідь не закрито."""
+    controller = AdmissionController({name: ClassLimits(1, 1, 1, 1.0) for name in ('read', 'write', 'auth', 'hold')})
+    monkeypatch.setattr(app_module, 'admission', controller)
+    hold = controller.limiters['hold']
+
+    stream = wsgi_client.get('/signs/changes?since=0', headers={'Accept': 'text/event-stream'}, buffered=False)
+    assert stream.status_code == 200 and hold.inflight == 1
+    rejected = wsgi_client.get('/signs/changes?since=0&wait=1')
+    assert (rejected.status_code, rejected.get_json()['code']) == (503, 'OVERLOADED')
+    assert wsgi_client.get('/signs/changes?since=0').status_code == 200  # без очікування - звичайне читання
+
+    stream.close()
+    assert hold.inflight == 0
+
+
+def test_query_stats_headers_and_strict_budget(flask_app, wsgi_client, monkeypatch):
+    sign_id = app_module.sign_repo.create("Стоп", "Заборонні").id
+    flask_app.config['QUERY_STATS'] = True
+
+    resp = wsgi_client.get(f'/signs/id/{sign_id}')
+
+    assert int(resp.headers['X-DB-Statements']) >= 1 and float(resp.headers['X-DB-Time-Ms']) >= 0
+    monkeypatch.setitem(app_module.ROUTE_QUERY_BUDGETS, 'get_sign_by_id', 0)
+    flask_app.config['QUERY_BUDGET_STRICT'] = True
+    app_module.catalog_cache.clear()
+    with pytest.raises(QueryBudgetExceeded):
+        wsgi_client.get(f'/signs/id/{sign_id}')
+
+
+def test_create_app_does_not_accumulate_snapshot_listeners(flask_app, tmp_path):
+    listeners = len(RoadSignRepository._change_listeners)
+    config = {'DATABASE': flask_app.config['DATABASE'], 'TESTING': True, 'PRELOAD': True, 'WARM_UP': False,
+              'SNAPSHOT_DIR': str(tmp_path / "snapshots")}
+
+    first = app_module.create_app(config)
+    second = app_module.create_app(config)
+
+    assert len(RoadSignRepository._change_listeners) == listeners
+    assert app_module.snapshot_writer is second.extensions['snapshot_writer']
+    assert first.extensions['snapshot_writer'] is not app_module.snapshot_writer
+    app_module.create_app({**config, 'SNAPSHOT_DIR': None})
+    assert app_module.snapshot_writer is None
+
+
+@pytest.mark.parametrize('url, code', [
+    ('/signs?limit=0', 'INVALID_PAGINATION'),
+    ('/signs/Заборонні?after=-1', 'INVALID_PAGINATION'),
+    ('/signs?fields=id,secret', 'INVALID_SIGN_QUERY'),
+    ('/signs/export?format=xml', 'INVALID_EXPORT_FORMAT'),
+    ('/signs/search?q=', 'INVALID_SEARCH_QUERY'),
+    ('/signs/search?q=стоп&offset=x', 'INVALID_SEARCH_QUERY'),
+    ('/signs/suggest?prefix=ст&limit=0', 'INVALID_SUGGEST_QUERY'),
+    ('/signs/changes?since=-1', 'INVALID_CHANGES_QUERY'),
+    ('/signs/changes?since=0&wait=1000', 'INVALID_CHANGES_QUERY'),
+])
+def test_invalid_query_parameters_are_validation_errors(client, url, code):
+    resp = client.get(url, headers={'X-Request-Id': 'req-1'})
+
+    assert resp.status_code == 400
+    assert resp.get_json() == {**resp.get_json(), 'error': "Validation Error", 'code': code, 'requestId': 'req-1'}
+
+
+def test_search_suggest_and_changes_responses(client):
+    sign = app_module.sign_repo.create("Стоп", "Заборонні")
+
+    search = client.get('/signs/search?q=Стоп&limit=1').get_json()
+    suggest = client.get('/signs/suggest?prefix=Сто').get_json()
+    head = client.get('/signs/changes').get_json()
+    changes = client.get(f"/signs/changes?since={head['version'] - 1}").get_json()
+
+    assert [s['id'] for s in search['data']] == [sign.id] and search['next_offset'] == 1
+    assert "Стоп" in [s['name'] for s in suggest['data']]
+    assert (head['data'], head['has_more']) == ([], False)
+    assert changes['version'] == head['version'] and len(changes['data']) == 1
+
+
+def test_register_and_login(client):
+    credentials = {'username': "driver", 'password': "secret"}
+
+    assert client.post('/register', json=credentials).status_code == 201
+    assert client.post('/register', json=credentials).get_json() == {"error": "Username exists"}
+    wrong = client.post('/login', json={**credentials, 'password': "wrong"})
+    login = client.post('/login', json=credentials)
+
+    assert (wrong.status_code, wrong.get_json()) == (401, {"error": "Invalid credentials"})
+    assert login.status_code == 200 and login.get_json()['user']['role'] == 'guest'
+    me = client.get('/signs', headers={'Authorization': f"Bearer {login.get_json()['access_token']}"})
+    assert me.status_code == 200
+
+
+def test_busy_hasher_and_unknown_routes_use_the_error_format(client, monkeypatch):
+    def busy(*args):
+        raise HasherBusy(3)
+
+    monkeypatch.setattr(app_module.password_hasher, 'check', busy)
+    monkeypatch.setattr(app_module.password_hasher, 'check_async', busy)
+    overloaded = client.post('/login', json={'username': "admin", 'password': "x"})
+    missing = client.get('/no-such-route')
+
+    assert (overloaded.status_code, overloaded.get_json()['code']) == (503, 'AUTH_OVERLOADED')
+    assert overloaded.headers['Retry-After'] == '3'
+    assert (missing.status_code, missing.get_json()['code']) == (404, 404)
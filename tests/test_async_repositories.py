@@ -0,0 +1,65 @@
+import asyncio
+import sqlite3
+import pytest
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend')))
+
+from repositories import base
+from repositories.async_base import iterate, shutdown_db_executor
+from repositories.async_road_sign import AsyncRoadSignRepository
+from repositories.schema import create_schema
+
+
+@pytest.fixture
+def async_repo(tmp_path):
+    db_path = str(tmp_path / "async.db")
+    conn = sqlite3.connect(db_path)
+    create_schema(conn.cursor())
+    conn.commit()
+    conn.close()
+
+    base.configure_pool(db_path, size=2)
+    yield AsyncRoadSignRepository()
+    shutdown_db_executor()
+    base.configure_pool(base.DATABASE)
+
+
+def test_async_crud_runs_through_executor(async_repo):
+    """Async-репозиторій повертає ті самі доменні об'єкти, що й синхронний."""
+    async def scenario():
+        created = await async_repo.create("Стоп", "Заборонні", "Зупинитися")
+        found = await async_repo.get_by_id(created.id)
+        assert found.name == "Стоп"
+        assert await async_repo.delete(created.id) == 1
+        assert await async_repo.get_by_id(created.id) is None
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_reads_share_bounded_pool(async_repo):
+    """Сотні одночасних корутин обслуговуються пулом з двох з'єднань без PoolTimeoutError."""
+    async def scenario():
+        await async_repo.create_many([(f"Знак {i}", "Інформаційні", None) for i in range(50)])
+        pages = await asyncio.gather(*(async_repo.get_page(10, i % 40) for i in range(300)))
+        assert all(len(page) == 10 for page in pages)
+
+    asyncio.run(scenario())
+
+
+def test_async_iteration_streams_all_rows(async_repo):
+    """iter_all віддає всі рядки партіями і повертає з'єднання в пул після завершення."""
+    async def scenario():
+        await async_repo.create_many([(f"Знак {i}", "Попереджувальні", None) for i in range(25)])
+        ids = [sign['id'] async for sign in async_repo.iter_all(batch_size=10)]
+        assert len(ids) == 25 and ids == sorted(ids)
+
+        # Перервана ітерація теж закриває курсор
+        partial = iterate(async_repo.repo.iter_all(batch_size=10), 10)
+        await partial.__anext__()
+        await partial.aclose()
+
+    asyncio.run(scenario())
+    assert base.get_pool()._idle.qsize() == base.get_pool()._created
@@ -0,0 +1,103 @@
+import json
+import sqlite3
+import subprocess
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend')))
+
+from domain.catalog.road_sign import RoadSign, SignCategory
+from repositories import base
+from repositories.road_sign import RoadSignRepository
+from repositories.schema import create_schema
+from repositories.sign_changes import SignChangeRepository
+from services.catalog_cache import CatalogCache
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend'))
+
+
+class FakeRepo:
+    """Мінімальний репозиторій, який рахує звернення до "БД"."""
+
+    def __init__(self):
+        self.version = 0
+        self.calls = 0
+        self.signs = [RoadSign(1, "Стоп", "Заборонні", "Зупинитися перед знаком")]
+
+    def get_version(self):
+        return self.version
+
+    def get_all_json(self, category=None):
+        self.calls += 1
+        return json.dumps([s.to_dict() for s in self.signs]).encode('utf-8')
+
+
+def test_cached_body_is_reused_until_version_changes():
+    """Повторний запит береться з кешу; зміна версії каталогу інвалідує запис."""
+    repo = FakeRepo()
+    cache = CatalogCache(repo)
+
+    first = cache.all_signs()
+    second = cache.all_signs()
+    assert repo.calls == 1
+    assert second.etag == first.etag
+    assert json.loads(first.body)['data'][0]['name'] == "Стоп"
+
+    repo.signs.append(RoadSign(2, "Головна дорога", "Пріоритету"))
+    repo.version += 1
+
+    third = cache.all_signs()
+    assert repo.calls == 2
+    assert third.etag != first.etag
+
+
+class FakeCategoryRepo:
+    def __init__(self):
+        self.calls = 0
+
+    def get_all(self):
+        self.calls += 1
+        return [SignCategory("Заборонні", sign_count=1)]
+
+
+def test_categories_are_cached_with_catalog_version():
+    """Список категорій кешується і інвалідується разом з каталогом."""
+    repo, categories = FakeRepo(), FakeCategoryRepo()
+    cache = CatalogCache(repo, category_repo=categories)
+
+    first = cache.categories()
+    cache.categories()
+    assert categories.calls == 1
+    assert json.loads(first.body)['data'] == [{'name': "Заборонні", 'description': None, 'sign_count': 1}]
+
+    repo.version += 1
+    cache.categories()
+    assert categories.calls == 2
+
+
+def test_writes_from_another_process_invalidate_cache(tmp_path):
+    """Запис з іншого процесу (воркера) змінює голову журналу в БД - кеш перезавантажує тіло."""
+    db_path = str(tmp_path / "catalog.db")
+    conn = sqlite3.connect(db_path)
+    create_schema(conn.cursor())
+    conn.commit()
+    conn.close()
+    base.configure_pool(db_path, size=2)
+    try:
+        repo = RoadSignRepository()
+        repo.create("Стоп", "Заборонні")
+        cache = CatalogCache(repo, change_repo=SignChangeRepository(), version_check_interval=0)
+        first = cache.all_signs()
+        assert cache.all_signs() is first
+
+        subprocess.run([sys.executable, '-c', (
+            "import sys; from repositories import base; from repositories.road_sign import RoadSignRepository; "
+            "base.configure_pool(sys.argv[1]); RoadSignRepository().create('Головна дорога', 'Пріоритету'); "
+            "base.get_pool().close_all()"
+        ), db_path], cwd=BACKEND_DIR, check=True)
+
+        second = cache.all_signs()
+        assert second.etag != first.etag
+        assert [s['name'] for s in json.loads(second.body)['data']] == ["Стоп", "Головна дорога"]
+    finally:
+        base.configure_pool(base.DATABASE)
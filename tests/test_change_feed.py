@@ -0,0 +1,97 @@
+import asyncio
+import sqlite3
+import threading
+import pytest
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend')))
+
+from repositories import base
+from repositories.async_base import run_db, shutdown_db_executor
+from repositories.road_sign import RoadSignRepository
+from repositories.schema import create_schema
+from services.change_feed import ChangeFeed, ChangesCompacted, sse_event
+
+
+@pytest.fixture
+def feed(tmp_path):
+    db_path = str(tmp_path / "changes.db")
+    conn = sqlite3.connect(db_path)
+    create_schema(conn.cursor())
+    conn.commit()
+    conn.close()
+
+    base.configure_pool(db_path, size=2)
+    yield ChangeFeed(poll_interval=0.05)
+    shutdown_db_executor()
+    base.configure_pool(base.DATABASE)
+
+
+def test_changes_are_compact_deltas(feed):
+    """Кілька правок одного знака стискаються в одну зміну з поточним станом; видалення - без стану."""
+    repo = RoadSignRepository()
+    start = feed.read(0, 100)['version']
+    stop = repo.create("Стоп", "Заборонні")
+    repo.update(stop.id, {"description": "Зупинитися"})
+    ids = repo.create_many([("Знак A", "Тестові", None), ("Знак B", "Тестові", None)])
+    repo.delete(ids[0])
+
+    batch = feed.read(start, 100)
+
+    assert [(c['id'], c['op']) for c in batch['changes']] == [(stop.id, 'upsert'), (ids[1], 'upsert'),
+                                                              (ids[0], 'delete')]
+    assert batch['changes'][0]['sign'] == repo.get_by_id(stop.id).to_dict()
+    assert batch['changes'][2]['sign'] is None
+    assert feed.read(batch['version'], 100)['changes'] == []
+
+
+def test_pagination_by_version(feed):
+    repo = RoadSignRepository()
+    repo.create_many([(f"Знак {i}", "Тестові", None) for i in range(5)])
+
+    first = feed.read(0, 3)
+    rest = feed.read(first['version'], 3)
+
+    assert first['has_more'] and not rest['has_more']
+    assert len(first['changes']) + len(rest['changes']) == 5
+
+
+def test_compaction_moves_horizon_past_expired_tombstones(feed):
+    """Перекриті записи прибираються без наслідків для клієнтів; після видалення tombstone старі since отримують 410."""
+    repo = RoadSignRepository()
+    sign = repo.create("Стоп", "Заборонні")
+    repo.update(sign.id, {"name": "STOP"})
+    gone = repo.create("Тимчасовий", "Тестові")
+    repo.delete(gone.id)
+    before = feed.read(0, 100)
+
+    assert feed.repo.compact(retention=3600) == 2  # лише перекриті записи
+    assert feed.read(0, 100) == before
+
+    assert feed.repo.compact(retention=-1) == 1  # tombstone
+    with pytest.raises(ChangesCompacted):
+        feed.read(0, 100)
+    assert feed.read(before['version'], 100)['changes'] == []
+
+
+def test_long_poll_wakes_up_on_change(feed):
+    repo = RoadSignRepository()
+    since = feed.head()
+    RoadSignRepository.add_change_listener(feed.notify)
+    try:
+        threading.Timer(0.1, repo.create, ("Стоп", "Заборонні")).start()
+        batch = feed.wait(since, 10, timeout=5)
+
+        async def scenario():
+            threading.Timer(0.1, repo.create, ("Головна дорога", "Пріоритету")).start()
+            return await feed.wait_async(batch['version'], 10, 5, run_db)
+
+        async_batch = asyncio.run(scenario())
+    finally:
+        RoadSignRepository._change_listeners.remove(feed.notify)
+
+    assert [c['sign']['name'] for c in batch['changes']] == ["Стоп"]
+    assert [c['sign']['name'] for c in async_batch['changes']] == ["Головна дорога"]
+    assert sse_event(async_batch).startswith(b'id: %d\nevent: changes\ndata: {' % async_batch['version'])
@@ -0,0 +1,36 @@
+import pytest
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend')))
+
+from repositories.base import ConnectionPool, PooledConnection, PoolTimeoutError
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), size=2, timeout=0.1)
+    yield pool
+    pool.close_all()
+
+
+def test_connection_is_reused_after_close(pool):
+    """Після close() з'єднання повертається в пул, а не закривається."""
+    conn = PooledConnection(pool, pool.acquire())
+    raw = conn._conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+
+    again = PooledConnection(pool, pool.acquire())
+    assert again._conn is raw
+    again.close()
+
+
+def test_pool_is_bounded(pool):
+    """Пул не створює більше з'єднань, ніж size, і падає по таймауту."""
+    first, second = pool.acquire(), pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    pool.release(first)
+    pool.release(second)
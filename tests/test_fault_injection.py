@@ -0,0 +1,68 @@
+import random
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend')))
+
+from services.fault_injection import (DEMO_PROFILES, FaultInjector, LatencyDistribution, create_fault_injector)
+
+PROFILES = {
+    'seed': 7,
+    'routes': [
+        {'methods': ['POST'], 'path': '/signs*',
+         'latency': {'rate': 0.5, 'distribution': 'uniform', 'min_ms': 100, 'max_ms': 200},
+         'errors': {'rate': 0.2, 'statuses': [503]}},
+    ],
+}
+
+
+def test_injection_is_disabled_without_profiles():
+    """Без профілів рушій не створюється - застосунок не реєструє жодного хука."""
+    assert create_fault_injector(None) is None
+    assert create_fault_injector('') is None
+    assert create_fault_injector({'routes': []}) is None
+
+
+def test_seeded_injector_is_deterministic():
+    """Однаковий seed і послідовність запитів - однакові збої."""
+    def run():
+        injector = create_fault_injector(PROFILES)
+        return [(f.delay, f.status) if f else None
+                for f in (injector.decide('POST', '/signs') for _ in range(200))]
+
+    first = run()
+    assert first == run()
+    faults = [f for f in first if f]
+    assert any(status == 503 for _, status in faults)
+    assert all(delay == 0 or 0.1 <= delay <= 0.2 for delay, _ in faults)
+
+
+def test_rules_match_method_and_path():
+    """Правило застосовується лише до своїх методів і шляхів."""
+    injector = FaultInjector.from_config({'routes': [
+        {'methods': ['POST'], 'path': '/signs*', 'errors': {'rate': 1.0, 'statuses': [500]}},
+    ]})
+    assert injector.decide('POST', '/signs:batch').status == 500
+    assert injector.decide('GET', '/signs') is None
+    assert injector.decide('POST', '/login') is None
+
+
+def test_latency_distributions_respect_cap():
+    """Хвіст exponential/lognormal обрізається max_ms."""
+    rng = random.Random(1)
+    exponential = LatencyDistribution('exponential', mean_ms=500, max_ms=800)
+    lognormal = LatencyDistribution('lognormal', median_ms=100, sigma=2.0, max_ms=300)
+    assert all(0 <= exponential.sample(rng) <= 0.8 for _ in range(1000))
+    assert all(0 <= lognormal.sample(rng) <= 0.3 for _ in range(1000))
+    assert LatencyDistribution('fixed', ms=250).sample(rng) == 0.25
+
+
+def test_demo_profile_reproduces_legacy_chaos():
+    """Демо-профіль (CHAOS_ENABLED=1) чіпає лише записи знаків і /health."""
+    injector = create_fault_injector(DEMO_PROFILES)
+    assert injector.decide('GET', '/signs') is None
+    assert injector.decide('DELETE', '/signs/1') is None
+    outcomes = [injector.decide('PATCH', '/signs/1') for _ in range(2000)]
+    assert any(f and f.status in (500, 503) for f in outcomes)
+    assert any(f and 1.2 <= f.delay <= 2.0 for f in outcomes)
@@ -0,0 +1,50 @@
+import threading
+
+import pytest
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend')))
+
+from services.idempotency import IdempotencyKeyReused, IdempotencyStore, StoredResponse
+
+
+def test_duplicate_waits_for_first_request():
+    """Одночасний дублікат не виконує запис повторно, а отримує результат першого запиту."""
+    store = IdempotencyStore()
+    assert store.begin("1:key", "fp") is None  # перший запит став власником ключа
+
+    results = []
+    duplicate = threading.Thread(target=lambda: results.append(store.begin("1:key", "fp")))
+    duplicate.start()
+
+    store.complete("1:key", StoredResponse("fp", 201, b'{"id":1}'))
+    duplicate.join(timeout=2)
+
+    assert results[0].status == 201
+    assert results[0].body == b'{"id":1}'
+
+
+def test_key_reuse_with_other_payload_is_rejected():
+    """Той самий ключ з іншим тілом запиту - помилка, а не чужа відповідь."""
+    store = IdempotencyStore()
+    store.begin("1:key", "fp-a")
+    store.complete("1:key", StoredResponse("fp-a", 201, b'{}'))
+
+    with pytest.raises(IdempotencyKeyReused):
+        store.begin("1:key", "fp-b")
+
+
+def test_entries_are_bounded_and_persisted(tmp_path):
+    """Пам'ять обмежена LRU, а витіснений ключ відновлюється з SQLite-таблиці."""
+    path = str(tmp_path / "idem.db")
+    store = IdempotencyStore(max_entries=2, db_path=path)
+    for i in range(3):
+        store.begin(f"1:key-{i}", "fp")
+        store.complete(f"1:key-{i}", StoredResponse("fp", 200, f"{i}".encode()))
+
+    assert len(store._completed) == 2
+
+    restarted = IdempotencyStore(db_path=path)
+    assert restarted.begin("1:key-0", "fp").body == b"0"
@@ -0,0 +1,89 @@
+import io
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend')))
+
+from services import image_store
+from services.image_store import ImageStore, InvalidImage
+
+# Мінімальний PNG 1x1 (сигнатура + IHDR + IDAT + IEND)
+PNG_1PX = bytes.fromhex(
+    '89504e470d0a1a0a0000000d4948445200000001000000010806000000'
+    '1f15c4890000000d49444154789c6300010000050001'
+    '0d0a2db40000000049454e44ae426082'
+)
+
+
+def test_same_content_is_stored_once(tmp_path):
+    """Адреса - хеш вмісту: повторне завантаження не створює нових файлів."""
+    store = ImageStore(str(tmp_path))
+
+    first = store.save(PNG_1PX)
+    second = store.save(PNG_1PX)
+
+    assert first == second and len(first) == 64
+    path, mimetype = store.resolve(first, 'original')
+    assert mimetype == 'image/png'
+    with open(path, 'rb') as f:
+        assert f.read() == PNG_1PX
+
+
+def test_concurrent_uploads_of_the_same_image_in_one_process(tmp_path):
+    """Потоки одного воркера пишуть той самий файл через різні тимчасові файли: без помилок і залишків."""
+    store = ImageStore(str(tmp_path))
+    start = threading.Barrier(8)
+    results = []
+
+    def upload():
+        start.wait()
+        results.append(store.save(PNG_1PX))
+
+    threads = [threading.Thread(target=upload) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(results) == 8 and len(set(results)) == 1
+    leftovers = [name for _, _, files in os.walk(tmp_path) for name in files if name.endswith('.tmp')]
+    assert leftovers == []
+
+
+def test_rejects_unknown_format_and_oversized_upload(tmp_path):
+    store = ImageStore(str(tmp_path), max_bytes=len(PNG_1PX) - 1)
+
+    with pytest.raises(InvalidImage):
+        store.save(b'<svg></svg>')
+    with pytest.raises(InvalidImage):
+        store.save(PNG_1PX)
+
+
+def test_resolve_rejects_bad_paths_and_falls_back_to_original(tmp_path, monkeypatch):
+    """Без мініатюри (немає Pillow) віддається оригінал; digest не може вийти за межі сховища."""
+    monkeypatch.setattr(image_store, 'Image', None)
+    store = ImageStore(str(tmp_path))
+    digest = store.save(PNG_1PX)
+
+    assert store.resolve(digest, 'thumb', accept_webp=True)[0].endswith('original.png')
+    assert store.resolve('../' + digest[3:], 'original') is None
+    assert store.resolve(digest, 'huge') is None
+    assert store.resolve('0' * 64, 'thumb') is None
+
+
+def test_thumbnail_and_webp_variants_are_pregenerated(tmp_path):
+    pil = pytest.importorskip('PIL.Image')
+    buffer = io.BytesIO()
+    pil.new('RGB', (800, 400), 'red').save(buffer, 'JPEG')
+    store = ImageStore(str(tmp_path), thumbnail_size=64)
+
+    digest = store.save(buffer.getvalue())
+
+    thumb_path, mimetype = store.resolve(digest, 'thumb')
+    assert mimetype == 'image/jpeg'
+    assert pil.open(thumb_path).size == (64, 32)
+    assert store.resolve(digest, 'thumb', accept_webp=True)[1] == 'image/webp'
+    assert store.resolve(digest, 'original', accept_webp=True)[1] == 'image/webp'
@@ -0,0 +1,75 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend')))
+
+from repositories import instrumentation
+from repositories.instrumentation import instrumented
+
+
+class RecordingMetric:
+    def __init__(self):
+        self.observed = []
+
+    def labels(self, *labels):
+        self._labels = labels
+        return self
+
+    def observe(self, value):
+        self.observed.append((self._labels, value))
+
+
+def test_method_result_rows_are_recorded(monkeypatch):
+    """Для списку рахується його довжина, для rowcount - саме число."""
+    rows = RecordingMetric()
+    monkeypatch.setattr(instrumentation, 'DB_STATEMENT_ROWS', rows)
+
+    @instrumented("signs.list")
+    def list_signs():
+        return [1, 2, 3]
+
+    @instrumented("signs.delete")
+    def delete_sign():
+        return 1
+
+    assert list_signs() == [1, 2, 3]
+    assert delete_sign() == 1
+    assert rows.observed == [(("signs.list",), 3), (("signs.delete",), 1)]
+
+
+def test_generator_is_measured_until_exhausted(monkeypatch):
+    """Генератор лишається генератором; рядки фіксуються після вичерпання."""
+    rows = RecordingMetric()
+    monkeypatch.setattr(instrumentation, 'DB_STATEMENT_ROWS', rows)
+
+    @instrumented("signs.iter_all")
+    def iter_signs():
+        yield from range(5)
+
+    iterator = iter_signs()
+    assert rows.observed == []
+    assert list(iterator) == [0, 1, 2, 3, 4]
+    assert rows.observed == [(("signs.iter_all",), 5)]
+
+
+def test_span_db_system_follows_the_configured_backend(monkeypatch):
+    from repositories import base
+
+    spans = []
+
+    class RecordingTracer:
+        def start_span(self, name, attributes):
+            spans.append(attributes['db.system'])
+            return None
+
+    monkeypatch.setattr(instrumentation, 'tracer', RecordingTracer())
+
+    @instrumented("signs.get")
+    def get_sign():
+        return None
+
+    get_sign()
+    monkeypatch.setattr(base, 'get_dialect', lambda: 'postgres')
+    get_sign()
+
+    assert spans == ['sqlite', 'postgresql']
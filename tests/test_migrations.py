@@ -0,0 +1,100 @@
+import sqlite3
+import pytest
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend')))
+
+from repositories.migrations import MIGRATIONS, get_schema_version, migrate
+from repositories.schema import create_baseline_schema, create_schema
+
+# Лише схема: сід-міграція потребує bcrypt і перевіряється окремо
+SCHEMA_ONLY = MIGRATIONS[:1]
+
+
+def test_migrations_are_applied_once(tmp_path):
+    """Перший запуск створює схему, повторний нічого не робить."""
+    db_path = str(tmp_path / "app.db")
+
+    assert migrate(db_path, SCHEMA_ONLY) == ['initial_schema']
+    assert migrate(db_path, SCHEMA_ONLY) == []
+
+    conn = sqlite3.connect(db_path)
+    assert get_schema_version(conn) == 1
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert {'road_signs', 'users', 'road_signs_fts'} <= tables
+    conn.close()
+
+
+def schema_of(db_path: str) -> set:
+    conn = sqlite3.connect(db_path)
+    try:
+        return {row for row in conn.execute("SELECT type, name, sql FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'")}
+    finally:
+        conn.close()
+
+
+def test_upgraded_and_fresh_databases_have_the_same_schema(tmp_path):
+    """БД на базовій версії, оновлена пізніше, отримує ту саму схему, що й нова (і що create_schema)."""
+    pytest.importorskip("bcrypt")
+    os.environ.setdefault("BCRYPT_LOG_ROUNDS", "4")
+    old_path, fresh_path, direct_path = (str(tmp_path / name) for name in ("old.db", "fresh.db", "direct.db"))
+
+    migrate(old_path, SCHEMA_ONLY)
+    assert 'categories' not in {name for _, name, _ in schema_of(old_path)}  # версія 1 заморожена
+    migrate(old_path)
+    migrate(fresh_path)
+    conn = sqlite3.connect(direct_path)
+    create_schema(conn.cursor())
+    conn.commit()
+    conn.close()
+
+    assert schema_of(old_path) == schema_of(fresh_path) == schema_of(direct_path)
+
+
+def test_database_created_before_migrations_is_adopted(tmp_path):
+    """БД, створена старим init_database (user_version = 0), мігрує без втрати даних."""
+    db_path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(db_path)
+    create_baseline_schema(conn.cursor())
+    conn.execute("INSERT INTO road_signs (name, category) VALUES ('Стоп', 'Заборонні')")
+    conn.commit()
+    conn.close()
+
+    assert migrate(db_path, SCHEMA_ONLY) == ['initial_schema']
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM road_signs").fetchone()[0] == 1
+    conn.close()
+
+
+def test_failed_migration_is_rolled_back(tmp_path):
+    """Помилка в міграції не залишає напівзастосованої схеми і не змінює версію."""
+    db_path = str(tmp_path / "broken.db")
+
+    def broken(cursor):
+        cursor.execute("CREATE TABLE half_done (id INTEGER)")
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        migrate(db_path, SCHEMA_ONLY + ((2, 'broken', broken),))
+
+    conn = sqlite3.connect(db_path)
+    assert get_schema_version(conn) == 0
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'half_done'").fetchone() is None
+    conn.close()
+
+
+def test_seed_runs_only_on_empty_database(tmp_path):
+    """Сід додає адміністратора лише один раз."""
+    pytest.importorskip("bcrypt")
+    os.environ.setdefault("BCRYPT_LOG_ROUNDS", "4")
+    db_path = str(tmp_path / "seed.db")
+
+    assert migrate(db_path) == [name for _, name, _ in MIGRATIONS]
+    assert migrate(db_path) == []
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM users WHERE role = 'admin'").fetchone()[0] == 1
+    conn.close()
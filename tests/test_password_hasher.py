@@ -0,0 +1,62 @@
+import pytest
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend')))
+
+pytest.importorskip("bcrypt")
+
+from services.password_hasher import HasherBusy, PasswordHasher
+
+
+def test_saturated_hasher_fails_fast():
+    """Коли всі слоти зайняті, хешування не чекає, а одразу кидає HasherBusy з Retry-After."""
+    hasher = PasswordHasher(rounds=4, workers=1, max_queue=0)
+    hasher._slots.acquire()  # імітуємо запит, що вже займає єдиний слот
+
+    with pytest.raises(HasherBusy) as exc_info:
+        hasher.hash("secret")
+    assert exc_info.value.retry_after >= 1
+
+
+def test_rehash_is_needed_when_cost_changes():
+    """Хеш з іншим cost factor потребує перерахунку; inline-режим працює без пулу."""
+    old = PasswordHasher(rounds=4, mode='inline')
+    new = PasswordHasher(rounds=5, mode='inline')
+    password_hash = old.hash("secret")
+
+    assert old.check(password_hash, "secret")
+    assert not old.needs_rehash(password_hash)
+    assert new.needs_rehash(password_hash)
+
+
+def test_async_check_runs_in_process_pool():
+    """Async-варіант чекає на результат пулу процесів, не блокуючи event loop."""
+    import asyncio
+
+    hasher = PasswordHasher(rounds=4, workers=1, max_queue=1)
+    try:
+        async def scenario():
+            password_hash = await hasher.hash_async("secret")
+            return await hasher.check_async(password_hash, "secret")
+
+        assert asyncio.run(scenario())
+        assert hasher._pending == 0
+    finally:
+        hasher.shutdown()
+
+
+def test_slow_pool_times_out_as_hasher_busy():
+    """Пул, що не встигає за timeout, дає HasherBusy (503 + Retry-After), а не TimeoutError (500)."""
+    import asyncio
+
+    hasher = PasswordHasher(rounds=12, workers=1, max_queue=2, timeout=0.001)
+    try:
+        with pytest.raises(HasherBusy) as exc_info:
+            hasher.hash("secret")
+        assert exc_info.value.retry_after >= 1
+        with pytest.raises(HasherBusy):
+            asyncio.run(hasher.hash_async("secret"))
+    finally:
+        hasher.shutdown()
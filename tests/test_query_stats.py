@@ -0,0 +1,59 @@
+import logging
+import sqlite3
+import pytest
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend')))
+
+from repositories import base, query_stats
+from repositories.query_stats import QueryBudgetExceeded, query_budget
+from repositories.road_sign import RoadSignRepository
+from repositories.schema import create_schema
+
+
+@pytest.fixture
+def repo(tmp_path):
+    db_path = str(tmp_path / "stats.db")
+    conn = sqlite3.connect(db_path)
+    create_schema(conn.cursor())
+    conn.commit()
+    conn.close()
+
+    base.configure_pool(db_path, size=2)
+    yield RoadSignRepository()
+    base.configure_pool(base.DATABASE)
+
+
+def test_budget_counts_reads_and_writes_from_the_writer_thread(repo):
+    """Мутація, виконана потоком-писачем, зараховується тому, хто її подав; update - один запит."""
+    sign = repo.create("Стоп", "Заборонні")
+
+    with query_budget(1) as stats:
+        updated = repo.update(sign.id, {"description": "Зупинитися"})
+
+    assert updated.description == "Зупинитися" and stats.statements == 1
+    assert repo.update(sign.id + 1, {"description": "x"}) is None
+    with pytest.raises(QueryBudgetExceeded, match="issued 2 SQL statements, budget is 1"):
+        with query_budget(1):
+            repo.get_by_id(sign.id)
+            repo.get_by_id(sign.id)
+
+
+def test_connections_are_not_wrapped_without_stats_or_slow_log(repo):
+    conn = base.get_db_connection()
+    conn.close()
+
+    assert isinstance(conn, base.PooledConnection)
+
+
+def test_slow_queries_are_logged_with_query_plan(repo, monkeypatch, caplog):
+    monkeypatch.setattr(query_stats, 'SLOW_QUERY_MS', 0.0)
+    sign = repo.create("Стоп", "Заборонні")
+
+    with caplog.at_level(logging.WARNING, logger="road_signs.slow_queries"):
+        repo.get_by_id(sign.id)
+
+    messages = [r.getMessage() for r in caplog.records]
+    assert any("FROM road_signs WHERE id = ?" in m and "USING INTEGER PRIMARY KEY" in m for m in messages)
@@ -0,0 +1,50 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend')))
+
+from services.rate_limiter import MemoryBucketStore, RateLimiter, RateLimitRule, SQLiteBucketStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_exhausts_and_reports_retry_after():
+    """Після вичерпання відра запит відхиляється з точним Retry-After, а згодом знову дозволяється."""
+    clock = FakeClock()
+    rule = RateLimitRule(capacity=2, refill_rate=0.5)
+    limiter = RateLimiter(MemoryBucketStore(rule.idle_ttl), rule, clock=clock)
+
+    assert limiter.hit("1.2.3.4") == (True, 0)
+    assert limiter.hit("1.2.3.4") == (True, 0)
+    assert limiter.hit("1.2.3.4") == (False, 2)
+
+    clock.now += 2
+    assert limiter.hit("1.2.3.4") == (True, 0)
+
+
+def test_memory_store_is_bounded():
+    """Кількість відер у пам'яті не перевищує жорсткий ліміт."""
+    rule = RateLimitRule(capacity=5, refill_rate=1)
+    store = MemoryBucketStore(rule.idle_ttl, shards=4, max_buckets=40)
+
+    for i in range(1000):
+        store.consume(f"ip:{i}", rule, now=1000.0)
+
+    assert len(store) <= 40
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path):
+    """Два екземпляри (як два воркери) списують токени з одного відра."""
+    rule = RateLimitRule(capacity=2, refill_rate=0.1)
+    path = str(tmp_path / "limits.db")
+    worker_a, worker_b = SQLiteBucketStore(path), SQLiteBucketStore(path)
+
+    assert worker_a.consume("default:ip", rule, now=1000.0)[0]
+    assert worker_b.consume("default:ip", rule, now=1000.0)[0]
+    assert worker_a.consume("default:ip", rule, now=1000.0) == (False, 10)
@@ -1,3 +1,4 @@
+import json
 import pytest
 import sqlite3
 from unittest.mock import patch
@@ -7,7 +8,10 @@ import os
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend')))
 
-from repositories.road_sign import RoadSignRepository
+from repositories.category import CategoryRepository
+from repositories.road_sign import RoadSignRepository, SignQuery
+from repositories.schema import create_category_index, create_search_index
+from repositories.write_queue import GroupCommitWriter
 
 
 # --- Налаштування Тестової Бази Даних ---
@@ -25,9 +29,12 @@ def mock_db():
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT NOT NULL,
             category TEXT NOT NULL,
-            description TEXT
+            description TEXT,
+            image_hash TEXT
         )
     ''')
+    create_search_index(cursor)
+    create_category_index(cursor)
     conn_init.commit()
 
 
@@ -38,10 +45,16 @@ def mock_db():
         conn.row_factory = sqlite3.Row
         return conn
 
+    # Мутації йдуть через писача з груповим commit, що пише в ту саму БД
+    writer = GroupCommitWriter(get_mocked_connection)
+
     # get_db_connection, щоб він викликав нашу функцію
-    with patch('repositories.road_sign.get_db_connection', side_effect=get_mocked_connection) as mock_get_conn:
+    with patch('repositories.road_sign.get_db_connection', side_effect=get_mocked_connection) as mock_get_conn, \
+            patch('repositories.road_sign.run_write', side_effect=writer.submit), \
+            patch('repositories.category.get_db_connection', side_effect=get_mocked_connection):
         yield mock_get_conn  # Тест виконується тут
 
+    writer.close()
     conn_init.close()
 
 
@@ -78,4 +91,145 @@ def test_get_by_id_error_case(mock_db):
     retrieved_sign = repo.get_by_id(999)
 
     # 3. Перевірка
-    assert retrieved_sign is None
\ No newline at end of file
+    assert retrieved_sign is None
+
+def test_get_page_uses_keyset_cursor(mock_db):
+    """Перевіряємо, що get_page повертає наступну сторінку після курсора `after`."""
+    # 1. Підготовка
+    repo = RoadSignRepository()
+    for i in range(5):
+        repo.create(name=f"Знак {i}", category="Заборонні" if i % 2 else "Пріоритету")
+
+    # 2. Дія
+    first_page = repo.get_page(limit=2)
+    second_page = repo.get_page(limit=2, after=first_page[-1].id)
+    category_page = repo.get_page(limit=10, category="Заборонні")
+
+    # 3. Перевірка
+    assert [s.id for s in first_page] == [1, 2]
+    assert [s.id for s in second_page] == [3, 4]
+    assert [s.id for s in category_page] == [2, 4]
+    assert [s['id'] for s in repo.iter_all(batch_size=2)] == [1, 2, 3, 4, 5]
+
+
+def test_search_is_case_insensitive_prefix_match(mock_db):
+    """Перевіряємо FTS5-пошук: регістр кирилиці, префікси та ранжування за назвою."""
+    # 1. Підготовка
+    repo = RoadSignRepository()
+    repo.create(name="Головна дорога", category="Пріоритету", description="Перевага на перехресті")
+    repo.create(name="Стоп", category="Заборонні", description="Зупинитися перед головною дорогою")
+    repo.create(name="Їзду заборонено", category="Заборонні")
+
+    # 2. Дія
+    results = repo.search("ГОЛОВН")
+
+    # 3. Перевірка
+    assert [s.name for s in results] == ["Головна дорога", "Стоп"]
+    assert [s.name for s in repo.search("їзд")] == ["Їзду заборонено"]
+
+    repo.update(3, {"name": "В'їзд заборонено"})
+    assert repo.search("їзду") == []
+    assert [s.id for s in repo.search("в'їзд")] == [3]
+
+
+def test_create_many_returns_ids_in_order(mock_db):
+    """Перевіряємо пакетну вставку: один виклик - одна транзакція, id у порядку рядків."""
+    # 1. Підготовка
+    repo = RoadSignRepository()
+    repo.create(name="Стоп", category="Заборонні")
+
+    # 2. Дія
+    ids = repo.create_many([("Знак A", "Тестові", None), ("Знак B", "Тестові", "Опис")])
+
+    # 3. Перевірка
+    assert ids == [2, 3]
+    assert repo.get_by_id(3).name == "Знак B"
+
+
+def test_get_all_json_matches_to_dict(mock_db):
+    """Швидкий JSON-шлях повертає ту саму форму, що й RoadSign.to_dict."""
+    # 1. Підготовка
+    repo = RoadSignRepository()
+    repo.create(name="Стоп", category="Заборонні", description="Зупинитися перед знаком")
+    repo.create(name="Головна дорога", category="Пріоритету")
+
+    # 2. Дія
+    data = json.loads(repo.get_all_json())
+    category_data = json.loads(repo.get_all_json("Пріоритету"))
+
+    # 3. Перевірка
+    assert data == [s.to_dict() for s in repo.get_all()]
+    assert [s['name'] for s in category_data] == ["Головна дорога"]
+
+
+def test_category_counts_follow_every_write_path(mock_db):
+    """Лічильники категорій оновлюються тригерами: create, create_many, update, delete."""
+    # 1. Підготовка
+    repo = RoadSignRepository()
+    categories = CategoryRepository()
+
+    # 2. Дія
+    repo.create(name="Стоп", category="Заборонні")
+    repo.create_many([("Головна дорога", "Пріоритету", None), ("Дати дорогу", "Пріоритету", None)])
+    counts_after_insert = {c.name: c.get_signs_count() for c in categories.get_all()}
+    repo.update(1, {"category": "Пріоритету"})
+    counts_after_update = {c.name: c.get_signs_count() for c in categories.get_all()}
+    repo.delete(2)
+
+    # 3. Перевірка
+    assert counts_after_insert == {"Заборонні": 1, "Пріоритету": 2}
+    assert counts_after_update == {"Пріоритету": 3}  # порожня категорія зникає
+    assert [(c.name, c.sign_count) for c in categories.get_all()] == [("Пріоритету", 2)]
+
+
+def test_listings_return_thumbnail_urls(mock_db):
+    """Після прив'язки зображення списки містять URL мініатюри, а JSON-шлях - ту саму форму."""
+    # 1. Підготовка
+    repo = RoadSignRepository()
+    sign = repo.create(name="Стоп", category="Заборонні")
+    digest = "ab" * 32
+
+    # 2. Дія
+    affected = repo.set_image(sign.id, digest)
+    data = json.loads(repo.get_all_json())
+
+    # 3. Перевірка
+    assert affected == 1
+    assert data == [s.to_dict() for s in repo.get_all()] == list(repo.iter_all())
+    assert data[0]['thumbnail_url'] == f"/images/{digest}/thumb"
+    assert repo.get_by_id(sign.id).image_url == f"/images/{digest}/original"
+    assert repo.set_image(999, digest) == 0
+
+
+def test_find_json_filters_categories_and_projects_fields(mock_db):
+    """Кілька категорій одним запитом, лише запитані поля, keyset-курсор наступної сторінки."""
+    # 1. Підготовка
+    repo = RoadSignRepository()
+    repo.create_many([("Стоп", "Заборонні", "Опис"), ("Головна дорога", "Пріоритету", "Опис"),
+                      ("Пішохідний перехід", "Інформаційні", None), ("Дати дорогу", "Пріоритету", None)])
+
+    # 2. Дія
+    first, next_after = repo.find_json(SignQuery(["Пріоритету", "Заборонні"], ["name", "id"], limit=2))
+    rest, last = repo.find_json(SignQuery(["Пріоритету", "Заборонні"], ["name", "id"], limit=2, after=next_after))
+    everything, _ = repo.find_json(SignQuery())
+
+    # 3. Перевірка
+    assert json.loads(first) == [{"id": 1, "name": "Стоп"}, {"id": 2, "name": "Головна дорога"}]
+    assert json.loads(rest) == [{"id": 4, "name": "Дати дорогу"}]
+    assert (next_after, last) == (2, None)
+    assert json.loads(everything) == json.loads(repo.get_all_json())
+    with pytest.raises(ValueError):
+        SignQuery(fields=["password_hash"])
+
+
+def test_update_rejects_unknown_or_empty_fields(mock_db):
+    """Назви колонок потрапляють у SQL, тож update() приймає лише дозволені поля."""
+    repo = RoadSignRepository()
+    sign = repo.create("Стоп", "Заборонні")
+
+    for data in ({}, {"id = 0, name": "x"}, {"image_hash": "abc"}):
+        with pytest.raises(ValueError):
+            repo.update(sign.id, data)
+
+    assert repo.update(sign.id, {"description": "Зупинитися"}).description == "Зупинитися"
+    assert repo.get_by_id(sign.id).name == "Стоп"
@@ -0,0 +1,33 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend')))
+
+from services.role_cache import RoleVersionCache
+
+
+def test_role_is_loaded_once_and_refreshed_after_ttl():
+    """У сталому режимі роль береться з кешу; після TTL - знову з БД."""
+    now = [0.0]
+    calls = []
+
+    def loader(user_id):
+        calls.append(user_id)
+        return ('admin', 3)
+
+    cache = RoleVersionCache(loader, ttl=30, clock=lambda: now[0])
+    assert cache.get(1) == ('admin', 3)
+    assert cache.get(1) == ('admin', 3)
+    assert calls == [1]
+
+    now[0] += 31
+    cache.get(1)
+    assert calls == [1, 1]
+
+
+def test_local_role_change_is_visible_immediately():
+    """Зміна ролі через listener репозиторію оновлює кеш без очікування TTL."""
+    cache = RoleVersionCache(lambda user_id: ('admin', 1))
+    cache.get(7)
+    cache.set(7, 'guest', 2)
+    assert cache.get(7) == ('guest', 2)
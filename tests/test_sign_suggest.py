@@ -0,0 +1,91 @@
+import sqlite3
+import time
+import pytest
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend')))
+
+from repositories import base
+from repositories.road_sign import RoadSignRepository
+from repositories.schema import create_schema
+from services.sign_suggest import SignSuggestIndex, fold
+
+
+@pytest.fixture
+def repo(tmp_path):
+    db_path = str(tmp_path / "suggest.db")
+    conn = sqlite3.connect(db_path)
+    create_schema(conn.cursor())
+    conn.commit()
+    conn.close()
+
+    base.configure_pool(db_path, size=2)
+    yield RoadSignRepository()
+    base.configure_pool(base.DATABASE)
+
+
+def names(results):
+    return [r['name'] for r in results]
+
+
+def test_prefix_matches_names_first_then_words(repo):
+    """Регістр і форма апострофа не важливі; збіг з початком назви йде перед збігом зі словом."""
+    repo.create_many([("Головна дорога", "Пріоритету", None), ("Дорожні роботи", "Попереджувальні", None),
+                      ("Кінець головної дороги", "Пріоритету", None), ("Пішохідний перехід", "Інформаційні", None),
+                      ("В'їзд заборонено", "Заборонні", None)])
+    index = SignSuggestIndex(repo)
+
+    assert names(index.suggest("ДОРО")) == ["Дорожні роботи", "Головна дорога", "Кінець головної дороги"]
+    assert names(index.suggest("голов", limit=1)) == ["Головна дорога"]
+    assert names(index.suggest("в’їзд")) == ["В'їзд заборонено"]
+    assert index.suggest("головна д")[0] == {'id': 1, 'name': "Головна дорога", 'category': "Пріоритету"}
+    assert index.suggest("xyz") == [] and index.suggest("   ") == []
+
+
+def test_index_follows_create_update_and_delete(repo):
+    index = SignSuggestIndex(repo, poll_interval=3600)
+    RoadSignRepository.add_change_listener(index.notify)
+    try:
+        stop = repo.create("Стоп", "Заборонні")
+        assert names(index.suggest("сто")) == ["Стоп"]
+
+        parking = repo.create("Стоянка заборонена", "Заборонні")
+        repo.update(stop.id, {"name": "Рух без зупинки заборонено"})
+        assert names(index.suggest("сто")) == ["Стоянка заборонена"]
+        assert names(index.suggest("зуп")) == ["Рух без зупинки заборонено"]
+
+        repo.delete(parking.id)
+        assert index.suggest("сто") == []
+        assert len(index) == 1
+    finally:
+        RoadSignRepository._change_listeners.remove(index.notify)
+
+
+def test_changes_from_other_workers_are_picked_up_after_poll_interval(repo):
+    now = [0.0]
+    index = SignSuggestIndex(repo, poll_interval=1.0, clock=lambda: now[0])
+    index.rebuild()
+    repo.create("Обгін заборонено", "Заборонні")  # listener цього індексу не підписаний - як інший воркер
+
+    assert index.suggest("обг") == []
+    now[0] += 1.0
+    assert names(index.suggest("обг")) == ["Обгін заборонено"]
+
+
+def test_lookup_is_sub_millisecond_on_large_catalog(repo):
+    repo.create_many([(f"Знак {i} тестова назва", "Тестові", None) for i in range(50_000)])
+    index = SignSuggestIndex(repo)
+    index.rebuild()
+
+    started = time.perf_counter()
+    for _ in range(100):
+        results = index.lookup("знак 4", 10)
+    elapsed = (time.perf_counter() - started) / 100
+
+    assert len(results) == 10 and elapsed < 0.001
+
+
+def test_fold_normalizes_case_apostrophes_and_spaces():
+    assert fold("  В’ЇЗД   Заборонено ") == "в'їзд заборонено"
@@ -0,0 +1,97 @@
+import gzip
+import json
+import sqlite3
+import threading
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend')))
+
+from repositories import base
+from repositories.road_sign import RoadSignRepository
+from repositories.schema import create_schema
+from services.snapshots import SnapshotWriter, _write_atomic, iter_csv, snapshot_version, write_snapshots
+
+
+class FakeRepo:
+    def __init__(self, signs):
+        self.signs = signs
+
+    def iter_all(self):
+        return iter(self.signs)
+
+
+SIGNS = [
+    {'id': 1, 'name': 'Стоп', 'category': 'Заборонні', 'description': 'Зупинитися', 'image_url': None},
+    {'id': 2, 'name': 'Головна дорога', 'category': 'Пріоритету', 'description': None, 'image_url': None},
+]
+
+
+def test_snapshots_are_content_addressed_and_precompressed(tmp_path):
+    """Маніфест посилається на файли з хешем вмісту; поруч лежить gzip-варіант."""
+    out_dir = str(tmp_path)
+    manifest = write_snapshots(FakeRepo(SIGNS), out_dir)
+
+    with open(os.path.join(out_dir, manifest['all']), 'rb') as f:
+        body = f.read()
+    with open(os.path.join(out_dir, manifest['all'] + '.gz'), 'rb') as f:
+        assert gzip.decompress(f.read()) == body
+    assert [s['id'] for s in json.loads(body)['data']] == [1, 2]
+    assert set(manifest['categories']) == {'Заборонні', 'Пріоритету'}
+
+    # Той самий вміст - те саме ім'я файлу; застарілі покоління прибираються
+    assert write_snapshots(FakeRepo(SIGNS), out_dir)['all'] == manifest['all']
+    write_snapshots(FakeRepo(SIGNS[:1]), out_dir)
+    write_snapshots(FakeRepo(SIGNS[1:]), out_dir)
+    assert not os.path.exists(os.path.join(out_dir, manifest['all']))
+
+
+def test_csv_export_has_header_and_rows():
+    """CSV-експорт: заголовок і по рядку на знак."""
+    lines = b''.join(iter_csv(iter(SIGNS))).decode('utf-8').splitlines()
+    assert lines[0] == 'id,name,category,description,image_url'
+    assert lines[1] == '1,Стоп,Заборонні,Зупинитися,'
+    assert len(lines) == 3
+
+
+def test_concurrent_atomic_writes_never_expose_partial_files(tmp_path):
+    """Кожен запис іде через власний тимчасовий файл: результат - один із повних варіантів."""
+    path = str(tmp_path / "signs.json")
+    bodies = [bytes([65 + i]) * 200_000 for i in range(8)]
+    threads = [threading.Thread(target=_write_atomic, args=(path, body)) for body in bodies]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    with open(path, 'rb') as f:
+        assert f.read() in bodies
+    assert os.listdir(tmp_path) == ["signs.json"]
+    assert os.stat(path).st_mode & 0o777 == 0o644
+
+
+def test_writer_follows_change_log_head(tmp_path):
+    """Снапшоти регенеруються, коли голова журналу змін випереджає маніфест, хто б не записав зміну."""
+    db_path = str(tmp_path / "snapshots.db")
+    conn = sqlite3.connect(db_path)
+    create_schema(conn.cursor())
+    conn.commit()
+    conn.close()
+    base.configure_pool(db_path, size=2)
+    try:
+        repo, out_dir = RoadSignRepository(), str(tmp_path / "out")
+        repo.create("Стоп", "Заборонні")
+        writer, other_worker = SnapshotWriter(repo, out_dir), SnapshotWriter(repo, out_dir)
+
+        assert writer.refresh() is True
+        assert other_worker.refresh() is False  # цю версію вже записав інший воркер
+
+        repo.create("Головна дорога", "Пріоритету")  # listener-и не підписані - як запис в іншому процесі
+        assert other_worker.refresh() is True
+        manifest = json.loads((tmp_path / "out" / "catalog.json").read_text(encoding='utf-8'))
+        with open(os.path.join(out_dir, manifest['all']), 'rb') as f:
+            assert [s['name'] for s in json.loads(f.read())['data']] == ["Стоп", "Головна дорога"]
+        assert snapshot_version(out_dir) == writer.change_repo.get_head()
+    finally:
+        base.configure_pool(base.DATABASE)
@@ -0,0 +1,102 @@
+import sqlite3
+import threading
+import pytest
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend')))
+
+from repositories.write_queue import GroupCommitWriter, WriterUnavailable
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "writes.db")
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def make_writer(db_path, transactions, **kwargs):
+    """Писач, що рахує свої транзакції (BEGIN IMMEDIATE) через trace callback"""
+    def connect():
+        conn = sqlite3.connect(db_path)
+        conn.set_trace_callback(lambda sql: sql == "BEGIN IMMEDIATE" and transactions.append(sql))
+        return conn
+
+    return GroupCommitWriter(connect, **kwargs)
+
+
+def insert(name):
+    return lambda conn: conn.execute("INSERT INTO items (name) VALUES (?) RETURNING id", (name,)).fetchone()[0]
+
+
+def run_concurrently(writer, fns):
+    results = [None] * len(fns)
+    start = threading.Barrier(len(fns))
+
+    def worker(i):
+        start.wait()
+        try:
+            results[i] = writer.submit(fns[i])
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(fns))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_concurrent_writes_share_transactions(db_path):
+    """Одночасні мутації комітяться пакетами, кожен викликач отримує свій результат."""
+    transactions = []
+    writer = make_writer(db_path, transactions, batch_delay=0.05)
+    try:
+        ids = run_concurrently(writer, [insert(f"item {i}") for i in range(16)])
+    finally:
+        writer.close()
+
+    assert sorted(ids) == list(range(1, 17))
+    assert len(transactions) < 16
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 16
+
+
+def test_failed_write_is_rolled_back_alone(db_path):
+    """Помилка однієї операції (UNIQUE) дістається лише її викликачу; решта пакета зберігається."""
+    writer = make_writer(db_path, [], batch_delay=0.05)
+    writer.submit(insert("taken"))
+    results = run_concurrently(writer, [insert("a"), insert("taken"), insert("b")])
+    writer.close()
+    restarted = writer.submit(insert("c"))  # після close() наступний submit запускає писача знову
+    writer.close()
+
+    assert isinstance(results[1], sqlite3.IntegrityError)
+    assert all(isinstance(r, int) for r in (results[0], results[2], restarted))
+    conn = sqlite3.connect(db_path)
+    assert sorted(r[0] for r in conn.execute("SELECT name FROM items")) == ["a", "b", "c", "taken"]
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_dead_writer_thread_times_out_and_is_restarted(db_path):
+    """Пакет, узятий потоком, що помер, не вішає викликача: WriterUnavailable, а наступний submit - новий потік."""
+    writer = make_writer(db_path, [], timeout=0.2)
+    next_batch = writer._next_batch
+
+    def crash(first):
+        writer._next_batch = next_batch
+        raise RuntimeError("writer crashed")
+
+    writer._next_batch = crash
+    with pytest.raises(WriterUnavailable):
+        writer.submit(insert("lost"))
+
+    assert writer.submit(insert("stop")) == 1
+    writer.close()